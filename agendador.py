@@ -0,0 +1,112 @@
+import logging
+import random
+import re
+from typing import Optional
+
+from indice import IndiceCrawler
+
+log = logging.getLogger(__name__)
+
+# Templates com pelo menos esse nº de execuções e nenhum PDF são descartados...
+MIN_TENTATIVAS_DESCARTE = 15
+# ...exceto uma fração deles, mantida no fim da fila para continuar explorando
+TAXA_EXPLORACAO = 0.1
+# Peso (em "tentativas virtuais") da taxa do motor na estimativa de cada template
+PESO_MOTOR = 2.0
+
+
+def chave_template(query: str, termo: str, autor: str = "", titulo: str = "") -> str:
+    """Troca o termo (e autor/título) da query por marcadores, para que a mesma
+    variação de query seja reconhecida em livros diferentes."""
+    substituicoes = [
+        (termo.replace(" ", "+"), "{termo+}"),
+        (termo, "{termo}"),
+        (titulo, "{titulo}"),
+        (autor, "{autor}"),
+    ]
+    for trecho, marcador in substituicoes:
+        if trecho:
+            # Só palavras inteiras, para não trocar pedaços do próprio template
+            query = re.sub(rf"(?<!\w){re.escape(trecho)}(?!\w)", marcador, query)
+    return query
+
+
+class AgendadorQueries:
+    """Ordena as queries de um livro pela taxa de sucesso observada.
+
+    Guarda no índice, por template de query e motor, quantas vezes a query
+    rodou e quantas renderam um PDF válido. A estimativa de cada par combina
+    essa taxa com a do motor (suavizada), então templates novos herdam a
+    reputação do motor e templates sem histórico não são penalizados.
+    """
+
+    def __init__(
+        self,
+        indice: IndiceCrawler,
+        taxa_exploracao: float = TAXA_EXPLORACAO,
+        min_tentativas_descarte: int = MIN_TENTATIVAS_DESCARTE,
+        aleatorio: Optional[random.Random] = None,
+    ):
+        self.indice = indice
+        self.taxa_exploracao = taxa_exploracao
+        self.min_tentativas_descarte = min_tentativas_descarte
+        self.aleatorio = aleatorio or random.Random()
+
+        # Métrica da execução atual
+        self.livros_encontrados = 0
+        self.queries_ate_sucesso = 0
+
+    def _taxas_motor(self, stats: dict[tuple[str, str], tuple[int, int]]) -> dict[str, float]:
+        totais: dict[str, list[int]] = {}
+        for (_, motor), (tentativas, sucessos) in stats.items():
+            total = totais.setdefault(motor, [0, 0])
+            total[0] += tentativas
+            total[1] += sucessos
+        # Laplace: motor sem histórico fica em 50%
+        return {motor: (s + 1) / (t + 2) for motor, (t, s) in totais.items()}
+
+    def ordenar(
+        self, queries: list[tuple[str, str]], termo: str, autor: str = "", titulo: str = ""
+    ) -> list[tuple[str, str]]:
+        """Reordena (query, motor) do maior para o menor rendimento esperado e
+        descarta templates que nunca renderam nada, mantendo alguns para explorar."""
+        stats = self.indice.estatisticas_queries()
+        if not stats:
+            return list(queries)
+        taxas_motor = self._taxas_motor(stats)
+
+        ativas, descartadas = [], []
+        for posicao, (query, motor) in enumerate(queries):
+            tentativas, sucessos = stats.get((chave_template(query, termo, autor, titulo), motor), (0, 0))
+            taxa_motor = taxas_motor.get(motor, 0.5)
+            estimativa = (sucessos + PESO_MOTOR * taxa_motor) / (tentativas + PESO_MOTOR)
+            item = (estimativa, posicao, query, motor)
+            if tentativas >= self.min_tentativas_descarte and sucessos == 0:
+                descartadas.append(item)
+            else:
+                ativas.append(item)
+
+        # Mesma estimativa: mantém a ordem original de gerar_queries_inteligentes
+        ativas.sort(key=lambda item: (-item[0], item[1]))
+        exploradas = [item for item in descartadas if self.aleatorio.random() < self.taxa_exploracao]
+        if descartadas:
+            log.debug("Agendador: %d queries descartadas, %d mantidas para exploração",
+                      len(descartadas) - len(exploradas), len(exploradas))
+        return [(query, motor) for _, _, query, motor in ativas + exploradas]
+
+    def registrar(self, query: str, motor: str, termo: str, sucesso: bool, autor: str = "", titulo: str = "") -> None:
+        """Registra o resultado de uma query executada."""
+        self.indice.registrar_query(chave_template(query, termo, autor, titulo), motor, sucesso)
+
+    def registrar_livro(self, termo: str, queries_executadas: int, sucesso: bool) -> None:
+        """Registra quantas queries o livro precisou (métrica do agendador)."""
+        self.indice.registrar_livro(termo, queries_executadas, sucesso)
+        if sucesso:
+            self.livros_encontrados += 1
+            self.queries_ate_sucesso += queries_executadas
+
+    def media_queries_por_sucesso(self) -> float:
+        """Queries por livro encontrado nesta execução."""
+        if not self.livros_encontrados:
+            return 0.0
+        return self.queries_ate_sucesso / self.livros_encontrados
@@ -1,46 +1,24 @@
 import asyncio
 import atexit
+import multiprocessing
 import os
-import shutil
-import zipfile
-import re
 from datetime import datetime
 import flet as ft
-from main import CrawlerBibliografia, DOWNLOAD_DIR, LISTA_LIVROS_PADRAO, NIVEIS_BUSCA
-
-
-def processar_lista_livros(texto: str) -> list[str]:
-    """
-    Processa e limpa a lista de livros de forma inteligente.
-    
-    Remove:
-    - Marcadores de lista (-, *, •, >, |)
-    - Numeração (1., 2), [3], etc)
-    - Espaços extras
-    - Linhas muito curtas (< 10 caracteres)
-    - Caracteres especiais no início
-    
-    Returns:
-        Lista de livros limpos e prontos para busca
-    """
-    linhas = [linha.strip() for linha in texto.split('\n') if linha.strip()]
-    livros_processados = []
-    
-    for linha in linhas:
-        # Remove marcadores de lista
-        linha = re.sub(r'^[-*•>|#]+\s*', '', linha)
-        # Remove numeração (1., 2), [3], etc)
-        linha = re.sub(r'^\[?\d+[\.\)\]]\s*', '', linha)
-        # Remove espaços extras
-        linha = ' '.join(linha.split())
-        # Remove caracteres inválidos
-        linha = linha.strip('.,;:')
-        
-        # Aceita apenas linhas com tamanho razoável
-        if linha and len(linha) > 10:
-            livros_processados.append(linha)
-    
-    return livros_processados
+from exportacao import ExportadorZip
+from main import (
+    CrawlerBibliografia,
+    CONCORRENCIA_MAXIMA,
+    CONCORRENCIA_PADRAO,
+    DOWNLOAD_DIR,
+    LISTA_LIVROS_PADRAO,
+    NIVEIS_BUSCA,
+    caminho_download,
+    criar_pagina,
+    fechar_indice,
+    obter_indice,
+    processar_lista_livros,
+)
+from navegador import GerenciadorNavegador
 
 
 class BibliografiaCrawlerApp:
@@ -58,19 +36,50 @@ class BibliografiaCrawlerApp:
         self.resultados = {"sucessos": [], "falhas": []}
         self.mensagem_status = None
         
+        # ZIP montado durante a busca, um PDF por vez ("Baixar ZIP" só fecha)
+        self.exportador = None
+        self.zip_exportado = ""
+        self.finalizando_zip = False
+        
+        # Chromium fica aberto enquanto o app roda: buscas seguintes não
+        # esperam a inicialização do navegador
+        self.navegador = GerenciadorNavegador(criar_pagina)
+        self.page.run_task(self.aquecer_navegador)
+        self.page.on_close = lambda e: self.page.run_task(self.navegador.fechar)
+        
         # Registra limpeza de PDFs ao fechar o app
         atexit.register(self.limpar_downloads)
         
         self.setup_ui()
     
+    async def aquecer_navegador(self):
+        """Inicia o Chromium em segundo plano, antes da primeira busca."""
+        try:
+            await self.navegador.iniciar()
+        except Exception as e:
+            # Sem navegador aqui, a busca tenta de novo (e mostra o erro)
+            print(f"⚠️ Navegador não iniciou: {e}")
+    
     def limpar_downloads(self):
-        """Remove todos os PDFs baixados ao fechar o app."""
+        """Remove os PDFs baixados (e arquivos parciais) ao fechar o app.
+        
+        O índice e o diário ficam na pasta: a memória de URLs, os caches
+        e as estatísticas de hosts e queries valem para a próxima sessão.
+        """
         try:
-            if os.path.exists(DOWNLOAD_DIR):
-                shutil.rmtree(DOWNLOAD_DIR)
-                print(f"✅ Pasta {DOWNLOAD_DIR} removida com sucesso")
+            if os.path.isdir(DOWNLOAD_DIR):
+                removidos = 0
+                for nome in os.listdir(DOWNLOAD_DIR):
+                    if nome.endswith((".pdf", ".part")):
+                        os.remove(os.path.join(DOWNLOAD_DIR, nome))
+                        removidos += 1
+                # Apagados, deixam de ser "já baixados" (e duplicatas) no índice
+                obter_indice().esquecer_pdfs_ausentes()
+                print(f"✅ {removidos} arquivos removidos de {DOWNLOAD_DIR}")
         except Exception as e:
             print(f"⚠️ Erro ao limpar downloads: {e}")
+        finally:
+            fechar_indice()
     
     def mostrar_mensagem(self, texto: str, cor=None):
         """Mostra mensagem de status."""
@@ -158,10 +167,24 @@ class BibliografiaCrawlerApp:
             value="moderado"
         )
         
+        # Quantos livros buscar ao mesmo tempo
+        self.concorrencia_slider = ft.Slider(
+            min=1,
+            max=CONCORRENCIA_MAXIMA,
+            divisions=CONCORRENCIA_MAXIMA - 1,
+            value=CONCORRENCIA_PADRAO,
+            label="{value} livros em paralelo",
+            width=300,
+        )
+        
         nivel_info = ft.Container(
             content=ft.Column([
                 ft.Text("⚙️ Níveis de Busca", weight=ft.FontWeight.BOLD, size=14),
                 self.nivel_selector,
+                ft.Row([
+                    ft.Text("📚 Livros em paralelo:", size=13),
+                    self.concorrencia_slider,
+                ], spacing=10, alignment=ft.MainAxisAlignment.CENTER),
                 ft.Text(
                     "� 32 queries × até 15 PDFs = 480 tentativas (moderado) | Extração avançada de links",
                     size=11,
@@ -365,6 +388,8 @@ class BibliografiaCrawlerApp:
         self.progresso_text.value = f"{icon} {livro[:60]}..."
         
         if status == "sucesso":
+            if self.exportador:
+                self.exportador.adicionar(caminho_download(livro))
             self.lista_sucessos.controls.append(
                 ft.Container(
                     content=ft.Text(f"✅ {livro}", size=12),
@@ -390,9 +415,27 @@ class BibliografiaCrawlerApp:
         
         self.page.update()
     
-    async def executar_crawler(self, lista_livros: list[str], nivel: str):
+    def atualizar_exportacao(self, adicionados: int, bytes_pdfs: int):
+        """Callback do ZIP: mais um PDF gravado nele."""
+        self.btn_download_zip.tooltip = f"{adicionados} PDFs ({bytes_pdfs / (1024 * 1024):.0f} MB) já no ZIP"
+        if self.finalizando_zip:
+            self.mostrar_mensagem(f"📦 Finalizando ZIP: {adicionados} PDFs...", ft.Colors.BLUE_700)
+    
+    def novo_exportador(self) -> ExportadorZip:
+        """ZIP temporário na pasta de downloads (apagado com ela se não for exportado)."""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return ExportadorZip(
+            os.path.join(DOWNLOAD_DIR, f"exportacao_{timestamp}.zip.part"),
+            callback_progresso=self.atualizar_exportacao,
+        )
+    
+    async def executar_crawler(self, lista_livros: list[str], nivel: str, concorrencia: int):
         """Executa o crawler de forma assíncrona."""
-        self.crawler = CrawlerBibliografia(callback_progresso=self.atualizar_progresso)
+        self.crawler = CrawlerBibliografia(
+            callback_progresso=self.atualizar_progresso,
+            concorrencia=concorrencia,
+            navegador=self.navegador,
+        )
         self.crawler.cancelar = False  # Reset flag
         
         try:
@@ -448,6 +491,13 @@ class BibliografiaCrawlerApp:
         self.sucessos_container.visible = False
         self.falhas_container.visible = False
         
+        # ZIP novo para esta busca (o da anterior, se não foi exportado, é descartado)
+        if self.exportador and not self.exportador.concluido:
+            asyncio.create_task(self.exportador.descartar())
+        self.exportador = self.novo_exportador()
+        self.zip_exportado = ""
+        self.btn_download_zip.tooltip = None
+        
         # Obtém e processa lista de livros
         texto = self.input_lista.value.strip()
         if not texto:
@@ -468,6 +518,7 @@ class BibliografiaCrawlerApp:
         print(f"{'='*60}\n")
             
         nivel = self.nivel_selector.value or "moderado"  #Default se None
+        concorrencia = int(self.concorrencia_slider.value or CONCORRENCIA_PADRAO)
         
         # Mapeia nível para quantidade de links
         niveis_info = {
@@ -479,7 +530,7 @@ class BibliografiaCrawlerApp:
         
         # Mostra informação sobre otimizações
         self.mostrar_mensagem(
-            f"📡 {len(lista_livros)} livros • {info_nivel} • Inclui Telegram",
+            f"📡 {len(lista_livros)} livros • {info_nivel} • {concorrencia} em paralelo • Inclui Telegram",
             ft.Colors.BLUE_700
         )
         
@@ -498,7 +549,7 @@ class BibliografiaCrawlerApp:
         asyncio.create_task(self._scroll_to_progress())
         
         # Executa crawler em thread assíncrona e salva a task
-        self.task_atual = asyncio.create_task(self.executar_crawler(lista_livros, nivel))
+        self.task_atual = asyncio.create_task(self.executar_crawler(lista_livros, nivel, concorrencia))
     
     def parar_busca(self, e):
         """Para a busca em andamento."""
@@ -524,40 +575,48 @@ class BibliografiaCrawlerApp:
         self.mostrar_mensagem("🛑 Busca interrompida com sucesso", ft.Colors.ORANGE_700)
         self.page.update()
     
-    def criar_zip(self, e):
-        """Cria arquivo ZIP com todos os PDFs baixados."""
-        if not os.path.exists(DOWNLOAD_DIR):
-            self.mostrar_mensagem("❌ Nenhum PDF encontrado", ft.Colors.RED_700)
+    async def criar_zip(self, e):
+        """Conclui o ZIP montado durante a busca e o salva na pasta atual."""
+        if self.finalizando_zip:
             return
-        
-        pdfs = [f for f in os.listdir(DOWNLOAD_DIR) if f.endswith('.pdf')]
-        if not pdfs:
+        if self.zip_exportado and os.path.exists(self.zip_exportado):
+            self.mostrar_mensagem(f"✅ ZIP já criado\n📁 {self.zip_exportado}", ft.Colors.GREEN_700)
+            return
+        if not os.path.exists(DOWNLOAD_DIR) or not any(f.endswith('.pdf') for f in os.listdir(DOWNLOAD_DIR)):
             self.mostrar_mensagem("❌ Nenhum PDF encontrado", ft.Colors.RED_700)
             return
         
+        # Sem ZIP em andamento (ou se o último falhou), monta um com a pasta toda
+        if self.exportador is None or self.exportador.concluido:
+            self.exportador = self.novo_exportador()
+        
         # Salva na pasta atual com timestamp
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         zip_path = f"bibliografia_{timestamp}.zip"
         
+        self.finalizando_zip = True
+        self.mostrar_mensagem("📦 Finalizando ZIP...", ft.Colors.BLUE_700)
         try:
-            # Cria o ZIP
-            with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                for pdf in pdfs:
-                    pdf_path = os.path.join(DOWNLOAD_DIR, pdf)
-                    zipf.write(pdf_path, pdf)
+            # Só falta o que ainda está na fila e os PDFs de buscas anteriores
+            total = await self.exportador.concluir(zip_path, pasta=DOWNLOAD_DIR)
             
             caminho_completo = os.path.abspath(zip_path)
+            self.zip_exportado = caminho_completo
             # Mostra mensagem de sucesso com caminho
             self.mostrar_mensagem(
-                f"✅ ZIP criado com {len(pdfs)} PDFs\n📁 {caminho_completo}", 
+                f"✅ ZIP criado com {total} PDFs\n📁 {caminho_completo}", 
                 ft.Colors.GREEN_700
             )
         except Exception as ex:
             self.mostrar_mensagem(f"❌ Erro ao criar ZIP: {ex}", ft.Colors.RED_700)
+        finally:
+            self.finalizando_zip = False
     
 def main(page: ft.Page):
     BibliografiaCrawlerApp(page)
 
 
 if __name__ == "__main__":
+    # Executável congelado: os processos do pool de validação (spawn) param aqui
+    multiprocessing.freeze_support()
     ft.run(main)
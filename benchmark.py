@@ -0,0 +1,792 @@
+"""Benchmarks locais do crawler.
+
+Uso:
+    uv run python benchmark.py download [--arquivos 20] [--tamanho-mb 8] [--paralelos 4]
+    uv run python benchmark.py serp --fixtures pasta [--salvar "query"]
+    uv run python benchmark.py validacao [--pdf livro.pdf --termo "..."] [--paginas 200]
+    uv run python benchmark.py crawler [--livros 20] [--concorrencia 3] [--json medidas.json]
+
+download: gera PDFs sintéticos numa pasta temporária, serve por HTTP/1.1
+com keep-alive (em outro processo, para não contar a CPU do servidor) e
+baixa todos com cada backend: "urllib" (uma conexão por download, em
+thread), "httpx" (pool de conexões) e "playwright" (page.request, se o
+Chromium estiver instalado). Mostra throughput e CPU por MB baixado.
+
+serp: mede, sobre páginas de resultado salvas (<motor>.html renderizada
+no navegador, <motor>_html.html da versão estática), a latência e os links
+PDF da extração dirigida de cada motor contra a extração da página toda.
+Com --salvar, antes baixa essas páginas para a query dada. fixtures_serp/
+(a pasta padrão) traz páginas reduzidas de Bing, DuckDuckGo e Google, com
+a marcação de cada motor (blocos orgânicos, links de redirecionamento,
+anúncios e buscas relacionadas com PDFs fora dos resultados), para a
+medida rodar sem rede; --salvar grava as páginas reais por cima.
+
+validacao: latência da checagem de conteúdo de validar_pdf, por página
+(extração do texto × comparação) e por documento, comparando a versão
+antiga (texto das 10 páginas concatenado, depois comparado) com a busca
+página a página com saída antecipada. Sem --pdf, gera um livro
+"escaneado" sintético: cada página é uma imagem com uma camada de texto
+de OCR por cima.
+
+crawler: ponta a ponta e offline. Um servidor local faz as vezes dos
+motores de busca (páginas de resultado no formato de cada um) e dos sites
+de download, com PDFs sintéticos: o certo, curtos demais, de outro livro,
+HTML numa URL .pdf, lentos e enormes. Roda buscar_e_baixar livro a livro e
+depois CrawlerBibliografia.executar com a lista toda, cada fase com índice
+novo, e mostra livros/min, p50/p95 do tempo até o PDF válido, pico de RSS
+e bytes desperdiçados (enviados pelo servidor e não mantidos). Por padrão
+todos os motores vão por HTTP simples e sem os limites de requisições/s;
+--json grava as medidas para comparar entre versões.
+"""
+import argparse
+import asyncio
+import functools
+import hashlib
+import html
+import http.server
+import json
+import math
+import multiprocessing
+import os
+import random
+import resource
+import shutil
+import socket
+import tempfile
+import threading
+import time
+import unicodedata
+import urllib.request
+from urllib.parse import parse_qs, urlparse
+
+import pymupdf
+
+import main
+import validacao
+from limitador import LimitadorTaxa
+from motores import MOTORES, MotorBusca, extrair_links_html, obter_motor
+
+
+def _servir(pasta: str, porta: int) -> None:
+    class Handler(http.server.SimpleHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+
+        def log_message(self, *args):
+            pass
+
+    handler = functools.partial(Handler, directory=pasta)
+    http.server.ThreadingHTTPServer(("127.0.0.1", porta), handler).serve_forever()
+
+
+def _porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def gerar_arquivos(pasta: str, quantidade: int, tamanho_mb: float) -> list[str]:
+    """Arquivos com assinatura de PDF e corpo aleatório (não precisam abrir)."""
+    corpo = os.urandom(int(tamanho_mb * 1024 * 1024))
+    nomes = []
+    for i in range(quantidade):
+        nome = f"livro_{i}.pdf"
+        with open(os.path.join(pasta, nome), "wb") as f:
+            f.write(b"%PDF-1.7\n" + corpo)
+        nomes.append(nome)
+    return nomes
+
+
+async def _baixar_todos(baixar, urls: list[str], destino: str, paralelos: int) -> int:
+    """Baixa as URLs com no máximo `paralelos` simultâneos. Retorna os bytes baixados."""
+    semaforo = asyncio.Semaphore(paralelos)
+    total = 0
+
+    async def um(i: int, url: str) -> None:
+        nonlocal total
+        caminho = os.path.join(destino, f"{i}.pdf")
+        async with semaforo:
+            if await baixar(url, caminho):
+                total += os.path.getsize(caminho)
+                os.remove(caminho)
+
+    await asyncio.gather(*(um(i, url) for i, url in enumerate(urls)))
+    return total
+
+
+async def medir(nome: str, baixar, urls: list[str], destino: str, paralelos: int) -> None:
+    inicio, cpu_inicio = time.perf_counter(), time.process_time()
+    total = await _baixar_todos(baixar, urls, destino, paralelos)
+    duracao = time.perf_counter() - inicio
+    cpu = time.process_time() - cpu_inicio
+    mb = total / (1024 * 1024)
+    if not mb:
+        print(f"{nome:<11} falhou (nenhum arquivo baixado)")
+        return
+    print(f"{nome:<11} {mb:8.0f} MB  {duracao:6.2f} s  {mb / duracao:8.1f} MB/s  "
+          f"{cpu / mb * 1000:6.2f} ms CPU/MB")
+
+
+async def executar(urls: list[str], destino: str, paralelos: int) -> None:
+    # Mensagens de cada download poluem a tabela
+    main.log.setLevel("WARNING")
+
+    for backend in ("urllib", "httpx"):
+        if backend == "httpx" and main.httpx is None:
+            print("httpx      não instalado (uv sync --extra http)")
+            continue
+
+        async def baixar(url, caminho, backend=backend):
+            hash_pdf, _ = await main.baixar_pdf(url, caminho, backend=backend)
+            return bool(hash_pdf)
+
+        await medir(backend, baixar, urls, destino, paralelos)
+    await main.fechar_cliente_http()
+
+    # Caminho antigo: tudo pelo processo do navegador
+    try:
+        async with main.async_playwright() as p:
+            browser = await p.chromium.launch(headless=True)
+            context = await browser.new_context(user_agent=main.UA.random)
+
+            async def baixar_playwright(url, caminho):
+                response = await context.request.get(url, timeout=60000)
+                if not response.ok:
+                    return False
+                with open(caminho, "wb") as f:
+                    f.write(await response.body())
+                return True
+
+            await medir("playwright", baixar_playwright, urls, destino, paralelos)
+            await browser.close()
+    except Exception as e:
+        print(f"playwright indisponível: {str(e).splitlines()[0][:80]}")
+
+
+async def salvar_fixtures(pasta: str, query: str) -> None:
+    """Salva a página de resultados de cada motor (navegador e HTML estático)."""
+    os.makedirs(pasta, exist_ok=True)
+    for nome, motor in MOTORES.items():
+        if motor.modelo_html:
+            status, html = await asyncio.to_thread(main._baixar_html, motor.url_html(query))
+            if status == 200:
+                with open(os.path.join(pasta, f"{nome}_html.html"), "w", encoding="utf-8") as f:
+                    f.write(html)
+            print(f"{nome:<11} HTML estático: HTTP {status}")
+    async with main.async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        page = await main.criar_pagina(browser)
+        for nome, motor in MOTORES.items():
+            try:
+                await page.goto(motor.url(query), wait_until="domcontentloaded", timeout=20000)
+                await motor.aguardar_resultados(page)
+                with open(os.path.join(pasta, f"{nome}.html"), "w", encoding="utf-8") as f:
+                    f.write(await page.content())
+                print(f"{nome:<11} navegador: salvo")
+            except Exception as e:
+                print(f"{nome:<11} navegador: {str(e)[:80]}")
+        await browser.close()
+
+
+def _cronometrar(funcao, repeticoes: int) -> tuple[float, list[str]]:
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        links = funcao()
+    return (time.perf_counter() - inicio) / repeticoes * 1000, links
+
+
+async def medir_serp(pasta: str, repeticoes: int) -> None:
+    arquivos = sorted(f for f in os.listdir(pasta) if f.endswith(".html"))
+    if not arquivos:
+        print(f"Nenhuma página salva em {pasta} (use --salvar)")
+        return
+
+    print(f"{'página':<22} {'extrator':<9} {'ms':>7} {'links':>6} {'únicos':>7}")
+    paginas_navegador = []
+    for arquivo in arquivos:
+        nome = arquivo[:-len(".html")]
+        motor = obter_motor(nome.removesuffix("_html"))
+        with open(os.path.join(pasta, arquivo), encoding="utf-8", errors="replace") as f:
+            html = f.read()
+        url_base = motor.url_html("") if nome.endswith("_html") else motor.url("")
+        medidas = [("página", lambda: extrair_links_html(html, url_base))]
+        if motor.bloco_html:
+            medidas.append(("motor", lambda: motor.extrair_html(html, url_base)))
+        for extrator, funcao in medidas:
+            ms, links = _cronometrar(funcao, repeticoes)
+            print(f"{arquivo:<22} {extrator:<9} {ms:7.2f} {len(links):6d} {len(set(links)):7d}")
+        if not nome.endswith("_html"):
+            paginas_navegador.append((arquivo, motor, html))
+
+    # Seletores CSS dos adaptadores só rodam no navegador
+    try:
+        async with main.async_playwright() as p:
+            browser = await p.chromium.launch(headless=True)
+            page = await browser.new_page()
+            await page.route("**/*", lambda route: route.abort())  # só o HTML salvo
+            print()
+            for arquivo, motor, html in paginas_navegador:
+                await page.set_content(html)
+                for extrator, funcao in (("página", lambda: main.extrair_links_pagina(page)),
+                                         ("motor", lambda: motor.extrair(page))):
+                    inicio = time.perf_counter()
+                    for _ in range(repeticoes):
+                        links = await funcao()
+                    ms = (time.perf_counter() - inicio) / repeticoes * 1000
+                    print(f"{arquivo:<22} {extrator + ' JS':<9} {ms:7.2f} {len(links):6d} {len(set(links)):7d}")
+            await browser.close()
+    except Exception as e:
+        print(f"\nextração no navegador indisponível: {str(e).splitlines()[0][:80]}")
+
+
+def gerar_livro_escaneado(caminho: str, paginas: int, titulo: str) -> None:
+    """PDF com uma imagem de página inteira e texto de OCR em cada página."""
+    largura, altura = 1240, 1754  # A4 a 150 dpi
+    # Ruído não comprime: pior caso para o tamanho do arquivo
+    imagem = pymupdf.Pixmap(pymupdf.csGRAY, largura, altura, os.urandom(largura * altura), False)
+    jpeg = imagem.tobytes("jpg")
+    corpo = ("Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod "
+             "tempor incididunt ut labore et dolore magna aliqua. ") * 30
+    doc = pymupdf.open()
+    for i in range(paginas):
+        pagina = doc.new_page()
+        # Bytes após o fim do JPEG tornam cada imagem única (o pymupdf deduplica iguais)
+        pagina.insert_image(pagina.rect, stream=jpeg + i.to_bytes(4, "big"))
+        # Título e autor só na página de rosto (3ª), como num livro de verdade
+        texto = f"{titulo}\n\n{corpo}" if i == 2 else corpo
+        pagina.insert_textbox(pagina.rect + (50, 50, -50, -50), texto, fontsize=9, render_mode=3)
+    doc.save(caminho)
+    doc.close()
+
+
+def _remover_acentos_antigo(texto: str) -> str:
+    return ''.join(c for c in unicodedata.normalize('NFD', texto)
+                   if unicodedata.category(c) != 'Mn')
+
+
+def _conteudo_antigo(caminho: str, termo: str) -> bool:
+    """Checagem de conteúdo antes da busca página a página, para referência."""
+    doc = pymupdf.open(caminho)
+    metadata = doc.metadata or {}
+    texto = ""
+    for i in range(min(validacao.PAGINAS_CONTEUDO, len(doc))):
+        texto += " " + doc[i].get_text().lower()
+    texto += f" {metadata.get('title', '')} {metadata.get('author', '')}".lower()
+    doc.close()
+    texto = _remover_acentos_antigo(texto)
+    palavras = [_remover_acentos_antigo(p.lower()) for p in termo.split()
+                if len(p) > 3 and p.lower() not in validacao.PALAVRAS_IGNORAR]
+    return not palavras or sum(p in texto for p in palavras) / len(palavras) >= validacao.LIMIAR_CONTEUDO
+
+
+def medir_paginas(caminho: str, termo: str) -> None:
+    """Custo por página: extrair o texto × normalizar e comparar."""
+    doc = pymupdf.open(caminho)
+    extracao = antigo = novo = 0.0
+    n = min(validacao.PAGINAS_CONTEUDO, len(doc))
+    for i in range(n):
+        inicio = time.perf_counter()
+        texto = doc[i].get_text()
+        extracao += time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        palavras = [_remover_acentos_antigo(p.lower()) for p in termo.split() if len(p) > 3]
+        normalizado = _remover_acentos_antigo(texto.lower())
+        sum(p in normalizado for p in palavras)
+        antigo += time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        validacao.BuscaTermo(termo).alimentar(texto)
+        novo += time.perf_counter() - inicio
+    doc.close()
+    print(f"por página ({n} páginas): extração {extracao / n * 1000:.2f} ms, "
+          f"comparação antiga {antigo / n * 1000:.3f} ms, nova {novo / n * 1000:.3f} ms")
+
+
+# Livros sintéticos do benchmark do crawler: "<complemento> de <assunto> Volume N Autor"
+ASSUNTOS = ("Algoritmos", "Cálculo", "Geometria", "Topologia", "Estatística",
+            "Termodinâmica", "Eletromagnetismo", "Microeconomia", "Bioquímica", "Compiladores")
+COMPLEMENTOS = ("Fundamentos", "Princípios", "Elementos", "Tratado")
+AUTORES = ("Ana Souza", "Bruno Lima", "Carla Mendes", "Diego Rocha", "Elisa Prado")
+TITULO_ERRADO = ("Manual Prático de Jardinagem Ornamental", "Carlos Pereira")
+PAGINAS_LIVRO = 60
+PAGINAS_CURTO = 10
+# Candidatos ruins por página de resultados falsa, sorteados com estes pesos;
+# o PDF certo entra (ou não) à parte, com a chance de --chance-valido
+CANDIDATOS_POR_PAGINA = 4
+MISTURA_CANDIDATOS = {"html": 3, "curto": 3, "titulo_errado": 3, "lento": 1, "enorme": 0.1}
+# Blocos de resultado de cada motor falso (tag, classe); os demais usam o padrão
+BLOCOS_SERP = {"bing": ("li", "b_algo"), "duckduckgo": ("div", "result")}
+BLOCO_SERP_PADRAO = ("div", "resultado")
+# Sites de download falsos, um por porta (o limite de conexões é por host:porta)
+SITES_FALSOS = 4
+
+
+def livros_sinteticos(quantidade: int) -> list[str]:
+    livros = []
+    for i in range(quantidade):
+        assunto = ASSUNTOS[i % len(ASSUNTOS)]
+        complemento = COMPLEMENTOS[i // len(ASSUNTOS) % len(COMPLEMENTOS)]
+        livros.append(f"{complemento} de {assunto} Volume {i + 1} {AUTORES[i % len(AUTORES)]}")
+    return livros
+
+
+def gerar_pdf(caminho: str, titulo: str, autor: str, paginas: int, tamanho_mb: float, semente: str) -> None:
+    """PDF com texto em cada página, título e autor nos metadados e um anexo
+    aleatório (não comprime) para chegar perto de `tamanho_mb`."""
+    doc = pymupdf.open()
+    for i in range(paginas):
+        pagina = doc.new_page()
+        texto = f"{titulo}\n\n{autor}" if i == 0 else f"Capítulo {i}\n\n{titulo}"
+        pagina.insert_textbox(pagina.rect + (72, 72, -72, -72), texto, fontsize=14)
+    doc.set_metadata({"title": titulo, "author": autor})
+    doc.embfile_add("dados.bin", random.Random(semente).randbytes(int(tamanho_mb * 1024 * 1024)))
+    doc.save(caminho)
+    doc.close()
+
+
+def gerar_acervo(pasta: str, livros: list[str], tamanho_mb: float) -> None:
+    """Para cada livro: o PDF certo, outra edição (servida devagar) e um
+    curto demais; mais um PDF de outro livro, comum a todos."""
+    for i, termo in enumerate(livros):
+        autor, titulo = main.separar_autor_titulo(termo)
+        gerar_pdf(os.path.join(pasta, f"valido_{i}.pdf"), titulo, autor, PAGINAS_LIVRO, tamanho_mb, f"{i}")
+        gerar_pdf(os.path.join(pasta, f"lento_{i}.pdf"), titulo, autor, PAGINAS_LIVRO, tamanho_mb, f"{i}-lento")
+        gerar_pdf(os.path.join(pasta, f"curto_{i}.pdf"), titulo, autor, PAGINAS_CURTO, tamanho_mb / 4, f"{i}-curto")
+    gerar_pdf(os.path.join(pasta, "titulo_errado.pdf"), *TITULO_ERRADO, PAGINAS_LIVRO, tamanho_mb, "errado")
+
+
+def livros_sem_pdf(quantidade: int, fracao: float) -> set[int]:
+    """Índices dos livros que nenhuma busca encontra (espalhados pela lista)."""
+    return {i for i in range(quantidade) if int((i + 1) * fracao) > int(i * fracao)}
+
+
+def candidatos_da_busca(
+    livro: int, query: str, sem_pdf: bool, chance_valido: float
+) -> list[tuple[str, int, str]]:
+    """(tipo, site, caminho) dos resultados de uma query. Determinístico: a
+    mesma query traz sempre os mesmos candidatos, em URLs só dela."""
+    sorteio = random.Random(f"{livro}|{query}")
+    # "lento" é outra edição válida: não aparece para quem não tem PDF
+    mistura = {tipo: peso for tipo, peso in MISTURA_CANDIDATOS.items() if not (sem_pdf and tipo == "lento")}
+    tipos = sorteio.choices(list(mistura), weights=list(mistura.values()), k=CANDIDATOS_POR_PAGINA)
+    if not sem_pdf and sorteio.random() < chance_valido:
+        tipos.insert(sorteio.randrange(len(tipos) + 1), "valido")
+    chave = hashlib.sha1(query.encode()).hexdigest()[:10]
+    return [(tipo, sorteio.randrange(SITES_FALSOS), f"/arquivo/{tipo}/{livro}/{chave}_{i}.pdf")
+            for i, tipo in enumerate(tipos)]
+
+
+def _servir_crawler(
+    pasta: str,
+    portas: list[int],
+    livros: list[str],
+    sem_pdf: set[int],
+    chance_valido: float,
+    lento_kbps: float,
+) -> None:
+    """Motores de busca e sites de PDF falsos, num processo separado (um
+    servidor por porta de `portas`, todos iguais).
+
+    GET /<motor>/busca?q=... devolve uma página de resultados no formato do
+    motor; GET /arquivo/<tipo>/<livro>/... serve o candidato: "valido",
+    "curto" e "titulo_errado" com suporte a Range, "html" (página de login
+    numa URL .pdf), "lento" (outra edição válida, a `lento_kbps`) e "enorme"
+    (sem Content-Length nem Range, até passar de TAMANHO_MAXIMO_MB).
+    GET /estatisticas devolve os bytes enviados e as requisições por tipo;
+    GET /zerar zera as contagens.
+    """
+    titulos = sorted(((main.separar_autor_titulo(termo)[1].lower(), i) for i, termo in enumerate(livros)),
+                     key=lambda item: -len(item[0]))
+    trava = threading.Lock()
+    contagem = {"bytes_enviados": 0, "requisicoes": {}}
+    pagina_login = ("<html><head><title>Entrar</title></head><body><form>"
+                    + "<p>Faça login para baixar este documento.</p>" * 600 + "</form></body></html>").encode()
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _contar(self, tipo: str = "", enviados: int = 0) -> None:
+            with trava:
+                contagem["bytes_enviados"] += enviados
+                if tipo:
+                    contagem["requisicoes"][tipo] = contagem["requisicoes"].get(tipo, 0) + 1
+
+        def _enviar(self, dados: bytes) -> None:
+            self.wfile.write(dados)
+            self._contar(enviados=len(dados))
+
+        def _responder(self, status: int, tipo_conteudo: str, corpo: bytes, contar: bool = False) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", tipo_conteudo)
+            self.send_header("Content-Length", str(len(corpo)))
+            self.end_headers()
+            if contar:
+                self._enviar(corpo)
+            else:
+                self.wfile.write(corpo)
+
+        def do_GET(self):
+            partes = urlparse(self.path)
+            try:
+                if partes.path == "/estatisticas":
+                    with trava:
+                        corpo = json.dumps(contagem).encode()
+                    self._responder(200, "application/json", corpo)
+                elif partes.path == "/zerar":
+                    with trava:
+                        contagem["bytes_enviados"] = 0
+                        contagem["requisicoes"] = {}
+                    self._responder(200, "application/json", b"{}")
+                elif partes.path.startswith("/arquivo/"):
+                    _, _, tipo, livro, _ = partes.path.split("/", 4)
+                    self._contar(tipo)
+                    self._arquivo(tipo, int(livro))
+                else:
+                    self._contar("serp")
+                    motor = partes.path.strip("/").split("/")[0]
+                    query = (parse_qs(partes.query).get("q") or [""])[0]
+                    self._responder(200, "text/html; charset=utf-8", self._serp(motor, query).encode())
+            except (BrokenPipeError, ConnectionResetError):
+                # O crawler desistiu no meio (limite de tamanho, outro candidato venceu)
+                self.close_connection = True
+
+        def _serp(self, motor: str, query: str) -> str:
+            texto = query.lower().replace("+", " ").replace('"', "")
+            livro = next((i for titulo, i in titulos if titulo in texto), None)
+            tag, classe = BLOCOS_SERP.get(motor, BLOCO_SERP_PADRAO)
+            lista = "ol" if tag == "li" else "div"
+            blocos = []
+            if livro is not None:
+                for tipo, site, caminho in candidatos_da_busca(livro, query, livro in sem_pdf, chance_valido):
+                    blocos.append(f'<{tag} class="{classe}"><h2><a href="http://127.0.0.1:{portas[site]}{caminho}">'
+                                  f'{html.escape(livros[livro])}</a></h2><p>Resultado ({tipo})</p></{tag}>')
+            return (f"<html><head><title>{html.escape(query)}</title></head><body>"
+                    f'<{lista} id="resultados">{"".join(blocos)}</{lista}></body></html>')
+
+        def _arquivo(self, tipo: str, livro: int) -> None:
+            if tipo == "html":
+                self._responder(200, "text/html; charset=utf-8", pagina_login, contar=True)
+            elif tipo == "enorme":
+                self.send_response(200)
+                self.send_header("Content-Type", "application/pdf")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+                bloco = bytes(1024 * 1024)
+                self._enviar(b"%PDF-1.7\n")
+                for _ in range(main.TAMANHO_MAXIMO_MB + 16):
+                    self._enviar(bloco)
+            else:
+                nome = "titulo_errado.pdf" if tipo == "titulo_errado" else f"{tipo}_{livro}.pdf"
+                self._pdf(os.path.join(pasta, nome), aceita_range=tipo != "lento",
+                          pausa=64 / lento_kbps if tipo == "lento" else 0)
+
+        def _pdf(self, caminho: str, aceita_range: bool, pausa: float) -> None:
+            total = os.path.getsize(caminho)
+            inicio, fim = 0, total - 1
+            faixa = self.headers.get("Range", "") if aceita_range else ""
+            if faixa.startswith("bytes="):
+                a, _, b = faixa[len("bytes="):].partition("-")
+                if a:
+                    inicio, fim = int(a), min(int(b) if b else total - 1, total - 1)
+                else:
+                    inicio = max(0, total - int(b))
+            self.send_response(206 if faixa else 200)
+            self.send_header("Content-Type", "application/pdf")
+            self.send_header("Content-Length", str(fim - inicio + 1))
+            if faixa:
+                self.send_header("Content-Range", f"bytes {inicio}-{fim}/{total}")
+            self.end_headers()
+            with open(caminho, "rb") as f:
+                f.seek(inicio)
+                restante = fim - inicio + 1
+                while restante > 0:
+                    bloco = f.read(min(restante, 64 * 1024 if pausa else main.TAMANHO_BLOCO))
+                    self._enviar(bloco)
+                    restante -= len(bloco)
+                    if pausa:
+                        time.sleep(pausa)
+
+    servidores = [http.server.ThreadingHTTPServer(("127.0.0.1", porta), Handler) for porta in portas]
+    for servidor in servidores[1:]:
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    servidores[0].serve_forever()
+
+
+def motores_locais(base: str, navegador: bool) -> dict[str, MotorBusca]:
+    """Cópias dos motores apontando para o servidor falso. Sem navegador,
+    todos ganham versão HTML estática; com ele, só os que já têm."""
+    locais = {}
+    for nome, motor in MOTORES.items():
+        tag, classe = BLOCOS_SERP.get(nome, BLOCO_SERP_PADRAO)
+        modelo = f"{base}/{nome}/busca?q={{query}}&o={{offset}}"
+        locais[nome] = MotorBusca(
+            nome,
+            modelo,
+            seletor_pronto="#resultados",
+            seletor_resultados=f"#resultados > {tag}.{classe}",
+            resultados_por_pagina=motor.resultados_por_pagina,
+            offset_inicial=motor.offset_inicial,
+            modelo_html=modelo if motor.modelo_html or not navegador else None,
+            bloco_html=(tag, classe),
+        )
+    return locais
+
+
+class _SemNavegador:
+    """Faz as vezes do GerenciadorNavegador quando todos os motores têm HTML
+    estático: nenhuma página é aberta (o crawler recebe None)."""
+
+    async def nova_pagina(self):
+        return None
+
+    async def conferir_pagina(self, page):
+        return page
+
+    async def devolver_pagina(self, page):
+        return page
+
+    async def liberar_pagina(self, page) -> None:
+        pass
+
+    async def fechar(self) -> None:
+        pass
+
+    def resumo(self) -> str:
+        return "não usado"
+
+
+def _get_json(url: str) -> dict:
+    with urllib.request.urlopen(url, timeout=10) as response:
+        return json.loads(response.read())
+
+
+def _percentil(valores: list[float], fracao: float) -> float:
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, max(0, math.ceil(fracao * len(ordenados)) - 1))]
+
+
+def _encerrar_pool_validacao() -> None:
+    """Espera os processos da validação saírem, para entrarem no RUSAGE_CHILDREN."""
+    if main._pool_validacao is not None:
+        main._pool_validacao.shutdown(wait=True)
+        main._pool_validacao = None
+
+
+async def medir_fase(nome: str, rodar, livros: list[str], base: str, pasta: str) -> dict:
+    """Roda uma fase numa pasta (índice, cache e diário) nova e mede."""
+    main.DOWNLOAD_DIR = tempfile.mkdtemp(prefix=f"{nome}_", dir=pasta)
+    main.fechar_indice()
+    main._bloqueios_html.clear()
+    await asyncio.to_thread(_get_json, f"{base}/zerar")
+    resultados: list[dict] = []
+
+    inicio = time.perf_counter()
+    await rodar(resultados.append)
+    duracao = time.perf_counter() - inicio
+
+    main.fechar_indice()
+    _encerrar_pool_validacao()
+    servidor = await asyncio.to_thread(_get_json, f"{base}/estatisticas")
+    mantidos = sum(os.path.getsize(os.path.join(main.DOWNLOAD_DIR, f))
+                   for f in os.listdir(main.DOWNLOAD_DIR) if f.endswith(".pdf"))
+    tempos = [r["segundos"] for r in resultados if r.get("status") == "sucesso"]
+    return {
+        "fase": nome,
+        "livros": len(livros),
+        "encontrados": len(tempos),
+        "segundos": round(duracao, 2),
+        "livros_por_minuto": round(len(resultados) / duracao * 60, 1),
+        "p50_segundos": _percentil(tempos, 0.5),
+        "p95_segundos": _percentil(tempos, 0.95),
+        # ru_maxrss é o pico desde o início do benchmark (KB no Linux)
+        "rss_pico_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024),
+        "rss_pico_filhos_mb": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024),
+        "bytes_enviados": servidor["bytes_enviados"],
+        "bytes_desperdicados": max(0, servidor["bytes_enviados"] - mantidos),
+        "requisicoes": servidor["requisicoes"],
+    }
+
+
+def imprimir_fase(medida: dict) -> None:
+    mb = 1024 * 1024
+    print(f"{medida['fase']:<10} {medida['encontrados']:3d}/{medida['livros']:<3d} "
+          f"{medida['segundos']:7.1f} s  {medida['livros_por_minuto']:7.1f} livros/min  "
+          f"p50 {medida['p50_segundos']:5.2f} s  p95 {medida['p95_segundos']:5.2f} s  "
+          f"RSS {medida['rss_pico_mb']} MB (+{medida['rss_pico_filhos_mb']} MB validação)  "
+          f"{medida['bytes_enviados'] / mb:6.0f} MB recebidos, "
+          f"{medida['bytes_desperdicados'] / mb:.0f} MB desperdiçados")
+    print(f"{'':<10} requisições: " + ", ".join(f"{tipo} {n}" for tipo, n in sorted(medida["requisicoes"].items())))
+
+
+async def medir_crawler(args, livros: list[str], base: str, pasta: str) -> list[dict]:
+    if args.navegador:
+        navegador = main.GerenciadorNavegador(main.criar_pagina)
+    else:
+        navegador = _SemNavegador()
+    medidas = []
+    try:
+        async def sequencial(callback):
+            page = await navegador.nova_pagina()
+            try:
+                for livro in livros:
+                    await main.buscar_e_baixar(page, livro, nivel=args.nivel, callback_resultado=callback)
+            finally:
+                await navegador.liberar_pagina(page)
+                await main.fechar_cliente_http()
+
+        async def paralelo(callback):
+            crawler = main.CrawlerBibliografia(concorrencia=args.concorrencia, navegador=navegador,
+                                               callback_resultado=callback)
+            await crawler.executar(livros, nivel=args.nivel)
+
+        for nome, rodar in (("sequencial", sequencial), ("executar", paralelo)):
+            medida = await medir_fase(nome, rodar, livros, base, pasta)
+            imprimir_fase(medida)
+            medidas.append(medida)
+    finally:
+        await navegador.fechar()
+    return medidas
+
+
+def benchmark_validacao(args) -> None:
+    main.log.setLevel("ERROR")
+    validacao.log.setLevel("ERROR")
+    pasta = None
+    caminho = args.pdf
+    if not caminho:
+        pasta = tempfile.mkdtemp(prefix="bench_validacao_")
+        caminho = os.path.join(pasta, "escaneado.pdf")
+        inicio = time.perf_counter()
+        gerar_livro_escaneado(caminho, args.paginas, args.termo)
+        print(f"livro sintético: {args.paginas} páginas, "
+              f"{os.path.getsize(caminho) / (1024 * 1024):.0f} MB ({time.perf_counter() - inicio:.1f}s)")
+    try:
+        medir_paginas(caminho, args.termo)
+        for nome, validar in (("antiga", lambda: _conteudo_antigo(caminho, args.termo)),
+                              ("nova", lambda: validacao._analisar_pdf(caminho, args.termo, hash_pdf="-")[0])):
+            inicio = time.perf_counter()
+            for _ in range(args.repeticoes):
+                valido = validar()
+            ms = (time.perf_counter() - inicio) / args.repeticoes * 1000
+            print(f"por documento, {nome:<7} {ms:8.2f} ms  {'válido' if valido else 'rejeitado'}")
+    finally:
+        if pasta:
+            shutil.rmtree(pasta, ignore_errors=True)
+
+
+def benchmark_download(args) -> None:
+    pasta = tempfile.mkdtemp(prefix="bench_pdfs_")
+    destino = tempfile.mkdtemp(prefix="bench_downloads_")
+    porta = _porta_livre()
+    servidor = multiprocessing.Process(target=_servir, args=(pasta, porta), daemon=True)
+    try:
+        nomes = gerar_arquivos(pasta, args.arquivos, args.tamanho_mb)
+        servidor.start()
+        time.sleep(0.5)
+        urls = [f"http://127.0.0.1:{porta}/{nome}" for nome in nomes]
+        print(f"{args.arquivos} arquivos de {args.tamanho_mb:g} MB, {args.paralelos} em paralelo\n")
+        asyncio.run(executar(urls, destino, args.paralelos))
+    finally:
+        servidor.terminate()
+        shutil.rmtree(pasta, ignore_errors=True)
+        shutil.rmtree(destino, ignore_errors=True)
+
+
+def benchmark_serp(args) -> None:
+    main.log.setLevel("WARNING")
+    if args.salvar:
+        asyncio.run(salvar_fixtures(args.fixtures, args.salvar))
+    asyncio.run(medir_serp(args.fixtures, args.repeticoes))
+
+
+def benchmark_crawler(args) -> None:
+    main.log.setLevel("ERROR")
+    validacao.log.setLevel("ERROR")
+    pasta = tempfile.mkdtemp(prefix="bench_crawler_")
+    portas = [_porta_livre() for _ in range(SITES_FALSOS)]
+    base = f"http://127.0.0.1:{portas[0]}"
+    livros = livros_sinteticos(args.livros)
+    sem_pdf = livros_sem_pdf(args.livros, args.sem_pdf)
+    servidor = multiprocessing.Process(
+        target=_servir_crawler,
+        args=(pasta, portas, livros, sem_pdf, args.chance_valido, args.lento_kbps),
+        daemon=True,
+    )
+    motores_originais = dict(MOTORES)
+    diretorio_original = main.DOWNLOAD_DIR
+    try:
+        inicio = time.perf_counter()
+        gerar_acervo(pasta, livros, args.tamanho_mb)
+        print(f"{args.livros} livros ({len(sem_pdf)} sem PDF), PDFs de {args.tamanho_mb:g} MB "
+              f"gerados em {time.perf_counter() - inicio:.1f}s; nível {args.nivel}, "
+              f"concorrência {args.concorrencia}, {'navegador' if args.navegador else 'só HTML estático'}\n")
+        servidor.start()
+        time.sleep(0.5)
+        MOTORES.update(motores_locais(base, args.navegador))
+        if not args.taxas_reais:
+            # Sem as esperas entre requisições: mede o crawler, não a educação dele
+            sem_limite = (1e6, 1e6)
+            main.limitador_motores = LimitadorTaxa(taxa_padrao=sem_limite, jitter=0)
+            main.limitador_hosts = LimitadorTaxa(taxa_padrao=sem_limite, jitter=0)
+        medidas = asyncio.run(medir_crawler(args, livros, base, pasta))
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(medidas, f, ensure_ascii=False, indent=2)
+    finally:
+        MOTORES.clear()
+        MOTORES.update(motores_originais)
+        main.DOWNLOAD_DIR = diretorio_original
+        servidor.terminate()
+        shutil.rmtree(pasta, ignore_errors=True)
+
+
+def principal() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    download = comandos.add_parser("download", help="backends de download")
+    download.add_argument("--arquivos", type=int, default=20)
+    download.add_argument("--tamanho-mb", type=float, default=8)
+    download.add_argument("--paralelos", type=int, default=4)
+    download.set_defaults(funcao=benchmark_download)
+
+    serp = comandos.add_parser("serp", help="extração de links por motor")
+    serp.add_argument("--fixtures", default="fixtures_serp")
+    serp.add_argument("--salvar", metavar="QUERY", help="baixa as páginas de resultado antes")
+    serp.add_argument("--repeticoes", type=int, default=20)
+    serp.set_defaults(funcao=benchmark_serp)
+
+    validacao = comandos.add_parser("validacao", help="checagem de conteúdo dos PDFs")
+    validacao.add_argument("--pdf", help="PDF a validar (padrão: livro escaneado sintético)")
+    validacao.add_argument("--termo", default="Estruturas de Dados e seus Algoritmos Szwarcfiter")
+    validacao.add_argument("--paginas", type=int, default=200)
+    validacao.add_argument("--repeticoes", type=int, default=10)
+    validacao.set_defaults(funcao=benchmark_validacao)
+
+    crawler = comandos.add_parser("crawler", help="busca e download de ponta a ponta, offline")
+    crawler.add_argument("--livros", type=int, default=20)
+    crawler.add_argument("--nivel", choices=list(main.NIVEIS_BUSCA), default="moderado")
+    crawler.add_argument("--concorrencia", type=int, default=main.CONCORRENCIA_PADRAO)
+    crawler.add_argument("--tamanho-mb", type=float, default=2, help="tamanho dos PDFs válidos")
+    crawler.add_argument("--chance-valido", type=float, default=0.35,
+                         help="chance de uma página de resultados trazer o PDF certo")
+    crawler.add_argument("--sem-pdf", type=float, default=0.1, help="fração dos livros sem PDF em lugar nenhum")
+    crawler.add_argument("--lento-kbps", type=float, default=512, help="velocidade dos sites lentos")
+    crawler.add_argument("--navegador", action="store_true",
+                         help="motores sem HTML estático pelo Chromium (padrão: todos por HTTP simples)")
+    crawler.add_argument("--taxas-reais", action="store_true", help="mantém os limites de requisições/s")
+    crawler.add_argument("--json", metavar="ARQUIVO", help="grava as medidas de cada fase (para comparar)")
+    crawler.set_defaults(funcao=benchmark_crawler)
+
+    args = parser.parse_args()
+    args.funcao(args)
+
+
+if __name__ == "__main__":
+    principal()
@@ -0,0 +1,106 @@
+"""Execução em lote, sem interface gráfica.
+
+Uso:
+    uv run python cli.py livros.txt > resultados.jsonl
+    cat livros.txt | uv run python cli.py - --nivel completo --tempo-maximo 3600
+
+Lê os livros do arquivo (ou da entrada padrão, com "-") linha a linha, com
+as mesmas regras de limpeza da lista do app, e escreve um registro JSON por
+livro assim que ele termina: status, caminho, hash, páginas, URL vencedora,
+motor, nº da query e duração. O log vai para a saída de erro.
+
+Rodar de novo com o mesmo arquivo retoma uma execução interrompida (queda,
+Ctrl+C ou --tempo-maximo); os livros já decididos saem de novo na saída.
+Da entrada padrão, a execução é identificada pelo conteúdo (lido inteiro
+antes de começar) ou, para continuar lendo sob demanda, por --execucao
+NOME: o mesmo nome de novo retoma a mesma execução.
+
+--metricas-porta expõe as métricas por etapa (tempos por motor e por host,
+bytes baixados × mantidos) no formato do Prometheus; --metricas-json grava
+um retrato delas periodicamente. Qualquer um dos dois liga as métricas, e
+o resumo sai no log do fim da execução.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+import main
+from metricas import metricas
+
+
+def escritor_jsonl(saida):
+    """Callback que grava cada resultado numa linha, sem esperar o fim."""
+    def escrever(resultado: dict) -> None:
+        saida.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+        saida.flush()
+    return escrever
+
+
+async def executar(args) -> dict:
+    entrada = sys.stdin if args.livros == "-" else open(args.livros, encoding="utf-8", errors="replace")
+    saida = sys.stdout if args.saida == "-" else open(args.saida, "w", encoding="utf-8")
+    crawler = main.CrawlerBibliografia(
+        concorrencia=args.concorrencia,
+        downloads_paralelos=args.downloads_paralelos,
+        callback_resultado=escritor_jsonl(saida),
+    )
+    # Identifica a execução no diário sem precisar ler a lista inteira; da
+    # entrada padrão sem nome, o crawler lê tudo e usa o próprio conteúdo
+    execucao = args.execucao or ("" if args.livros == "-" else os.path.abspath(args.livros))
+    retratos = None
+    if args.metricas_json:
+        retratos = asyncio.create_task(metricas.gravar_json_periodicamente(args.metricas_json))
+    try:
+        return await crawler.executar(
+            main.ler_livros(entrada),
+            nivel=args.nivel,
+            execucao=execucao,
+            tempo_maximo=args.tempo_maximo,
+        )
+    finally:
+        if retratos is not None:
+            retratos.cancel()
+            await asyncio.gather(retratos, return_exceptions=True)
+        main.fechar_indice()
+        for arquivo in (entrada, saida):
+            if arquivo not in (sys.stdin, sys.stdout):
+                arquivo.close()
+
+
+def principal() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("livros", help='arquivo com um livro por linha ("-" para a entrada padrão)')
+    parser.add_argument("-o", "--saida", default="-", help="arquivo JSONL de resultados (padrão: saída padrão)")
+    parser.add_argument("--nivel", choices=list(main.NIVEIS_BUSCA), default="moderado")
+    parser.add_argument("--concorrencia", type=int, default=main.CONCORRENCIA_PADRAO,
+                        help=f"livros ao mesmo tempo (máximo {main.CONCORRENCIA_MAXIMA})")
+    parser.add_argument("--downloads-paralelos", type=int, default=main.DOWNLOADS_PARALELOS,
+                        help="candidatos baixados ao mesmo tempo por livro")
+    parser.add_argument("--tempo-maximo", type=float, metavar="SEGUNDOS",
+                        help="interrompe a execução depois desse tempo (retomável)")
+    parser.add_argument("--execucao", metavar="NOME",
+                        help="identifica a execução no diário (padrão: o caminho do arquivo; "
+                             "da entrada padrão, o conteúdo lido)")
+    parser.add_argument("--pasta", default=main.DOWNLOAD_DIR, help="pasta dos PDFs, do índice e do diário")
+    parser.add_argument("--metricas-porta", type=int, metavar="PORTA",
+                        help="serve as métricas (formato Prometheus) nessa porta")
+    parser.add_argument("--metricas-json", metavar="ARQUIVO",
+                        help="grava um retrato JSON das métricas a cada 30s e no fim")
+    args = parser.parse_args()
+
+    main.DOWNLOAD_DIR = args.pasta
+    metricas.ativa = bool(args.metricas_porta or args.metricas_json)
+    if args.metricas_porta:
+        metricas.servir_prometheus(args.metricas_porta)
+    try:
+        resumo = asyncio.run(executar(args))
+    except KeyboardInterrupt:
+        main.log.warning("Interrompido; rode de novo com a mesma lista para continuar")
+        sys.exit(130)
+    main.log.info("=== Resultado: %d/%d PDFs baixados ===", len(resumo["sucessos"]), resumo["total"])
+
+
+if __name__ == "__main__":
+    principal()
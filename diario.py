@@ -0,0 +1,178 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Iterable, Optional
+
+log = logging.getLogger(__name__)
+
+# fsync em lote: no máximo a cada tantos registros ou segundos. Numa queda
+# perde-se só esse trecho, que é refeito na retomada (downloads já aceitos
+# voltam pelo manifesto do índice, sem revalidar)
+REGISTROS_POR_FSYNC = 32
+INTERVALO_FSYNC = 2.0
+
+
+class EstadoLivro:
+    """O que o diário sabe de um livro: ordem das queries, a próxima a
+    rodar, candidatos já testados e, se terminou, o resultado."""
+
+    __slots__ = ("queries", "proxima", "candidatos", "concluido", "sucesso", "resultado")
+
+    def __init__(self, queries: list[tuple[str, str]]):
+        self.queries = queries
+        self.proxima = 0
+        self.candidatos: set[str] = set()
+        self.concluido = False
+        self.sucesso = False
+        self.resultado: dict = {}
+
+
+class DiarioExecucao:
+    """Diário append-only (JSONL) de uma execução, para retomar após queda.
+
+    Cada linha é um evento: início do livro (com a lista ordenada de
+    (query, motor), congelada para a retomada seguir a mesma ordem), início
+    de cada query, candidato testado, fim do livro e fim da execução. Ao
+    abrir, o arquivo é relido e `livros` reconstrói o estado; uma última
+    linha cortada pela queda é ignorada. Se a execução anterior chegou ao
+    fim, o diário recomeça vazio.
+
+    As linhas vão para o buffer do arquivo e o fsync é feito em lote
+    (`registros_por_fsync` registros ou `intervalo_fsync` segundos).
+    Com `caminho` vazio nada é gravado (só o estado em memória).
+    """
+
+    def __init__(
+        self,
+        caminho: str,
+        registros_por_fsync: int = REGISTROS_POR_FSYNC,
+        intervalo_fsync: float = INTERVALO_FSYNC,
+    ):
+        self.caminho = caminho
+        self.registros_por_fsync = registros_por_fsync
+        self.intervalo_fsync = intervalo_fsync
+        self.livros: dict[str, EstadoLivro] = {}
+        self._arquivo = None
+        self._pendentes = 0
+        self._ultimo_fsync = time.monotonic()
+        self.fsyncs = 0
+
+        if caminho:
+            terminou = self._carregar()
+            if terminou:
+                self.livros.clear()
+            self._arquivo = open(caminho, "w" if terminou else "a", encoding="utf-8")
+        if self.livros:
+            concluidos = sum(estado.concluido for estado in self.livros.values())
+            log.info("Retomando execução: %d livros concluídos, %d em andamento",
+                     concluidos, len(self.livros) - concluidos)
+
+    def _carregar(self) -> bool:
+        """Reaplica os eventos do arquivo. Retorna True se a execução terminou."""
+        terminou = False
+        try:
+            with open(self.caminho, encoding="utf-8") as f:
+                for linha in f:
+                    try:
+                        evento = json.loads(linha)
+                    except json.JSONDecodeError:
+                        log.debug("Linha incompleta no diário %s ignorada", self.caminho)
+                        continue
+                    terminou = self._aplicar(evento)
+        except FileNotFoundError:
+            pass
+        return terminou
+
+    def _aplicar(self, evento: dict) -> bool:
+        tipo = evento.get("tipo")
+        if tipo == "fim":
+            return True
+        if tipo == "livro":
+            self.livros[evento["termo"]] = EstadoLivro([tuple(q) for q in evento["queries"]])
+            return False
+        estado = self.livros.get(evento.get("termo"))
+        if estado is None:
+            return False
+        if tipo == "query":
+            estado.proxima = evento["n"]
+        elif tipo == "candidato":
+            estado.candidatos.add(evento["url"])
+        elif tipo == "fim_livro":
+            estado.concluido = True
+            estado.sucesso = evento["sucesso"]
+            estado.resultado = evento.get("resultado") or {}
+        return False
+
+    def _registrar(self, evento: dict) -> None:
+        self._aplicar(evento)
+        if self._arquivo is None:
+            return
+        self._arquivo.write(json.dumps(evento, ensure_ascii=False) + "\n")
+        self._pendentes += 1
+        if (self._pendentes >= self.registros_por_fsync
+                or time.monotonic() - self._ultimo_fsync >= self.intervalo_fsync):
+            self.sincronizar()
+
+    def sincronizar(self) -> None:
+        """Grava o buffer e faz fsync do arquivo."""
+        self._ultimo_fsync = time.monotonic()
+        if self._arquivo is None or not self._pendentes:
+            return
+        try:
+            self._arquivo.flush()
+            os.fsync(self._arquivo.fileno())
+            self.fsyncs += 1
+        except OSError as e:
+            log.error("Erro ao gravar diário %s: %s", self.caminho, e)
+        self._pendentes = 0
+
+    # --- Eventos ----------------------------------------------------------
+
+    def estado(self, termo: str) -> Optional[EstadoLivro]:
+        return self.livros.get(termo)
+
+    def iniciar_livro(self, termo: str, queries: list[tuple[str, str]]) -> EstadoLivro:
+        """Começa o livro do zero, guardando a ordem das queries."""
+        self._registrar({"tipo": "livro", "termo": termo, "queries": [list(q) for q in queries]})
+        return self.livros[termo]
+
+    def iniciar_query(self, termo: str, n: int) -> None:
+        """A query de índice `n` (0 = primeira) do livro vai rodar."""
+        self._registrar({"tipo": "query", "termo": termo, "n": n})
+
+    def registrar_candidato(self, termo: str, url: str) -> None:
+        """Candidato a PDF testado até o fim (aceito ou rejeitado)."""
+        self._registrar({"tipo": "candidato", "termo": termo, "url": url})
+
+    def concluir_livro(self, termo: str, sucesso: bool, resultado: Optional[dict] = None) -> None:
+        """Fim do livro; `resultado` (caminho, hash, URL...) volta na retomada."""
+        evento = {"tipo": "fim_livro", "termo": termo, "sucesso": sucesso}
+        if resultado:
+            evento["resultado"] = resultado
+        self._registrar(evento)
+
+    def concluir(self) -> None:
+        """Marca a execução como completa: a próxima com a mesma lista recomeça."""
+        self._registrar({"tipo": "fim"})
+
+    def fechar(self) -> None:
+        self.sincronizar()
+        if self._arquivo is not None:
+            self._arquivo.close()
+            self._arquivo = None
+
+
+def abrir_diario(pasta: str, livros: Iterable[str], nivel: str) -> DiarioExecucao:
+    """Diário da execução identificada pela lista de livros e pelo nível
+    (a mesma lista de novo retoma de onde parou). Em memória se o arquivo
+    não abrir."""
+    identificador = hashlib.sha1("\n".join([nivel, *livros]).encode()).hexdigest()[:12]
+    caminho = os.path.join(pasta, f"diario_{identificador}.jsonl")
+    try:
+        os.makedirs(pasta, exist_ok=True)
+        return DiarioExecucao(caminho)
+    except OSError as e:
+        log.error("Diário da execução indisponível em %s (%s), usando memória", pasta, e)
+        return DiarioExecucao("")
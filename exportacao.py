@@ -0,0 +1,142 @@
+import asyncio
+import logging
+import os
+import shutil
+import zipfile
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+log = logging.getLogger(__name__)
+
+# PDFs já vêm comprimidos: cada arquivo só é comprimido no ZIP se uma
+# amostra do miolo (a 1/4, 1/2 e 3/4 do arquivo; cabeçalho e xref comprimem
+# bem e enganariam) encolher pelo menos até RAZAO_COMPRESSAO.
+# False guarda tudo sem compressão (ZIP_STORED)
+COMPRESSAO_POR_AMOSTRA = True
+TAMANHO_AMOSTRA = 64 * 1024
+RAZAO_COMPRESSAO = 0.9
+
+
+def escolher_compressao(caminho: str) -> int:
+    """ZIP_DEFLATED se a amostra do arquivo comprime bem, senão ZIP_STORED."""
+    tamanho = os.path.getsize(caminho)
+    amostra = b""
+    with open(caminho, "rb") as f:
+        for posicao in sorted({min(tamanho * i // 4, max(0, tamanho - TAMANHO_AMOSTRA)) for i in (1, 2, 3)}):
+            f.seek(posicao)
+            amostra += f.read(TAMANHO_AMOSTRA)
+    if not amostra:
+        return zipfile.ZIP_STORED
+    comprimida = len(zlib.compress(amostra, 1))
+    return zipfile.ZIP_DEFLATED if comprimida <= RAZAO_COMPRESSAO * len(amostra) else zipfile.ZIP_STORED
+
+
+class ExportadorZip:
+    """ZIP montado aos poucos, à medida que os PDFs são aceitos.
+
+    `adicionar` enfileira o arquivo e volta na hora; uma única thread
+    grava no ZIP (zipfile não é thread-safe), na ordem de chegada, sem
+    bloquear o event loop. `concluir` espera a fila, inclui os PDFs da
+    pasta que ainda não entraram, fecha o arquivo e move para o destino,
+    então no fim da busca só resta o diretório central a escrever.
+
+    O ZIP é criado em `caminho` só no primeiro PDF. `callback_progresso`
+    recebe (PDFs no ZIP, bytes dos PDFs) no event loop após cada arquivo.
+    """
+
+    def __init__(
+        self,
+        caminho: str,
+        callback_progresso: Optional[Callable[[int, int], None]] = None,
+        compressao_por_amostra: bool = COMPRESSAO_POR_AMOSTRA,
+    ):
+        self.caminho = caminho
+        self.callback_progresso = callback_progresso
+        self.compressao_por_amostra = compressao_por_amostra
+        self.adicionados = 0
+        self.bytes = 0
+        self.comprimidos = 0
+        self.concluido = False
+        self._zip: Optional[zipfile.ZipFile] = None
+        self._nomes: set[str] = set()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="exportacao_zip")
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    # --- Thread do ZIP ----------------------------------------------------
+
+    def _escrever(self, caminho_pdf: str, nome: str) -> None:
+        # O mesmo livro pode ser reportado de novo (ex.: "Já baixado")
+        if nome in self._nomes:
+            return
+        try:
+            tipo = escolher_compressao(caminho_pdf) if self.compressao_por_amostra else zipfile.ZIP_STORED
+            if self._zip is None:
+                os.makedirs(os.path.dirname(self.caminho) or ".", exist_ok=True)
+                self._zip = zipfile.ZipFile(self.caminho, "w", zipfile.ZIP_STORED)
+            self._zip.write(caminho_pdf, nome, compress_type=tipo)
+        except OSError as e:
+            log.error("Erro ao adicionar %s ao ZIP: %s", nome, e)
+            return
+        self._nomes.add(nome)
+        self.adicionados += 1
+        self.bytes += os.path.getsize(caminho_pdf)
+        self.comprimidos += tipo == zipfile.ZIP_DEFLATED
+        if self.callback_progresso and self._loop is not None:
+            self._loop.call_soon_threadsafe(self.callback_progresso, self.adicionados, self.bytes)
+
+    def _fechar(self, destino: str, pasta: Optional[str]) -> int:
+        if pasta and os.path.isdir(pasta):
+            for arquivo in sorted(os.listdir(pasta)):
+                if arquivo.endswith(".pdf"):
+                    self._escrever(os.path.join(pasta, arquivo), arquivo)
+        if self._zip is None:
+            return 0
+        self._zip.close()
+        self._zip = None
+        try:
+            os.replace(self.caminho, destino)
+        except OSError:
+            # Outro sistema de arquivos: copia
+            shutil.move(self.caminho, destino)
+        log.info("ZIP exportado: %d PDFs (%.1f MB), %d comprimidos: %s",
+                 self.adicionados, self.bytes / (1024 * 1024), self.comprimidos, destino)
+        return self.adicionados
+
+    def _descartar(self) -> None:
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+        if os.path.exists(self.caminho):
+            os.remove(self.caminho)
+
+    # --- Event loop -------------------------------------------------------
+
+    def adicionar(self, caminho_pdf: str, nome: str = "") -> Optional[Future]:
+        """Enfileira o PDF (nome no ZIP: o do arquivo). Não espera a gravação."""
+        if self.concluido:
+            log.debug("ZIP já concluído; %s fica de fora", caminho_pdf)
+            return None
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+        return self._executor.submit(self._escrever, caminho_pdf, nome or os.path.basename(caminho_pdf))
+
+    async def concluir(self, destino: str, pasta: Optional[str] = None) -> int:
+        """Termina o ZIP em `destino`, incluindo os PDFs de `pasta` que
+        faltam. Retorna quantos PDFs ele tem (0 = nenhum, nada é criado)."""
+        self.concluido = True
+        self._loop = asyncio.get_running_loop()
+        try:
+            return await asyncio.wrap_future(self._executor.submit(self._fechar, destino, pasta))
+        finally:
+            self._executor.shutdown(wait=False)
+
+    async def descartar(self) -> None:
+        """Abandona o ZIP em andamento (nova busca sem exportar a anterior)."""
+        if self.concluido:
+            return
+        self.concluido = True
+        try:
+            await asyncio.wrap_future(self._executor.submit(self._descartar))
+        finally:
+            self._executor.shutdown(wait=False)
@@ -0,0 +1,517 @@
+import json
+import logging
+import os
+import sqlite3
+import time
+from typing import Optional
+
+log = logging.getLogger(__name__)
+
+HORA = 3600
+DIA = 24 * HORA
+
+# Por quanto tempo cada tipo de rejeição impede que a URL seja testada de novo:
+# falhas transitórias expiram rápido, as estruturais ficam
+TTL_REJEICAO = {
+    "timeout": HORA,
+    "erro_rede": HORA,
+    "http_5xx": 2 * HORA,
+    "http_4xx": 7 * DIA,
+    "nao_pdf": 7 * DIA,
+    "pdf_invalido": 30 * DIA,
+    "tamanho": 30 * DIA,
+    "paginas": 90 * DIA,
+    "duplicata": 90 * DIA,
+    "conteudo": 90 * DIA,
+}
+TTL_REJEICAO_PADRAO = DIA
+
+# Validade dos links extraídos de uma página de resultados (motor, query).
+# Resultados vazios podem ser bloqueio/captcha, então expiram antes
+TTL_SERP = 24 * HORA
+TTL_SERP_VAZIA = HORA
+
+# Rejeições que dependem do livro buscado (a URL pode servir para outro termo)
+MOTIVOS_POR_TERMO = {"conteudo"}
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS urls (
+    url TEXT PRIMARY KEY,
+    hash TEXT,
+    tamanho INTEGER,
+    paginas INTEGER,
+    resultado TEXT NOT NULL,
+    termo TEXT,
+    timestamp REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rejeicoes (
+    url TEXT NOT NULL,
+    termo TEXT NOT NULL,
+    motivo TEXT NOT NULL,
+    expira_em REAL NOT NULL,
+    PRIMARY KEY (url, termo)
+);
+CREATE TABLE IF NOT EXISTS serp (
+    motor TEXT NOT NULL,
+    query TEXT NOT NULL,
+    links TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    PRIMARY KEY (motor, query)
+);
+CREATE TABLE IF NOT EXISTS queries (
+    template TEXT NOT NULL,
+    motor TEXT NOT NULL,
+    tentativas INTEGER NOT NULL,
+    sucessos INTEGER NOT NULL,
+    PRIMARY KEY (template, motor)
+);
+CREATE TABLE IF NOT EXISTS hosts (
+    host TEXT PRIMARY KEY,
+    tentativas INTEGER NOT NULL,
+    downloads INTEGER NOT NULL,
+    validos INTEGER NOT NULL,
+    segundos REAL NOT NULL,
+    bytes INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS livros (
+    termo TEXT PRIMARY KEY,
+    queries INTEGER NOT NULL,
+    sucesso INTEGER NOT NULL,
+    timestamp REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS arquivos (
+    caminho TEXT NOT NULL,
+    termo TEXT NOT NULL,
+    tamanho INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    hash TEXT,
+    paginas INTEGER,
+    valido INTEGER NOT NULL,
+    timestamp REAL NOT NULL,
+    PRIMARY KEY (caminho, termo)
+);
+CREATE TABLE IF NOT EXISTS pdfs (
+    hash TEXT PRIMARY KEY,
+    caminho TEXT NOT NULL,
+    tamanho INTEGER,
+    paginas INTEGER,
+    termo TEXT,
+    timestamp REAL NOT NULL
+);
+"""
+
+
+class IndiceCrawler:
+    """Índice persistente (SQLite em modo WAL) de URLs testadas e PDFs aceitos.
+
+    Sobrevive a reinícios e pode ser lido por vários processos. As escritas
+    ficam em memória e são gravadas em lote (a cada `tamanho_lote` registros
+    ou `intervalo_gravacao` segundos); as consultas olham primeiro o lote
+    pendente e depois o banco, pela chave primária.
+
+    Também funciona como cache negativo: cada URL rejeitada guarda o motivo e
+    uma validade que depende dele (`TTL_REJEICAO`); como cache dos links
+    extraídos de cada página de resultados (`TTL_SERP`); e como manifesto
+    dos arquivos já validados na pasta (caminho + tamanho + mtime).
+    """
+
+    def __init__(
+        self,
+        caminho: str,
+        tamanho_lote: int = 50,
+        intervalo_gravacao: float = 5.0,
+        ttl_rejeicao: Optional[dict[str, float]] = None,
+        ttl_serp: float = TTL_SERP,
+    ):
+        self.caminho = caminho
+        self.tamanho_lote = tamanho_lote
+        self.intervalo_gravacao = intervalo_gravacao
+        self.ttl_rejeicao = {**TTL_REJEICAO, **(ttl_rejeicao or {})}
+        self.ttl_serp = ttl_serp
+
+        pasta = os.path.dirname(caminho)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+        self.conexao = sqlite3.connect(caminho, timeout=30)
+        self.conexao.execute("PRAGMA journal_mode=WAL")
+        self.conexao.execute("PRAGMA synchronous=NORMAL")
+        self.conexao.executescript(ESQUEMA)
+        # Rejeições vencidas não servem mais para nada
+        self.conexao.execute("DELETE FROM rejeicoes WHERE expira_em < ?", (time.time(),))
+        self.conexao.commit()
+
+        # URLs já vistas nesta execução (ainda não tentadas não vão para o banco)
+        self._urls_sessao: set[str] = set()
+        self._urls_pendentes: dict[str, tuple] = {}
+        self._pdfs_pendentes: dict[str, tuple] = {}
+        self._rejeicoes_pendentes: dict[tuple[str, str], tuple] = {}
+        self._serp_pendentes: dict[tuple[str, str], tuple] = {}
+        # Incrementos de (tentativas, sucessos) por (template, motor)
+        self._queries_pendentes: dict[tuple[str, str], list[int]] = {}
+        self._livros_pendentes: dict[str, tuple] = {}
+        self._arquivos_pendentes: dict[tuple[str, str], tuple] = {}
+        # Incrementos de [tentativas, downloads, válidos, segundos, bytes] por host,
+        # e os totais (banco + pendentes), carregados na primeira consulta
+        self._hosts_pendentes: dict[str, list] = {}
+        self._hosts: Optional[dict[str, list]] = None
+        self._ultima_gravacao = time.monotonic()
+
+        # Taxa de acerto do cache negativo
+        self.consultas_rejeicao = 0
+        self.acertos_rejeicao = 0
+        self.acertos_serp = 0
+        self.faltas_serp = 0
+        self.acertos_arquivos = 0
+        self.faltas_arquivos = 0
+
+    # --- URLs -------------------------------------------------------------
+
+    def url_testada(self, url_norm: str) -> bool:
+        """True se a URL já apareceu nesta execução ou já rendeu um PDF aceito.
+
+        URLs que falharam em execuções anteriores passam pelo cache negativo
+        (`rejeicao_ativa`), que respeita a validade de cada motivo.
+        """
+        if url_norm in self._urls_sessao or url_norm in self._urls_pendentes:
+            return True
+        linha = self.conexao.execute(
+            "SELECT 1 FROM urls WHERE url = ? AND resultado = 'valido'", (url_norm,)
+        ).fetchone()
+        return linha is not None
+
+    def marcar_url(self, url_norm: str) -> None:
+        """Marca a URL como vista nesta execução (evita testar o mesmo PDF 2x)."""
+        self._urls_sessao.add(url_norm)
+
+    def registrar_tentativa(
+        self,
+        url_norm: str,
+        resultado: str,
+        hash_pdf: str = "",
+        tamanho: int = 0,
+        paginas: int = 0,
+        termo: str = "",
+    ) -> None:
+        """Registra o resultado de uma tentativa de download/validação."""
+        self._urls_pendentes[url_norm] = (url_norm, hash_pdf, tamanho, paginas, resultado, termo, time.time())
+        self._gravar_se_necessario()
+
+    # --- Cache negativo ----------------------------------------------------
+
+    def registrar_rejeicao(self, url_norm: str, motivo: str, termo: str = "") -> None:
+        """Guarda a rejeição da URL pelo tempo definido para o motivo.
+
+        Rejeições por conteúdo valem só para o termo buscado; as demais
+        valem para qualquer livro.
+        """
+        chave_termo = termo.lower() if motivo in MOTIVOS_POR_TERMO else ""
+        expira_em = time.time() + self.ttl_rejeicao.get(motivo, TTL_REJEICAO_PADRAO)
+        self._rejeicoes_pendentes[(url_norm, chave_termo)] = (url_norm, chave_termo, motivo, expira_em)
+        self._gravar_se_necessario()
+
+    def rejeicao_ativa(self, url_norm: str, termo: str = "") -> str:
+        """Motivo de uma rejeição ainda válida para a URL (e termo), ou ""."""
+        self.consultas_rejeicao += 1
+        agora = time.time()
+        chaves = [(url_norm, "")]
+        if termo:
+            chaves.append((url_norm, termo.lower()))
+
+        for chave in chaves:
+            pendente = self._rejeicoes_pendentes.get(chave)
+            if pendente is not None and pendente[3] > agora:
+                self.acertos_rejeicao += 1
+                return pendente[2]
+        linha = self.conexao.execute(
+            "SELECT motivo FROM rejeicoes WHERE url = ? AND termo IN (?, ?) AND expira_em > ?",
+            (url_norm, chaves[0][1], chaves[-1][1], agora),
+        ).fetchone()
+        if linha is not None:
+            self.acertos_rejeicao += 1
+            return linha[0]
+        return ""
+
+    def taxa_acerto_rejeicoes(self) -> float:
+        """Fração das consultas ao cache negativo que evitaram uma tentativa."""
+        if not self.consultas_rejeicao:
+            return 0.0
+        return self.acertos_rejeicao / self.consultas_rejeicao
+
+    # --- Cache de resultados de busca -------------------------------------
+
+    def obter_serp(self, motor: str, query: str) -> Optional[list[str]]:
+        """Links extraídos antes para (motor, query), ou None se ausente/vencido."""
+        pendente = self._serp_pendentes.get((motor, query))
+        if pendente is not None:
+            links, timestamp = json.loads(pendente[2]), pendente[3]
+        else:
+            linha = self.conexao.execute(
+                "SELECT links, timestamp FROM serp WHERE motor = ? AND query = ?", (motor, query)
+            ).fetchone()
+            if linha is None:
+                self.faltas_serp += 1
+                return None
+            links, timestamp = json.loads(linha[0]), linha[1]
+
+        ttl = self.ttl_serp if links else min(self.ttl_serp, TTL_SERP_VAZIA)
+        if time.time() - timestamp > ttl:
+            self.faltas_serp += 1
+            return None
+        self.acertos_serp += 1
+        return links
+
+    def guardar_serp(self, motor: str, query: str, links: list[str]) -> None:
+        """Guarda os links extraídos de uma página de resultados."""
+        self._serp_pendentes[(motor, query)] = (motor, query, json.dumps(links), time.time())
+        self._gravar_se_necessario()
+
+    # --- Estatísticas de queries ------------------------------------------
+
+    def registrar_query(self, template: str, motor: str, sucesso: bool) -> None:
+        """Conta uma execução do template de query no motor (e se rendeu PDF)."""
+        contagem = self._queries_pendentes.setdefault((template, motor), [0, 0])
+        contagem[0] += 1
+        contagem[1] += int(sucesso)
+        self._gravar_se_necessario()
+
+    def estatisticas_queries(self) -> dict[tuple[str, str], tuple[int, int]]:
+        """(tentativas, sucessos) acumulados por (template, motor)."""
+        stats = {
+            (template, motor): (tentativas, sucessos)
+            for template, motor, tentativas, sucessos
+            in self.conexao.execute("SELECT template, motor, tentativas, sucessos FROM queries")
+        }
+        for chave, (tentativas, sucessos) in self._queries_pendentes.items():
+            t, s = stats.get(chave, (0, 0))
+            stats[chave] = (t + tentativas, s + sucessos)
+        return stats
+
+    def registrar_livro(self, termo: str, queries: int, sucesso: bool) -> None:
+        """Guarda quantas queries a busca do livro usou."""
+        self._livros_pendentes[termo] = (termo, queries, int(sucesso), time.time())
+        self._gravar_se_necessario()
+
+    def media_queries_por_sucesso(self) -> float:
+        """Média de queries executadas até achar o PDF, nos livros encontrados."""
+        self.gravar()
+        media = self.conexao.execute("SELECT AVG(queries) FROM livros WHERE sucesso = 1").fetchone()[0]
+        return media or 0.0
+
+    # --- Reputação de hosts ----------------------------------------------
+
+    def _carregar_hosts(self) -> dict[str, list]:
+        if self._hosts is None:
+            self._hosts = {
+                host: [tentativas, downloads, validos, segundos, bytes_]
+                for host, tentativas, downloads, validos, segundos, bytes_
+                in self.conexao.execute("SELECT host, tentativas, downloads, validos, segundos, bytes FROM hosts")
+            }
+            for host, incremento in self._hosts_pendentes.items():
+                total = self._hosts.setdefault(host, [0, 0, 0, 0.0, 0])
+                for i, valor in enumerate(incremento):
+                    total[i] += valor
+        return self._hosts
+
+    def registrar_host(self, host: str, baixou: bool, valido: bool, segundos: float, bytes_: int = 0) -> None:
+        """Conta uma tentativa de download no host: se baixou, se o PDF era
+        válido, quanto tempo levou e quantos bytes vieram."""
+        incremento = (1, int(baixou), int(valido), segundos, bytes_)
+        totais = self._carregar_hosts()  # antes do pendente, para não somar 2x
+        for contagem in (totais.setdefault(host, [0, 0, 0, 0.0, 0]),
+                         self._hosts_pendentes.setdefault(host, [0, 0, 0, 0.0, 0])):
+            for i, valor in enumerate(incremento):
+                contagem[i] += valor
+        self._gravar_se_necessario()
+
+    def estatisticas_host(self, host: str) -> tuple[int, int, int, float, int]:
+        """(tentativas, downloads, válidos, segundos, bytes) acumulados do host."""
+        return tuple(self._carregar_hosts().get(host, (0, 0, 0, 0.0, 0)))
+
+    def total_hosts(self) -> int:
+        return len(self._carregar_hosts())
+
+    # --- PDFs -------------------------------------------------------------
+
+    def hash_duplicado(self, hash_pdf: str, caminho: str = "") -> bool:
+        """True se o hash já pertence a um PDF aceito salvo em outro caminho.
+
+        O mesmo arquivo revalidado no seu próprio caminho não é duplicata.
+        """
+        if not hash_pdf:
+            return False
+        pendente = self._pdfs_pendentes.get(hash_pdf)
+        if pendente is not None:
+            return pendente[1] != caminho
+        linha = self.conexao.execute("SELECT caminho FROM pdfs WHERE hash = ?", (hash_pdf,)).fetchone()
+        return linha is not None and linha[0] != caminho
+
+    def registrar_pdf(self, hash_pdf: str, caminho: str, tamanho: int = 0, paginas: int = 0, termo: str = "") -> None:
+        """Registra um PDF aceito."""
+        self._pdfs_pendentes[hash_pdf] = (hash_pdf, caminho, tamanho, paginas, termo, time.time())
+        self._gravar_se_necessario()
+
+    def esquecer_pdfs_ausentes(self) -> int:
+        """Esquece os PDFs aceitos cujo arquivo não existe mais (ex.: apagados
+        ao fechar o app): o hash deixa de contar como duplicata, a URL que o
+        rendeu volta a ser testável e o manifesto perde a linha. O resto do
+        índice (cache negativo, buscas, hosts, queries) fica. Retorna quantos."""
+        self.gravar()
+        ausentes = [(hash_pdf, caminho)
+                    for hash_pdf, caminho in self.conexao.execute("SELECT hash, caminho FROM pdfs")
+                    if not os.path.exists(caminho)]
+        if not ausentes:
+            return 0
+        try:
+            with self.conexao:
+                self.conexao.executemany("DELETE FROM pdfs WHERE hash = ?", [(h,) for h, _ in ausentes])
+                self.conexao.executemany("DELETE FROM urls WHERE hash = ? AND resultado = 'valido'",
+                                         [(h,) for h, _ in ausentes])
+                self.conexao.executemany("DELETE FROM arquivos WHERE caminho = ?", [(c,) for _, c in ausentes])
+        except sqlite3.Error as e:
+            log.error("Erro ao esquecer PDFs apagados em %s: %s", self.caminho, e)
+            return 0
+        return len(ausentes)
+
+    # --- Manifesto de arquivos validados ---------------------------------
+
+    def arquivo(self, caminho: str, termo: str) -> Optional[tuple[int, int, str, int, int]]:
+        """(tamanho, mtime em ns, hash, páginas, válido) registrados para o arquivo e termo."""
+        chave = (caminho, termo.lower())
+        pendente = self._arquivos_pendentes.get(chave)
+        if pendente is not None:
+            return pendente[2:7]
+        return self.conexao.execute(
+            "SELECT tamanho, mtime_ns, hash, paginas, valido FROM arquivos WHERE caminho = ? AND termo = ?",
+            chave,
+        ).fetchone()
+
+    def veredito_arquivo(self, caminho: str, termo: str, tamanho: int, mtime_ns: int) -> Optional[tuple[bool, str, int]]:
+        """(válido, hash, páginas) da validação anterior do arquivo para o
+        termo, ou None se nunca validado ou se o arquivo mudou desde então."""
+        linha = self.arquivo(caminho, termo)
+        if linha is None or linha[0] != tamanho or linha[1] != mtime_ns:
+            self.faltas_arquivos += 1
+            return None
+        self.acertos_arquivos += 1
+        return bool(linha[4]), linha[2] or "", linha[3] or 0
+
+    def registrar_arquivo(
+        self,
+        caminho: str,
+        termo: str,
+        tamanho: int,
+        mtime_ns: int,
+        valido: bool,
+        hash_pdf: str = "",
+        paginas: int = 0,
+    ) -> None:
+        """Guarda o veredito da validação do arquivo (nesse tamanho e mtime) para o termo."""
+        chave = (caminho, termo.lower())
+        self._arquivos_pendentes[chave] = (*chave, tamanho, mtime_ns, hash_pdf, paginas, int(valido), time.time())
+        self._gravar_se_necessario()
+
+    # --- Gravação ---------------------------------------------------------
+
+    def _gravar_se_necessario(self) -> None:
+        pendentes = (len(self._urls_pendentes) + len(self._pdfs_pendentes)
+                     + len(self._rejeicoes_pendentes) + len(self._serp_pendentes)
+                     + len(self._queries_pendentes) + len(self._livros_pendentes)
+                     + len(self._hosts_pendentes) + len(self._arquivos_pendentes))
+        if (pendentes >= self.tamanho_lote
+                or time.monotonic() - self._ultima_gravacao >= self.intervalo_gravacao):
+            self.gravar()
+
+    def gravar(self) -> None:
+        """Grava o lote pendente em uma única transação."""
+        self._ultima_gravacao = time.monotonic()
+        if not (self._urls_pendentes or self._pdfs_pendentes
+                or self._rejeicoes_pendentes or self._serp_pendentes
+                or self._queries_pendentes or self._livros_pendentes
+                or self._hosts_pendentes or self._arquivos_pendentes):
+            return
+        try:
+            with self.conexao:
+                self.conexao.executemany(
+                    "INSERT OR REPLACE INTO urls VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    self._urls_pendentes.values(),
+                )
+                self.conexao.executemany(
+                    "INSERT OR REPLACE INTO pdfs VALUES (?, ?, ?, ?, ?, ?)",
+                    self._pdfs_pendentes.values(),
+                )
+                self.conexao.executemany(
+                    "INSERT OR REPLACE INTO rejeicoes VALUES (?, ?, ?, ?)",
+                    self._rejeicoes_pendentes.values(),
+                )
+                self.conexao.executemany(
+                    "INSERT OR REPLACE INTO serp VALUES (?, ?, ?, ?)",
+                    self._serp_pendentes.values(),
+                )
+                self.conexao.executemany(
+                    """INSERT INTO queries VALUES (?, ?, ?, ?)
+                       ON CONFLICT (template, motor) DO UPDATE SET
+                           tentativas = tentativas + excluded.tentativas,
+                           sucessos = sucessos + excluded.sucessos""",
+                    [(t, m, n, s) for (t, m), (n, s) in self._queries_pendentes.items()],
+                )
+                self.conexao.executemany(
+                    "INSERT OR REPLACE INTO livros VALUES (?, ?, ?, ?)",
+                    self._livros_pendentes.values(),
+                )
+                self.conexao.executemany(
+                    """INSERT INTO hosts VALUES (?, ?, ?, ?, ?, ?)
+                       ON CONFLICT (host) DO UPDATE SET
+                           tentativas = tentativas + excluded.tentativas,
+                           downloads = downloads + excluded.downloads,
+                           validos = validos + excluded.validos,
+                           segundos = segundos + excluded.segundos,
+                           bytes = bytes + excluded.bytes""",
+                    [(host, *incremento) for host, incremento in self._hosts_pendentes.items()],
+                )
+                self.conexao.executemany(
+                    "INSERT OR REPLACE INTO arquivos VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    self._arquivos_pendentes.values(),
+                )
+        except sqlite3.Error as e:
+            log.error("Erro ao gravar índice %s: %s", self.caminho, e)
+            return
+        self._urls_pendentes.clear()
+        self._pdfs_pendentes.clear()
+        self._rejeicoes_pendentes.clear()
+        self._serp_pendentes.clear()
+        self._queries_pendentes.clear()
+        self._livros_pendentes.clear()
+        self._hosts_pendentes.clear()
+        self._arquivos_pendentes.clear()
+
+    def fechar(self) -> None:
+        """Grava o que estiver pendente e fecha o banco."""
+        self.gravar()
+        self.conexao.close()
+
+    def resumo(self) -> dict:
+        """Contagem de URLs por resultado, de PDFs aceitos e uso do cache negativo."""
+        self.gravar()
+        por_resultado = dict(self.conexao.execute(
+            "SELECT resultado, COUNT(*) FROM urls GROUP BY resultado"
+        ).fetchall())
+        pdfs = self.conexao.execute("SELECT COUNT(*) FROM pdfs").fetchone()[0]
+        rejeicoes = dict(self.conexao.execute(
+            "SELECT motivo, COUNT(*) FROM rejeicoes WHERE expira_em > ? GROUP BY motivo", (time.time(),)
+        ).fetchall())
+        return {
+            "urls": por_resultado,
+            "pdfs": pdfs,
+            "rejeicoes": rejeicoes,
+            "taxa_acerto_rejeicoes": self.taxa_acerto_rejeicoes(),
+            "serp": {"acertos": self.acertos_serp, "faltas": self.faltas_serp},
+        }
+
+
+def abrir_indice(pasta: str, nome: str = "indice.sqlite3") -> IndiceCrawler:
+    """Abre o índice da pasta de downloads (em memória se o banco não abrir)."""
+    try:
+        return IndiceCrawler(os.path.join(pasta, nome))
+    except sqlite3.Error as e:
+        log.error("Índice persistente indisponível em %s (%s), usando memória", pasta, e)
+        return IndiceCrawler(":memory:")
@@ -0,0 +1,84 @@
+import asyncio
+import random
+import time
+from typing import Optional
+
+
+class _Balde:
+    """Estado de um token bucket."""
+
+    __slots__ = ("taxa", "capacidade", "tokens", "atualizado")
+
+    def __init__(self, taxa: float, capacidade: float):
+        self.taxa = taxa
+        self.capacidade = capacidade
+        self.tokens = capacidade
+        self.atualizado = time.monotonic()
+
+
+class LimitadorTaxa:
+    """Token bucket por chave (motor de busca ou host de download).
+
+    Cada chave tem sua taxa (requisições/s) e rajada (tokens acumuláveis);
+    chaves diferentes não esperam umas pelas outras. Quem chega sem token
+    reserva o próximo (o saldo fica negativo) e dorme até ele, mais um
+    jitter aleatório de até `jitter` × intervalo, então várias tarefas na
+    mesma chave saem espaçadas. Uma chave ociosa não impõe espera.
+    """
+
+    def __init__(
+        self,
+        taxas: Optional[dict[str, tuple[float, float]]] = None,
+        taxa_padrao: tuple[float, float] = (1.0, 1.0),
+        jitter: float = 0.3,
+    ):
+        self.taxas = dict(taxas or {})
+        self.taxa_padrao = taxa_padrao
+        self.jitter = jitter
+        self._baldes: dict[str, _Balde] = {}
+        # Espera imposta por chave: [nº de esperas, segundos esperados, nº de pedidos]
+        self.esperas: dict[str, list[float]] = {}
+
+    def _balde(self, chave: str) -> _Balde:
+        balde = self._baldes.get(chave)
+        if balde is None:
+            taxa, capacidade = self.taxas.get(chave, self.taxa_padrao)
+            balde = self._baldes[chave] = _Balde(taxa, capacidade)
+        return balde
+
+    def reservar(self, chave: str) -> float:
+        """Consome um token da chave e retorna quantos segundos esperar por ele."""
+        balde = self._balde(chave)
+        agora = time.monotonic()
+        balde.tokens = min(balde.capacidade, balde.tokens + (agora - balde.atualizado) * balde.taxa)
+        balde.atualizado = agora
+        balde.tokens -= 1
+
+        espera = 0.0
+        if balde.tokens < 0:
+            intervalo = 1 / balde.taxa
+            espera = -balde.tokens * intervalo + random.uniform(0, self.jitter * intervalo)
+
+        estatistica = self.esperas.setdefault(chave, [0, 0.0, 0])
+        estatistica[2] += 1
+        if espera > 0:
+            estatistica[0] += 1
+            estatistica[1] += espera
+        return espera
+
+    async def aguardar(self, chave: str) -> float:
+        """Espera a vez da chave. Retorna o tempo esperado."""
+        espera = self.reservar(chave)
+        if espera > 0:
+            await asyncio.sleep(espera)
+        return espera
+
+    def tempo_total_espera(self) -> float:
+        return sum(segundos for _, segundos, _ in self.esperas.values())
+
+    def resumo(self, limite: int = 5) -> str:
+        """As chaves que mais esperaram, em texto para o log."""
+        piores = sorted(self.esperas.items(), key=lambda item: -item[1][1])[:limite]
+        partes = [f"{chave}: {segundos:.0f}s em {int(n)}/{int(pedidos)}"
+                  for chave, (n, segundos, pedidos) in piores if n]
+        return f"{self.tempo_total_espera():.0f}s de espera" + (f" ({', '.join(partes)})" if partes else "")
@@ -1,28 +1,132 @@
 import asyncio
-import random
 import os
 import logging
-import hashlib
-from urllib.parse import quote_plus, urlparse
-from typing import Callable, Optional, Set
+import importlib.util
+import itertools
+import multiprocessing
+import ssl
+import re
+import threading
+import time
+import urllib.request
+import weakref
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from urllib.error import HTTPError
+from urllib.parse import urlparse
+from typing import Callable, Collection, Iterable, Iterator, Optional, Sized
 from playwright.async_api import async_playwright
 from playwright_stealth.stealth import Stealth
 from fake_useragent import UserAgent
-import pymupdf
+from agendador import AgendadorQueries
+from diario import DiarioExecucao, abrir_diario
+from indice import IndiceCrawler, abrir_indice
+from limitador import LimitadorTaxa
+from metricas import metricas
+from motores import EXTRATOR_PAGINA_JS, obter_motor
+from reputacao import ReputacaoHosts
+from validacao import MIN_PAGINAS, _analisar_pdf, novo_hash_pdf, palavras_do_termo, remover_acentos
+from navegador import GerenciadorNavegador, pagina_viva
+
+try:
+    import httpx
+except ImportError:  # backend opcional (extra "http")
+    httpx = None
+
+# O pacote h2 habilita HTTP/2 no httpx (só é preciso saber se está instalado)
+_HTTP2 = importlib.util.find_spec("h2") is not None
 
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s [%(levelname)s] %(message)s",
 )
 log = logging.getLogger(__name__)
+# O httpx registra cada requisição em INFO
+logging.getLogger("httpx").setLevel(logging.WARNING)
 
 UA = UserAgent()
 DOWNLOAD_DIR = "bibliografia_pdf"
-MIN_PAGINAS = 50
 
-# Cache global de URLs já testadas (evita testar mesmo PDF 2x)
-urls_testadas: Set[str] = set()
-hashes_pdfs: Set[str] = set()  # Evita baixar PDFs duplicados
+# Downloads são gravados em partes direto no disco
+TAMANHO_MAXIMO_MB = 200            # Respostas maiores são interrompidas
+TAMANHO_BLOCO = 256 * 1024         # Bytes lidos por vez
+ASSINATURA_PDF = b"%PDF-"          # Precisa aparecer no primeiro bloco
+
+# Backend de download: "urllib" (uma conexão por download, em thread) ou,
+# opcional, "httpx" (extra "http": pool de conexões keep-alive e HTTP/2).
+# Em PDFs grandes o urllib é mais rápido e gasta menos CPU por MB (ver
+# `benchmark.py download`); o httpx só compensa com muitos arquivos
+# pequenos no mesmo host
+BACKEND_DOWNLOAD = "urllib"
+CONEXOES_POR_HOST = 4              # Downloads simultâneos no mesmo host
+CONEXOES_TOTAIS = 32               # Conexões abertas no pool (todas as origens)
+# Threads dos downloads pelo urllib. Cada uma segura um download inteiro,
+# por isso ficam num executor próprio, fora do pool padrão do asyncio; a
+# folga cobre downloads cancelados que ainda não viram o sinal
+THREADS_DOWNLOAD = 32
+
+# Pré-validação por Range: baixa só o início e o fim do PDF antes do corpo
+PREVALIDAR_RANGE = True
+TAMANHO_CABECA = 16 * 1024         # Cabeçalho (dicionário de linearização)
+TAMANHO_CAUDA = 64 * 1024          # Trailer/xref e, em geral, o dicionário Info
+
+# Títulos de metadados que não dizem nada sobre o conteúdo
+TITULOS_GENERICOS = ("microsoft word", "untitled", "sem título", "document", ".doc", ".pdf", ".tex")
+
+# Etapas da checagem de conteúdo, da mais barata para a mais cara. A
+# validação para na primeira que atinge o limiar; "estrutura" = decidido
+# antes do texto (PDF inválido, poucas páginas ou termo sem palavras)
+ETAPAS_VALIDACAO = ("estrutura", "metadados", "sumario", "primeira_pagina", "paginas")
+# Por etapa: [PDFs decididos nela, segundos de análise desses PDFs]
+estatisticas_validacao = {etapa: [0, 0.0] for etapa in ETAPAS_VALIDACAO}
+
+# Estatísticas da pré-validação por Range (acumuladas no processo)
+estatisticas_prevalidacao = {
+    "verificados": 0,
+    "sem_range": 0,
+    "rejeitados": 0,
+    "bytes_consultados": 0,
+    "bytes_economizados": 0,
+}
+
+# Equivalente ao ignore_https_errors do contexto do navegador
+_SSL_SEM_VERIFICACAO = ssl.create_default_context()
+_SSL_SEM_VERIFICACAO.check_hostname = False
+_SSL_SEM_VERIFICACAO.verify_mode = ssl.CERT_NONE
+
+# Índice persistente de URLs testadas e PDFs baixados (evita testar o mesmo
+# PDF 2x e baixar duplicatas, inclusive entre execuções)
+_indice: Optional[IndiceCrawler] = None
+_agendador: Optional[AgendadorQueries] = None
+_reputacao: Optional[ReputacaoHosts] = None
+
+# Recursos abortados nas páginas de busca (só os links e o texto são lidos).
+# Não afeta baixar_pdf, que não passa pelo navegador
+BLOQUEAR_RECURSOS = True
+TIPOS_BLOQUEADOS = {"image", "media", "font"}
+# Hosts de anúncios/rastreadores (também casa subdomínios)
+HOSTS_BLOQUEADOS = (
+    "doubleclick.net", "googlesyndication.com", "googleadservices.com",
+    "google-analytics.com", "googletagmanager.com", "adservice.google.com",
+    "facebook.net", "connect.facebook.net", "scorecardresearch.com",
+    "clarity.ms", "hotjar.com", "criteo.com", "adnxs.com", "taboola.com",
+    "outbrain.com", "mc.yandex.ru", "an.yandex.ru", "ads.yahoo.com",
+    "amazon-adsystem.com", "bat.bing.com",
+)
+
+# Motor -> até quando (time.monotonic) ele vai direto ao navegador
+_bloqueios_html: dict[str, float] = {}
+estatisticas_serp = {"html": 0, "navegador": 0, "bloqueios": 0}
+# Páginas de resultado abertas no navegador: tráfego e tempo de carga
+estatisticas_carga = {"paginas": 0, "bytes": 0, "segundos": 0.0, "recursos_bloqueados": 0}
+
+# Cliente HTTP compartilhado pelos downloads (criado sob demanda no event loop)
+_cliente_http = None
+_conexoes_host: dict[str, asyncio.Semaphore] = {}
+_executor_downloads: Optional[ThreadPoolExecutor] = None
+# Sufixo único dos arquivos .part (um download cancelado que ainda roda
+# nunca escreve no arquivo de uma tentativa nova)
+_sequencia_part = itertools.count()
 
 # Níveis de busca: define quantos links PDF tentar
 NIVEIS_BUSCA = {
@@ -31,29 +135,156 @@ NIVEIS_BUSCA = {
     "completo": 999,  # Testa TODOS os PDFs encontrados (busca exaustiva)
 }
 
+# Processos que validam PDFs em paralelo (pymupdf é CPU-bound); 0 = thread
+WORKERS_VALIDACAO = max(1, (os.cpu_count() or 2) - 1)
+_pool_validacao: Optional[ProcessPoolExecutor] = None
+# True = valida em thread sem tentar o pool (desligado, ou a plataforma não
+# tem multiprocessing)
+_validar_em_thread = False
+
+# Quantos candidatos de uma mesma busca são baixados/validados ao mesmo tempo
+# (o primeiro PDF válido vence; 1 = um de cada vez)
+DOWNLOADS_PARALELOS = 3
+
+# Limite de requisições por motor de busca: (requisições/s, rajada).
+# Motores diferentes não esperam uns pelos outros
+TAXAS_MOTORES = {
+    "google": (1 / 10, 1),
+    "yandex": (1 / 10, 1),
+    "startpage": (1 / 8, 1),
+    "bing": (1 / 4, 2),
+    "duckduckgo": (1 / 4, 2),
+    "brave": (1 / 6, 1),
+    "qwant": (1 / 6, 1),
+}
+TAXA_MOTOR_PADRAO = (1 / 6, 1)
+TAXA_HOST_DOWNLOAD = (1.0, 3)      # Por host de download
+JITTER_LIMITADOR = 0.3             # Até 30% do intervalo, aleatório
+
+# Motores com versão de HTML estático (ver motores.py) são buscados com uma
+# requisição HTTP simples, sem navegador. Por quanto tempo um motor que
+# bloqueou o HTTP simples vai direto ao navegador:
+ESPERA_BLOQUEIO_HTML = 30 * 60
+# Sinais de página de bloqueio/captcha no HTML
+MARCAS_BLOQUEIO = ("captcha", "unusual traffic", "anomaly-modal", "are you a robot")
+
+# Páginas de resultado lidas por query (as seguintes só se a anterior trouxe links)
+PAGINAS_BUSCA = {
+    "rapido": 1,
+    "moderado": 1,
+    "completo": 3,
+}
+
+limitador_motores = LimitadorTaxa(TAXAS_MOTORES, TAXA_MOTOR_PADRAO, JITTER_LIMITADOR)
+limitador_hosts = LimitadorTaxa(taxa_padrao=TAXA_HOST_DOWNLOAD, jitter=JITTER_LIMITADOR)
+
+# Quantos livros são buscados ao mesmo tempo (cada um em seu próprio contexto)
+CONCORRENCIA_PADRAO = 3
+CONCORRENCIA_MAXIMA = 8
+
 LISTA_LIVROS_PADRAO = []
 
 
-async def configurar_navegador(p):
-    browser = await p.chromium.launch(headless=True)
+class TrafegoPagina:
+    """Bytes recebidos e recursos bloqueados numa página, zerados a cada busca."""
+    
+    def __init__(self):
+        self.bytes = 0
+        self.bloqueados = 0
+
+
+_trafego_paginas: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def host_bloqueado(url: str) -> bool:
+    host = urlparse(url).hostname or ""
+    return any(host == h or host.endswith("." + h) for h in HOSTS_BLOQUEADOS)
+
+
+async def configurar_bloqueio(context, trafego: TrafegoPagina) -> None:
+    """Aborta imagens, fontes, mídia e rastreadores nas requisições do contexto."""
+    async def interceptar(route):
+        request = route.request
+        if request.resource_type in TIPOS_BLOQUEADOS or host_bloqueado(request.url):
+            trafego.bloqueados += 1
+            await route.abort()
+        else:
+            await route.continue_()
+    
+    await context.route("**/*", interceptar)
+
+
+async def _medir_trafego(context, page, trafego: TrafegoPagina) -> None:
+    """Soma os bytes recebidos pela página (contagem do próprio Chromium)."""
+    try:
+        cdp = await context.new_cdp_session(page)
+        await cdp.send("Network.enable")
+    except Exception as e:
+        log.debug("Medição de tráfego indisponível: %s", str(e)[:100])
+        return
+    
+    def finalizado(evento):
+        trafego.bytes += int(evento.get("encodedDataLength", 0))
+    
+    cdp.on("Network.loadingFinished", finalizado)
+
+
+async def criar_pagina(browser):
+    """Cria um contexto isolado (cookies/UA próprios) com uma página stealth."""
     context = await browser.new_context(
         user_agent=UA.random,
         viewport={"width": 1920, "height": 1080},
         accept_downloads=True,
         ignore_https_errors=True,
     )
+    trafego = TrafegoPagina()
+    if BLOQUEAR_RECURSOS:
+        await configurar_bloqueio(context, trafego)
     page = await context.new_page()
     await Stealth().apply_stealth_async(page)
+    await _medir_trafego(context, page, trafego)
+    _trafego_paginas[page] = trafego
+    return page
+
+
+async def configurar_navegador(p):
+    browser = await p.chromium.launch(headless=True)
+    page = await criar_pagina(browser)
     return browser, page
 
 
-def calcular_hash_pdf(caminho: str) -> str:
-    """Calcula hash MD5 do PDF para detectar duplicatas."""
-    try:
-        with open(caminho, "rb") as f:
-            return hashlib.md5(f.read()).hexdigest()
-    except:
-        return ""
+def obter_indice() -> IndiceCrawler:
+    """Abre (uma vez) o índice persistente em DOWNLOAD_DIR."""
+    global _indice
+    if _indice is None:
+        _indice = abrir_indice(DOWNLOAD_DIR)
+    return _indice
+
+
+def obter_agendador() -> AgendadorQueries:
+    """Agendador de queries apoiado no índice persistente."""
+    global _agendador
+    if _agendador is None or _agendador.indice is not obter_indice():
+        _agendador = AgendadorQueries(obter_indice())
+    return _agendador
+
+
+def obter_reputacao() -> ReputacaoHosts:
+    """Reputação dos hosts de download, apoiada no índice persistente."""
+    global _reputacao
+    if _reputacao is None or _reputacao.indice is not obter_indice():
+        _reputacao = ReputacaoHosts(obter_indice())
+    return _reputacao
+
+
+def fechar_indice() -> None:
+    """Grava pendências e fecha o índice persistente."""
+    global _indice, _agendador, _reputacao
+    if _indice is not None:
+        _indice.fechar()
+        _indice = None
+        _agendador = None
+        _reputacao = None
 
 
 def normalizar_url(url: str) -> str:
@@ -63,244 +294,998 @@ def normalizar_url(url: str) -> str:
     return f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
 
 
-async def encontrar_links_pdf(page, nivel: str = "moderado", motor: str = "bing") -> list[str]:
-    """Extrai todos os links PDF únicos dos resultados do motor de busca."""
-    # Extração mais agressiva de links PDF
-    links = await page.evaluate("""() => {
-        const allLinks = [];
-        
-        // Verifica se a página está carregada
-        if (!document.body) {
-            return [];
-        }
-        
-        // 1. Links diretos para PDF
-        document.querySelectorAll('a').forEach(a => {
-            if (a.href && a.href.match(/\\.pdf(\\?|#|$)/i)) {
-                allLinks.push(a.href);
-            }
-        });
-        
-        // 2. Links em atributos data-* e onclick
-        document.querySelectorAll('[data-url], [data-href], [onclick]').forEach(el => {
-            const dataUrl = el.getAttribute('data-url') || el.getAttribute('data-href');
-            if (dataUrl && dataUrl.match(/\\.pdf/i)) {
-                allLinks.push(dataUrl);
-            }
-        });
-        
-        // 3. Procura por URLs em texto (resultados de busca)
-        try {
-            const pageText = document.body ? document.body.innerText : '';
-            const urlPattern = /https?:\\/\\/[^\\s]+\\.pdf/gi;
-            const matches = pageText.matchAll(urlPattern);
-            for (const match of matches) {
-                allLinks.push(match[0]);
-            }
-        } catch (e) {
-            // Ignora erros na extração de texto
-        }
-        
-        return allLinks.filter(href => href.startsWith('http'));
-    }""")
+async def extrair_links_pagina(page, motor: str = "") -> list[str]:
+    """Extrai os links PDF (com repetições) da página de resultados aberta.
+    
+    Com `motor`, lê só os resultados orgânicos pelo adaptador do motor;
+    sem ele, a página toda.
+    """
+    if motor:
+        return await obter_motor(motor).extrair(page)
+    return await page.evaluate(EXTRATOR_PAGINA_JS)
+
+
+def _baixar_html(url: str) -> tuple[int, str]:
+    """GET simples de uma página de resultados (roda fora do event loop)."""
+    request = urllib.request.Request(url, headers={
+        "User-Agent": UA.random,
+        "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.8",
+        "Accept-Language": "pt-BR,pt;q=0.9,en;q=0.8",
+    })
+    try:
+        with urllib.request.urlopen(request, timeout=15, context=_SSL_SEM_VERIFICACAO) as response:
+            charset = response.headers.get_content_charset() or "utf-8"
+            return response.status, response.read().decode(charset, errors="replace")
+    except HTTPError as e:
+        return e.code, ""
+
+
+def modo_busca(motor: str) -> str:
+    """"html" para motores com resultados estáticos (e não bloqueados há
+    pouco tempo); "navegador" para os demais."""
+    if obter_motor(motor).modelo_html and _bloqueios_html.get(motor, 0) <= time.monotonic():
+        return "html"
+    return "navegador"
+
+
+async def buscar_serp_html(motor: str, query_str: str, pagina: int = 0) -> Optional[list[str]]:
+    """Busca sem navegador num motor com versão HTML estática.
+    
+    Retorna os links PDF ou None se o motor respondeu com bloqueio/captcha
+    (ele passa a usar o navegador por ESPERA_BLOQUEIO_HTML segundos).
+    """
+    adaptador = obter_motor(motor)
+    url = adaptador.url_html(query_str, pagina)
+    try:
+        status, html = await asyncio.to_thread(_baixar_html, url)
+    except Exception as e:
+        log.debug("Busca HTML falhou em %s: %s", motor, str(e)[:100])
+        return None
+    
+    # 202 é a resposta de "anomalia" do DuckDuckGo
+    links = adaptador.extrair_html(html, url) if status == 200 else []
+    bloqueado = status in (202, 403, 429) or status >= 500 or not html
+    if not bloqueado and not links:
+        # Só desconfia do texto se não veio nenhum resultado
+        texto = html.lower()
+        bloqueado = any(marca in texto for marca in MARCAS_BLOQUEIO)
+    if bloqueado:
+        estatisticas_serp["bloqueios"] += 1
+        _bloqueios_html[motor] = time.monotonic() + ESPERA_BLOQUEIO_HTML
+        log.warning("Motor %s bloqueou a busca sem navegador (HTTP %s); usando o navegador por %d min",
+                    motor, status, ESPERA_BLOQUEIO_HTML // 60)
+        return None
+    
+    estatisticas_serp["html"] += 1
+    return links
 
-    # Remove duplicatas e URLs já testadas
+
+def filtrar_links_pdf(
+    links: list[str],
+    nivel: str = "moderado",
+    termo: str = "",
+    testados: Collection[str] = (),
+) -> list[str]:
+    """Deixa só links únicos e ainda não testados, priorizados e limitados pelo nível.
+    
+    Links rejeitados antes (cache negativo, para `termo`) não entram na fila,
+    nem os de `testados` (URLs normalizadas, ex.: do diário de uma execução
+    interrompida).
+    """
+    # Remove duplicatas, URLs já testadas e rejeições ainda válidas
+    indice = obter_indice()
     unicos = []
     for href in links:
         url_norm = normalizar_url(href)
-        if url_norm not in urls_testadas:
-            urls_testadas.add(url_norm)
-            unicos.append(href)
-    
-    # Prioriza fontes confiáveis
-    def prioridade_fonte(url: str) -> int:
-        url_lower = url.lower()
-        if any(x in url_lower for x in ['academia.edu', 'researchgate', 'scielo']):
-            return 0
-        elif any(x in url_lower for x in ['.edu', '.gov', 'biblioteca', 'repository']):
-            return 1
-        elif any(x in url_lower for x in ['archive.org', 'pdftop']):
-            return 2
-        else:
-            return 3
+        if url_norm in testados or indice.url_testada(url_norm):
+            continue
+        indice.marcar_url(url_norm)
+        motivo = indice.rejeicao_ativa(url_norm, termo)
+        if motivo:
+            log.debug("Ignorando %s (rejeitado antes: %s)", href[:80], motivo)
+            continue
+        unicos.append(href)
     
-    unicos.sort(key=prioridade_fonte)
+    # Hosts com menor tempo esperado até um PDF válido primeiro
+    unicos = obter_reputacao().ordenar(unicos)
     
     # Limita quantidade de links baseado no nível
     max_links = NIVEIS_BUSCA.get(nivel, 6)
     return unicos[:max_links]
 
 
+async def encontrar_links_pdf(page, nivel: str = "moderado", motor: str = "bing", termo: str = "") -> list[str]:
+    """Extrai todos os links PDF únicos dos resultados do motor de busca."""
+    return filtrar_links_pdf(await extrair_links_pagina(page, motor), nivel, termo)
+
+
+def _contabilizar_analise(resultado: tuple[bool, str, int, str, str, float]) -> tuple[bool, str, int, str]:
+    """Soma a etapa e o tempo de uma análise às estatísticas do processo."""
+    valido, hash_pdf, paginas, motivo, etapa, segundos = resultado
+    estatistica = estatisticas_validacao[etapa]
+    estatistica[0] += 1
+    estatistica[1] += segundos
+    metricas.observar("crawler_validacao_segundos", segundos, etapa=etapa)
+    return valido, hash_pdf, paginas, motivo
+
+
+def resumo_validacao() -> str:
+    """Em que etapa as validações foram decididas e o custo médio por PDF."""
+    total = sum(n for n, _ in estatisticas_validacao.values())
+    if not total:
+        return "nenhum PDF analisado"
+    segundos = sum(s for _, s in estatisticas_validacao.values())
+    partes = [f"{etapa} {n / total:.0%} ({s / n * 1000:.0f} ms)"
+              for etapa, (n, s) in estatisticas_validacao.items() if n]
+    return f"{total} PDFs, média de {segundos / total * 1000:.0f} ms; decididos em: {', '.join(partes)}"
+
+
+def registrar_hash_pdf(hash_pdf: str, caminho: str, paginas: int = 0, termo: str = "") -> bool:
+    """Registra um PDF aceito no índice. False se for duplicata de um PDF já
+    baixado em outro caminho (`caminho` é o destino final do arquivo)."""
+    if not hash_pdf:
+        return True
+    indice = obter_indice()
+    if indice.hash_duplicado(hash_pdf, caminho):
+        log.warning("PDF descartado: duplicata já baixada")
+        return False
+    tamanho = os.path.getsize(caminho) if os.path.exists(caminho) else 0
+    indice.registrar_pdf(hash_pdf, caminho, tamanho, paginas, termo)
+    return True
+
+
+def _estado_arquivo(caminho: str) -> Optional[tuple[int, int]]:
+    """(tamanho, mtime em ns) do arquivo, ou None se ele não existe."""
+    try:
+        info = os.stat(caminho)
+    except OSError:
+        return None
+    return info.st_size, info.st_mtime_ns
+
+
+def _veredito_manifesto(caminho: str, termo_busca: str, estado: tuple[int, int]) -> Optional[bool]:
+    """Veredito anterior se o arquivo não mudou desde que foi validado para o termo."""
+    veredito = obter_indice().veredito_arquivo(caminho, termo_busca, *estado)
+    if veredito is None:
+        return None
+    log.debug("Validação reaproveitada do manifesto: %s", caminho)
+    return veredito[0]
+
+
 def validar_pdf(caminho: str, termo_busca: str = "") -> bool:
-    """Verifica se o arquivo é um PDF válido com no mínimo MIN_PAGINAS páginas
-    e se o termo de busca aparece nas primeiras páginas."""
+    """Valida o PDF no processo atual (ver `validar_pdf_async` para o pool).
+    Arquivo inalterado desde a última validação para o termo nem é aberto."""
+    estado = _estado_arquivo(caminho)
+    if estado is None:
+        return False
+    salvo = _veredito_manifesto(caminho, termo_busca, estado)
+    if salvo is not None:
+        return salvo
+    valido, hash_pdf, paginas, _ = _contabilizar_analise(_analisar_pdf(caminho, termo_busca))
+    valido = valido and registrar_hash_pdf(hash_pdf, caminho, paginas, termo_busca)
+    obter_indice().registrar_arquivo(caminho, termo_busca, *estado, valido, hash_pdf, paginas)
+    return valido
+
+
+def configurar_pool_validacao(workers: int = WORKERS_VALIDACAO) -> None:
+    """(Re)cria o pool de processos da validação. 0 valida em uma thread.
+    Propaga o erro se a plataforma não suporta processos."""
+    global _pool_validacao, _validar_em_thread
+    if _pool_validacao is not None:
+        _pool_validacao.shutdown(wait=False, cancel_futures=True)
+        _pool_validacao = None
+    _validar_em_thread = workers <= 0
+    if workers > 0:
+        # spawn: o processo principal (Flet/Playwright) tem threads, fork não é seguro
+        _pool_validacao = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+
+
+async def analisar_pdf_async(caminho: str, termo_busca: str = "", hash_pdf: str = "") -> tuple[bool, str, int, str]:
+    """Roda `_analisar_pdf` no pool de processos sem bloquear o event loop.
+    Retorna (válido, hash, nº de páginas, motivo) e contabiliza a etapa."""
+    global _pool_validacao, _validar_em_thread
+    if not _validar_em_thread and WORKERS_VALIDACAO > 0:
+        try:
+            if _pool_validacao is None:
+                configurar_pool_validacao(WORKERS_VALIDACAO)
+            loop = asyncio.get_running_loop()
+            resultado = await loop.run_in_executor(_pool_validacao, _analisar_pdf, caminho, termo_busca, hash_pdf)
+            return _contabilizar_analise(resultado)
+        except BrokenProcessPool as e:
+            # Um worker morreu: o pool é recriado na próxima validação
+            log.warning("Pool de validação quebrado (%s), validando este PDF em thread", e)
+            _pool_validacao = None
+        except (NotImplementedError, ImportError, OSError) as e:
+            # Plataformas sem multiprocessing (ex.: Android, sem sem_open):
+            # daqui em diante tudo em thread, sem tentar de novo
+            log.warning("Pool de validação indisponível (%s), validando em thread", e)
+            _pool_validacao = None
+            _validar_em_thread = True
+    return _contabilizar_analise(await asyncio.to_thread(_analisar_pdf, caminho, termo_busca, hash_pdf))
+
+
+async def validar_pdf_async(caminho: str, termo_busca: str = "", hash_pdf: str = "") -> bool:
+    """Versão assíncrona de `validar_pdf`: análise no pool, duplicatas aqui."""
+    estado = _estado_arquivo(caminho)
+    if estado is None:
+        return False
+    salvo = _veredito_manifesto(caminho, termo_busca, estado)
+    if salvo is not None:
+        return salvo
+    valido, hash_pdf, paginas, _ = await analisar_pdf_async(caminho, termo_busca, hash_pdf)
+    valido = valido and registrar_hash_pdf(hash_pdf, caminho, paginas, termo_busca)
+    obter_indice().registrar_arquivo(caminho, termo_busca, *estado, valido, hash_pdf, paginas)
+    return valido
+
+
+def _remover_parcial(caminho: str) -> None:
+    """Apaga um arquivo parcial; já apagado ou ainda aberto por outro
+    processo (Windows) não é erro."""
     try:
-        # Verifica duplicatas por hash
-        hash_pdf = calcular_hash_pdf(caminho)
-        if hash_pdf and hash_pdf in hashes_pdfs:
-            log.warning("PDF descartado: duplicata já baixada")
-            return False
-        
-        doc = pymupdf.open(caminho)
-        num_paginas = len(doc)
-        
-        # Valida número mínimo de páginas
-        if num_paginas < MIN_PAGINAS:
-            doc.close()
-            log.warning("PDF descartado: apenas %d páginas (mínimo %d)", num_paginas, MIN_PAGINAS)
-            return False
-        
-        # Verifica metadados do PDF (autor/título)
-        metadata = doc.metadata
-        texto_metadata = ""
-        if metadata:
-            texto_metadata = f"{metadata.get('title', '')} {metadata.get('author', '')}".lower()
-        
-        # Valida conteúdo nas primeiras páginas
-        if termo_busca:
-            # Extrai texto das primeiras 10 páginas (capa, contracapa, título, índice)
-            texto_inicial = ""
-            paginas_para_verificar = min(10, num_paginas)
-            for i in range(paginas_para_verificar):
-                texto_inicial += " " + doc[i].get_text().lower()
-            
-            # Adiciona metadados ao texto de validação
-            texto_completo = texto_inicial + " " + texto_metadata
-            doc.close()
-            
-            # Remove acentos para comparação mais flexível
-            import unicodedata
-            def remover_acentos(texto):
-                return ''.join(c for c in unicodedata.normalize('NFD', texto) 
-                              if unicodedata.category(c) != 'Mn')
-            
-            texto_normalizado = remover_acentos(texto_completo)
-            termo_normalizado = remover_acentos(termo_busca.lower())
-            
-            # Separa palavras significativas (>3 caracteres, sem palavras comuns)
-            palavras_ignorar = {'com', 'para', 'sobre', 'uma', 'dos', 'das', 'the', 'and', 'livro', 'ebook', 'pdf'}
-            palavras_termo = [
-                remover_acentos(p.lower()) 
-                for p in termo_busca.split() 
-                if len(p) > 3 and p.lower() not in palavras_ignorar
-            ]
-            
-            if not palavras_termo:
-                # Se não há palavras significativas, aceita
-                if hash_pdf:
-                    hashes_pdfs.add(hash_pdf)
-                log.info("PDF válido: %d páginas", num_paginas)
-                return True
-            
-            # Conta quantas palavras aparecem no texto
-            palavras_encontradas = sum(1 for palavra in palavras_termo if palavra in texto_normalizado)
-            percentual = palavras_encontradas / len(palavras_termo)
+        os.remove(caminho)
+    except FileNotFoundError:
+        pass
+    except PermissionError as e:
+        log.debug("Arquivo parcial ainda em uso, fica para depois: %s (%s)", caminho, e)
+
+
+def _baixar_em_partes(
+    url: str,
+    download_path: str,
+    tamanho_maximo: int,
+    cancelado: threading.Event,
+    reportar: Callable[[int, float], None],
+) -> tuple[str, str]:
+    """Grava a resposta em disco bloco a bloco (roda fora do event loop).
+    
+    Retorna (hash do conteúdo, calculado enquanto os blocos chegam, "") ou
+    ("", motivo) se o download foi descartado. Com `cancelado` sinalizado
+    para no bloco seguinte e retorna ("", ""); o arquivo parcial é sempre
+    apagado aqui, pela própria thread (quem cancelou não espera por ela).
+    """
+    request = urllib.request.Request(url, headers={
+        "User-Agent": UA.random,
+        "Accept": "application/pdf,*/*;q=0.8",
+    })
+    completo = False
+    try:
+        with urllib.request.urlopen(request, timeout=60, context=_SSL_SEM_VERIFICACAO) as response:
+            tamanho_declarado = int(response.headers.get("Content-Length") or 0)
+            if tamanho_declarado > tamanho_maximo:
+                log.warning("PDF descartado: %.1f MB (máximo %.0f MB): %s",
+                            tamanho_declarado / (1024 * 1024), tamanho_maximo / (1024 * 1024), url[:80])
+                return "", "tamanho"
             
-            # VALIDAÇÃO RIGOROSA: Pelo menos 70% das palavras devem estar presentes
-            if percentual < 0.7:
-                log.warning("PDF descartado: conteúdo não corresponde ao termo '%s'", termo_busca)
-                log.warning("Palavras encontradas: %d/%d (%.0f%%)", 
-                           palavras_encontradas, len(palavras_termo), percentual * 100)
-                log.debug("Palavras buscadas: %s", palavras_termo)
-                return False
+            primeiro_bloco = response.read(TAMANHO_BLOCO)
+            # A assinatura pode vir depois de alguns bytes de lixo (até 1 KB)
+            if ASSINATURA_PDF not in primeiro_bloco[:1024]:
+                log.warning("Resposta não é PDF (assinatura ausente): %s", url[:80])
+                return "", "nao_pdf"
             
-            # PDF válido - adiciona hash ao cache
-            if hash_pdf:
-                hashes_pdfs.add(hash_pdf)
+            if cancelado.is_set():
+                return "", ""
+            inicio = time.monotonic()
+            ultimo_reporte = inicio
+            baixados = 0
+            h = novo_hash_pdf()
+            with open(download_path, "wb") as f:
+                bloco = primeiro_bloco
+                while bloco:
+                    if cancelado.is_set():
+                        return "", ""
+                    baixados += len(bloco)
+                    if baixados > tamanho_maximo:
+                        log.warning("Download interrompido: passou de %.0f MB: %s",
+                                    tamanho_maximo / (1024 * 1024), url[:80])
+                        return "", "tamanho"
+                    f.write(bloco)
+                    h.update(bloco)
+                    
+                    agora = time.monotonic()
+                    if agora - ultimo_reporte >= 1:
+                        reportar(baixados, baixados / (agora - inicio))
+                        ultimo_reporte = agora
+                    bloco = response.read(TAMANHO_BLOCO)
             
-            log.info("PDF válido: %d páginas, %d/%d palavras encontradas (%.0f%%)", 
-                    num_paginas, palavras_encontradas, len(palavras_termo), percentual * 100)
-            return True
-        else:
-            doc.close()
-        
-        if hash_pdf:
-            hashes_pdfs.add(hash_pdf)
-        log.info("PDF válido: %d páginas", num_paginas)
-        return True
-        
-    except Exception as e:
-        log.warning("Arquivo não é um PDF válido: %s", e)
-        return False
+            if cancelado.is_set():
+                return "", ""
+            # read(n) não acusa conexão encerrada antes do Content-Length
+            if baixados < tamanho_declarado:
+                log.warning("Download truncado: %d de %d bytes: %s", baixados, tamanho_declarado, url[:80])
+                return "", "erro_rede"
+            duracao = max(time.monotonic() - inicio, 1e-6)
+            reportar(baixados, baixados / duracao)
+            log.info("⬇️ Baixado: %.1f MB (%.1f MB/s)",
+                     baixados / (1024 * 1024), baixados / duracao / (1024 * 1024))
+            completo = True
+            return h.hexdigest(), ""
+    finally:
+        if not completo:
+            _remover_parcial(download_path)
+
+
+def obter_executor_downloads() -> ThreadPoolExecutor:
+    """Executor (limitado a THREADS_DOWNLOAD) dos downloads pelo urllib."""
+    global _executor_downloads
+    if _executor_downloads is None:
+        _executor_downloads = ThreadPoolExecutor(max_workers=THREADS_DOWNLOAD, thread_name_prefix="download")
+    return _executor_downloads
+
+
+def obter_cliente_http():
+    """Cliente httpx compartilhado: reaproveita conexões entre downloads."""
+    global _cliente_http
+    if _cliente_http is None:
+        _cliente_http = httpx.AsyncClient(
+            http2=_HTTP2,
+            verify=False,
+            follow_redirects=True,
+            headers={"User-Agent": UA.random, "Accept": "application/pdf,*/*;q=0.8"},
+            limits=httpx.Limits(
+                max_connections=CONEXOES_TOTAIS,
+                max_keepalive_connections=CONEXOES_TOTAIS,
+                keepalive_expiry=30,
+            ),
+            timeout=httpx.Timeout(60, connect=20),
+        )
+    return _cliente_http
+
+
+async def fechar_cliente_http() -> None:
+    """Fecha as conexões do pool (fim da execução)."""
+    global _cliente_http
+    if _cliente_http is not None:
+        cliente, _cliente_http = _cliente_http, None
+        _conexoes_host.clear()
+        await cliente.aclose()
 
 
-async def baixar_pdf(page, url: str, download_path: str) -> bool:
-    """Baixa o PDF via request direto do Playwright."""
+def _gravar_bloco(arquivo, h, bloco: bytes) -> None:
+    arquivo.write(bloco)
+    h.update(bloco)
+
+
+async def _baixar_httpx(
+    url: str,
+    download_path: str,
+    tamanho_maximo: int,
+    reportar: Callable[[int, float], None],
+) -> tuple[str, str]:
+    """Mesmo contrato de `_baixar_em_partes`, com a rede no event loop e o
+    cliente compartilhado (no máximo CONEXOES_POR_HOST por host); gravação
+    e hash de cada bloco rodam em thread."""
+    completo = False
     try:
-        response = await page.request.get(url, timeout=60000)  # 60 segundos para arquivos grandes
-        if response.ok:
-            body = await response.body()
-            tamanho_mb = len(body) / (1024 * 1024)
+        host = urlparse(url).netloc
+        semaforo = _conexoes_host.setdefault(host, asyncio.Semaphore(CONEXOES_POR_HOST))
+        async with semaforo, obter_cliente_http().stream("GET", url) as response:
+            if response.status_code >= 400:
+                log.warning("Resposta HTTP %s para: %s", response.status_code, url)
+                return "", "http_5xx" if response.status_code >= 500 else "http_4xx"
+            
+            tamanho_declarado = int(response.headers.get("Content-Length") or 0)
+            if tamanho_declarado > tamanho_maximo:
+                log.warning("PDF descartado: %.1f MB (máximo %.0f MB): %s",
+                            tamanho_declarado / (1024 * 1024), tamanho_maximo / (1024 * 1024), url[:80])
+                return "", "tamanho"
             
+            inicio = time.monotonic()
+            ultimo_reporte = inicio
+            baixados = 0
+            h = novo_hash_pdf()
             with open(download_path, "wb") as f:
-                f.write(body)
+                async for bloco in response.aiter_bytes(TAMANHO_BLOCO):
+                    # A assinatura pode vir depois de alguns bytes de lixo (até 1 KB)
+                    if not baixados and ASSINATURA_PDF not in bloco[:1024]:
+                        log.warning("Resposta não é PDF (assinatura ausente): %s", url[:80])
+                        return "", "nao_pdf"
+                    baixados += len(bloco)
+                    if baixados > tamanho_maximo:
+                        log.warning("Download interrompido: passou de %.0f MB: %s",
+                                    tamanho_maximo / (1024 * 1024), url[:80])
+                        return "", "tamanho"
+                    # Disco e hash fora do event loop (um bloco por vez, em ordem)
+                    await asyncio.to_thread(_gravar_bloco, f, h, bloco)
+                    
+                    agora = time.monotonic()
+                    if agora - ultimo_reporte >= 1:
+                        reportar(baixados, baixados / (agora - inicio))
+                        ultimo_reporte = agora
             
-            log.info("⬇️ Baixado: %.1f MB", tamanho_mb)
-            return True
-        log.warning("Resposta HTTP %s para: %s", response.status, url)
+            if not baixados:
+                log.warning("Resposta vazia: %s", url[:80])
+                return "", "nao_pdf"
+            duracao = max(time.monotonic() - inicio, 1e-6)
+            reportar(baixados, baixados / duracao)
+            log.info("⬇️ Baixado: %.1f MB (%.1f MB/s)",
+                     baixados / (1024 * 1024), baixados / duracao / (1024 * 1024))
+            completo = True
+            return h.hexdigest(), ""
+    except httpx.TimeoutException:
+        log.error("⏱️ Timeout ao baixar (arquivo muito grande): %s", url[:80])
+        return "", "timeout"
+    except (httpx.HTTPError, httpx.InvalidURL, ValueError, OSError) as e:
+        # URL malformada e erro de disco também: a tentativa falha, sem derrubar a tarefa
+        log.error("Download falhou: %s", str(e)[:200])
+        return "", "erro_rede"
+    finally:
+        if not completo:
+            _remover_parcial(download_path)
+
+
+async def baixar_pdf(
+    url: str,
+    download_path: str,
+    tamanho_maximo_mb: float = TAMANHO_MAXIMO_MB,
+    callback_velocidade: Optional[Callable[[str, int, float], None]] = None,
+    backend: Optional[str] = None,
+) -> tuple[str, str]:
+    """Baixa o PDF em partes direto para o disco.
+    
+    Retorna (hash do conteúdo, "") ou, se falhou, ("", motivo): "timeout",
+    "http_4xx", "http_5xx", "erro_rede", "nao_pdf" ou "tamanho".
+    
+    Respostas sem a assinatura %PDF- no primeiro bloco ou maiores que
+    `tamanho_maximo_mb` são interrompidas. `callback_velocidade` recebe
+    (url, bytes baixados, bytes/s) durante o download. `backend` escolhe
+    entre "httpx" e "urllib" (padrão: BACKEND_DOWNLOAD).
+    """
+    tamanho_maximo = int(tamanho_maximo_mb * 1024 * 1024)
+    if (backend or BACKEND_DOWNLOAD) == "httpx" and httpx is not None:
+        def reportar_direto(baixados: int, bytes_por_segundo: float) -> None:
+            if callback_velocidade:
+                callback_velocidade(url, baixados, bytes_por_segundo)
+        return await _baixar_httpx(url, download_path, tamanho_maximo, reportar_direto)
+    
+    loop = asyncio.get_running_loop()
+    cancelado = threading.Event()
+
+    def reportar(baixados: int, bytes_por_segundo: float) -> None:
+        if callback_velocidade and not cancelado.is_set():
+            loop.call_soon_threadsafe(callback_velocidade, url, baixados, bytes_por_segundo)
+
+    trabalho = obter_executor_downloads().submit(
+        _baixar_em_partes, url, download_path, tamanho_maximo, cancelado, reportar
+    )
+    try:
+        return await asyncio.wrap_future(trabalho)
+    except asyncio.CancelledError:
+        # Não espera a thread: um socket parado a seguraria até o timeout de
+        # leitura. Ela vê o sinal no próximo bloco e apaga o próprio .part;
+        # se já tinha terminado o arquivo, ele sai quando ela retornar
+        cancelado.set()
+        trabalho.add_done_callback(lambda _: _remover_parcial(download_path))
+        raise
+    except HTTPError as e:
+        log.warning("Resposta HTTP %s para: %s", e.code, url)
+        return "", "http_5xx" if e.code >= 500 else "http_4xx"
     except Exception as e:
-        if "Timeout" in str(e):
+        if isinstance(e, TimeoutError) or "timed out" in str(e):
             log.error("⏱️ Timeout ao baixar (arquivo muito grande): %s", url[:80])
-        else:
-            log.error("Download falhou: %s", str(e)[:200])
-    return False
-
-
-async def tentar_busca(page, query_str: str, download_path: str, termo_original: str, nivel: str = "moderado", motor: str = "bing") -> bool:
-    """Executa uma busca e tenta baixar um PDF válido dos resultados."""
-    # Suporta múltiplos motores de busca
-    motores = {
-        "bing": f"https://www.bing.com/search?q={quote_plus(query_str)}",
-        "duckduckgo": f"https://duckduckgo.com/?q={quote_plus(query_str)}",
-        "google": f"https://www.google.com/search?q={quote_plus(query_str)}",
-        "yandex": f"https://yandex.com/search/?text={quote_plus(query_str)}",
-        "brave": f"https://search.brave.com/search?q={quote_plus(query_str)}",
-        "startpage": f"https://www.startpage.com/do/search?q={quote_plus(query_str)}",
-        "qwant": f"https://www.qwant.com/?q={quote_plus(query_str)}",
-    }
+            return "", "timeout"
+        log.error("Download falhou: %s", str(e)[:200])
+        return "", "erro_rede"
+
+
+_ESCAPES_PDF = {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"b": b"\b", b"f": b"\f"}
+_ESCAPE_PDF = re.compile(rb"\\([0-7]{1,3}|\r\n|[\r\n]|.)", re.S)
+
+
+def _decodificar_string_pdf(bruto: bytes) -> str:
+    """Decodifica uma string literal ou hexadecimal de um dicionário PDF
+    (escapes \\n, \\( e octais \\ddd; UTF-16 com BOM ou PDFDocEncoding)."""
+    if bruto.startswith(b"<"):
+        digitos = re.sub(rb"\s", b"", bruto[1:-1])
+        try:
+            # Nº ímpar de dígitos: o último é completado com 0
+            bruto = bytes.fromhex((digitos + b"0" * (len(digitos) % 2)).decode("ascii"))
+        except ValueError:
+            return ""
+    else:
+        def escape(m: re.Match) -> bytes:
+            c = m.group(1)
+            if c[:1].isdigit():
+                return bytes([int(c, 8) & 0xFF])
+            if c in (b"\r\n", b"\r", b"\n"):
+                return b""  # Quebra de linha escapada: continuação
+            return _ESCAPES_PDF.get(c, c)
+        bruto = _ESCAPE_PDF.sub(escape, bruto[1:-1])
+    if bruto.startswith(b"\xfe\xff"):
+        return bruto[2:].decode("utf-16-be", errors="ignore")
+    if bruto.startswith(b"\xff\xfe"):
+        return bruto[2:].decode("utf-16-le", errors="ignore")
+    return bruto.decode("latin-1")
+
+
+def _string_pdf(corpo: bytes, chave: bytes) -> str:
+    """Valor de `chave` (string literal, com parênteses aninhados, ou hex)
+    num dicionário PDF; "" se ausente."""
+    m = re.search(re.escape(chave) + rb"\s*([(<])", corpo)
+    if not m:
+        return ""
+    inicio = m.start(1)
+    if m.group(1) == b"<":
+        fim = corpo.find(b">", inicio)
+        return _decodificar_string_pdf(corpo[inicio:fim + 1]) if fim > 0 else ""
+    profundidade, i = 0, inicio
+    while i < len(corpo):
+        c = corpo[i:i + 1]
+        if c == b"\\":
+            i += 1
+        elif c == b"(":
+            profundidade += 1
+        elif c == b")":
+            profundidade -= 1
+            if not profundidade:
+                return _decodificar_string_pdf(corpo[inicio:i + 1])
+        i += 1
+    return ""  # String cortada no fim do trecho
+
+
+# Um objeto indireto inteiro ("12 0 obj ... endobj") dentro dos trechos baixados
+# (sem atravessar o início de outro objeto, ex.: um cortado no fim da cabeça)
+_OBJETO_PDF = re.compile(rb"\d+\s+\d+\s+obj\b((?:(?!\bobj\b).)*?)\bendobj", re.S)
+# Referência ao dicionário Info no trailer (ou no dicionário do xref stream)
+_REFERENCIA_INFO = re.compile(rb"/Info\s+(\d+)\s+(\d+)\s+R\b")
+
+
+def _objeto_info(dados: bytes) -> Optional[bytes]:
+    """Corpo do dicionário Info apontado pelo trailer mais recente, ou None
+    se a referência ou o objeto não estão nos trechos baixados."""
+    referencias = _REFERENCIA_INFO.findall(dados)
+    if not referencias:
+        return None
+    numero, geracao = referencias[-1]
+    objetos = re.findall(rb"(?<!\d)" + numero + rb"\s+" + geracao + rb"\s+obj\b((?:(?!\bobj\b).)*?)\bendobj",
+                         dados, re.S)
+    # Atualizações incrementais regravam o objeto mais adiante no arquivo
+    return objetos[-1] if objetos else None
+
+
+def _metadados_parciais(dados: bytes) -> tuple[int, str]:
+    """Extrai nº de páginas e título/autor de trechos do PDF (0 e "" se ausentes).
+    
+    Usa o /N do dicionário de linearização ou o /Count da raiz da árvore
+    de páginas (o nó /Type /Pages sem /Parent; os intermediários só contam
+    as páginas abaixo deles). Sem nenhum dos dois, 0: a contagem fica para
+    a validação do arquivo inteiro. PDFs com object streams comprimidos não
+    expõem esses valores.
+    
+    Título e autor vêm só do dicionário Info apontado pelo trailer (/Title
+    também aparece nos marcadores do sumário); sem ele, "" (desconhecido,
+    nada é rejeitado pelo título).
+    """
+    paginas = 0
+    linearizado = re.search(rb"/Linearized\b[^>]*?/N\s+(\d+)", dados)
+    if linearizado:
+        paginas = int(linearizado.group(1))
+    else:
+        for objeto in _OBJETO_PDF.finditer(dados):
+            corpo = objeto.group(1)
+            if re.search(rb"/Type\s*/Pages\b", corpo) and not re.search(rb"/Parent\b", corpo):
+                contagem = re.search(rb"/Count\s+(\d+)", corpo)
+                if contagem:
+                    paginas = int(contagem.group(1))
+                    break
     
-    search_url = motores.get(motor, motores["bing"])
+    info = _objeto_info(dados)
+    if info is None:
+        return paginas, ""
+    partes = [_string_pdf(info, chave) for chave in (b"/Title", b"/Author")]
+    return paginas, " ".join(p for p in partes if p).strip()
 
-    try:
-        await page.goto(search_url, wait_until="domcontentloaded", timeout=20000)
-        await asyncio.sleep(random.uniform(2, 4))
+
+def _requisitar_faixa(url: str, faixa: str) -> tuple[bytes, int]:
+    """Faz um GET com Range. Retorna (bytes, tamanho total) ou (b"", 0) sem suporte a Range."""
+    request = urllib.request.Request(url, headers={
+        "User-Agent": UA.random,
+        "Range": f"bytes={faixa}",
+    })
+    with urllib.request.urlopen(request, timeout=20, context=_SSL_SEM_VERIFICACAO) as response:
+        # 200 = servidor ignorou o Range; fecha sem ler o corpo
+        if response.status != 206:
+            return b"", 0
+        total = response.headers.get("Content-Range", "").rpartition("/")[2]
+        return response.read(), int(total) if total.isdigit() else 0
+
+
+def _prevalidar_por_range(url: str, termo_busca: str) -> str:
+    """Consulta cabeçalho e cauda do PDF e rejeita os claramente inválidos.
+    Retorna o motivo da rejeição ("" se pode baixar)."""
+    cabeca, total = _requisitar_faixa(url, f"0-{TAMANHO_CABECA - 1}")
+    if not total:
+        estatisticas_prevalidacao["sem_range"] += 1
+        return ""
+    
+    consultados = len(cabeca)
+    motivo = detalhe = ""
+    if ASSINATURA_PDF not in cabeca[:1024]:
+        motivo, detalhe = "nao_pdf", "não é PDF (assinatura ausente)"
+    else:
+        cauda = b""
+        if total > TAMANHO_CABECA:
+            cauda, _ = _requisitar_faixa(url, f"-{TAMANHO_CAUDA}")
+            consultados += len(cauda)
+        paginas, titulo = _metadados_parciais(cabeca + b"\n" + cauda)
         
-        # Aguarda corpo da página estar disponível
-        await page.wait_for_selector("body", timeout=5000)
+        if paginas and paginas < MIN_PAGINAS:
+            motivo, detalhe = "paginas", f"apenas {paginas} páginas (mínimo {MIN_PAGINAS})"
+        elif titulo and termo_busca and not any(g in titulo.lower() for g in TITULOS_GENERICOS):
+            # Só rejeita títulos informativos sem nenhuma palavra do termo
+            palavras_titulo = palavras_do_termo(titulo)
+            palavras_termo = palavras_do_termo(termo_busca)
+            texto_titulo = remover_acentos(titulo.lower())
+            if len(palavras_titulo) >= 3 and palavras_termo and not any(p in texto_titulo for p in palavras_termo):
+                motivo, detalhe = "conteudo", f"título '{titulo[:60]}' não corresponde ao termo"
+    
+    estatisticas_prevalidacao["verificados"] += 1
+    estatisticas_prevalidacao["bytes_consultados"] += consultados
+    if not motivo:
+        return ""
+    
+    estatisticas_prevalidacao["rejeitados"] += 1
+    estatisticas_prevalidacao["bytes_economizados"] += max(total - consultados, 0)
+    log.warning("PDF descartado antes do download: %s (%.1f MB economizados)",
+                detalhe, max(total - consultados, 0) / (1024 * 1024))
+    return motivo
+
+
+async def prevalidar_pdf(url: str, termo_busca: str = "") -> str:
+    """Pré-valida o PDF via requisições Range. Retorna o motivo ("nao_pdf",
+    "paginas" ou "conteudo") só quando o PDF é claramente inválido; sem
+    suporte a Range (ou em erro) retorna "" e segue para o download."""
+    if not PREVALIDAR_RANGE:
+        return ""
+    try:
+        return await asyncio.to_thread(_prevalidar_por_range, url, termo_busca)
     except Exception as e:
-        log.error("Erro ao acessar motor de busca %s: %s", motor, str(e)[:100])
-        return False
+        log.debug("Pré-validação indisponível para %s: %s", url[:80], str(e)[:100])
+        return ""
+
+
+def resumo_carga_paginas() -> str:
+    """Média de tráfego e tempo de carga das páginas de busca no navegador."""
+    paginas = estatisticas_carga["paginas"]
+    if not paginas:
+        return "nenhuma página aberta no navegador"
+    return (f"{paginas} páginas, média de {estatisticas_carga['bytes'] / paginas / 1024:.0f} KB "
+            f"e {estatisticas_carga['segundos'] / paginas:.2f}s por página, "
+            f"{estatisticas_carga['recursos_bloqueados']} recursos bloqueados "
+            f"(bloqueio {'ativo' if BLOQUEAR_RECURSOS else 'desligado'})")
+
 
-    links_pdf = await encontrar_links_pdf(page, nivel, motor)
+def resumo_prevalidacao() -> str:
+    """Resumo legível das estatísticas da pré-validação."""
+    e = estatisticas_prevalidacao
+    return (f"{e['verificados']} verificados, {e['rejeitados']} rejeitados, "
+            f"{e['sem_range']} sem Range, {e['bytes_consultados'] / (1024 * 1024):.1f} MB consultados, "
+            f"{e['bytes_economizados'] / (1024 * 1024):.1f} MB economizados")
+
+
+async def _baixar_e_validar(
+    url_pdf: str,
+    caminho_tmp: str,
+    destino: str,
+    termo_original: str,
+    vencedor: asyncio.Event,
+) -> bool:
+    """Baixa um candidato para um caminho próprio e valida. Remove o arquivo se não vencer.
+    
+    O resultado da tentativa fica no índice persistente e, se o candidato
+    for rejeitado, no cache negativo com o motivo.
+    """
+    indice = obter_indice()
+    url_norm = normalizar_url(url_pdf)
+    host = urlparse(url_pdf).netloc
+    hash_pdf, tamanho, paginas = "", 0, 0
+    motivo = ""
+    venceu = False
+    # Tempo gasto com o host (sem as esperas do limitador); None = não conta
+    # para a reputação (perdeu a corrida para outro candidato ou foi cancelado)
+    gasto: Optional[float] = 0.0
+    inicio: Optional[float] = None
+    # Bytes recebidos, inclusive de downloads interrompidos (só com métricas)
+    recebidos = 0
+    
+    def contar_recebidos(_url: str, baixados: int, _velocidade: float) -> None:
+        nonlocal recebidos
+        recebidos = baixados
+    
+    # Cancelado no meio do download ou da validação, quem ainda usa o .part
+    # (a thread do download, o worker da validação) o apaga ao terminar
+    limpeza_delegada = False
+    
+    def apagar_apos_validacao(tarefa: asyncio.Future) -> None:
+        if not tarefa.cancelled():
+            tarefa.exception()  # Já não interessa a ninguém
+        _remover_parcial(caminho_tmp)
+    
+    try:
+        if PREVALIDAR_RANGE:
+            metricas.observar("crawler_espera_limitador_segundos", await limitador_hosts.aguardar(host), host=host)
+            inicio = time.monotonic()
+            with metricas.cronometrar("crawler_prevalidacao_segundos", host=host):
+                motivo = await prevalidar_pdf(url_pdf, termo_original)
+            if motivo:
+                return False
+            gasto += time.monotonic() - inicio
+        metricas.observar("crawler_espera_limitador_segundos", await limitador_hosts.aguardar(host), host=host)
+        inicio = time.monotonic()
+        limpeza_delegada = True
+        with metricas.cronometrar("crawler_download_segundos", host=host):
+            hash_pdf, motivo = await baixar_pdf(
+                url_pdf, caminho_tmp, callback_velocidade=contar_recebidos if metricas.ativa else None
+            )
+        limpeza_delegada = False
+        if not hash_pdf:
+            return False
+        # Outro candidato já venceu enquanto este baixava
+        if vencedor.is_set():
+            gasto = None
+            return False
+        
+        tamanho = os.path.getsize(caminho_tmp)
+        # Duplicata detectada pelo hash do download, sem abrir o PDF
+        if indice.hash_duplicado(hash_pdf, destino):
+            log.warning("PDF descartado: duplicata já baixada")
+            motivo = "duplicata"
+            return False
+        # O worker não para com o cancelamento: a análise segue protegida e
+        # apaga o arquivo quando termina
+        validacao = asyncio.ensure_future(analisar_pdf_async(caminho_tmp, termo_original, hash_pdf))
+        try:
+            valido, hash_pdf, paginas, motivo = await asyncio.shield(validacao)
+        except asyncio.CancelledError:
+            limpeza_delegada = True
+            validacao.add_done_callback(apagar_apos_validacao)
+            raise
+        if not valido:
+            return False
+        # Só o primeiro válido registra o hash (os outros são descartados)
+        if vencedor.is_set():
+            gasto = None
+            return False
+        if indice.hash_duplicado(hash_pdf, destino):
+            log.warning("PDF descartado: duplicata já baixada")
+            motivo = "duplicata"
+            return False
+        
+        venceu = True
+        vencedor.set()
+        indice.registrar_pdf(hash_pdf, destino, tamanho, paginas, termo_original)
+        indice.registrar_tentativa(url_norm, "valido", hash_pdf, tamanho, paginas, termo_original)
+        # O os.replace para o destino preserva tamanho e mtime: na próxima
+        # execução o arquivo é aceito pelo manifesto, sem reabrir
+        indice.registrar_arquivo(destino, termo_original, *_estado_arquivo(caminho_tmp), True, hash_pdf, paginas)
+        return True
+    except asyncio.CancelledError:
+        gasto = None
+        raise
+    finally:
+        if motivo:
+            indice.registrar_tentativa(url_norm, motivo, hash_pdf, tamanho, paginas, termo_original)
+            indice.registrar_rejeicao(url_norm, motivo, termo_original)
+        if gasto is not None:
+            if inicio is not None:
+                gasto += time.monotonic() - inicio
+            # Duplicata é um PDF bom: o host entregou o que prometia
+            obter_reputacao().registrar(url_pdf, bool(hash_pdf), venceu or motivo == "duplicata", gasto, tamanho)
+        if metricas.ativa:
+            resultado = "valido" if venceu else motivo or "descartado"
+            metricas.contar("crawler_candidatos_total", host=host, resultado=resultado)
+            metricas.contar("crawler_bytes_baixados_total", max(recebidos, tamanho), host=host)
+            if venceu:
+                metricas.contar("crawler_bytes_mantidos_total", tamanho)
+        if not venceu and not limpeza_delegada:
+            _remover_parcial(caminho_tmp)
+
+
+async def obter_resultados(page, motor: str, query_str: str, pagina: int = 0) -> Optional[list[str]]:
+    """Links PDF de uma página de resultados: do cache, por HTTP simples ou
+    pelo navegador (esperando só até os resultados renderizarem).
+    
+    Retorna None se o motor não pôde ser acessado.
+    """
+    adaptador = obter_motor(motor)
+    # As páginas seguintes ficam no cache com o nº da página na chave
+    chave = query_str if not pagina else f"{query_str}#p{pagina + 1}"
+    
+    # Resultados recentes da mesma query no mesmo motor dispensam o navegador
+    indice = obter_indice()
+    links = indice.obter_serp(motor, chave)
+    metricas.contar("crawler_buscas_total", motor=motor, origem="cache" if links is not None else "rede")
+    if links is not None:
+        log.debug("Resultados em cache para [%s]: %s", motor, chave[:60])
+        return links
+    
+    # Respeita o limite do motor (sem esperar por outros motores)
+    metricas.observar("crawler_espera_limitador_segundos", await limitador_motores.aguardar(motor), motor=motor)
+    if modo_busca(motor) == "html":
+        with metricas.cronometrar("crawler_busca_html_segundos", motor=motor):
+            links = await buscar_serp_html(motor, query_str, pagina)
+        if links is None:
+            # Bloqueado: a mesma busca vai pelo navegador, como nova requisição
+            metricas.observar("crawler_espera_limitador_segundos", await limitador_motores.aguardar(motor),
+                              motor=motor)
+    if links is None:
+        trafego = _trafego_paginas.get(page) or TrafegoPagina()
+        trafego.bytes = trafego.bloqueados = 0
+        try:
+            inicio = time.monotonic()
+            await page.goto(adaptador.url(query_str, pagina), wait_until="domcontentloaded", timeout=20000)
+            carga = time.monotonic() - inicio
+            metricas.observar("crawler_goto_segundos", carga, motor=motor)
+            # Só até os resultados do motor aparecerem (sem espera fixa)
+            with metricas.cronometrar("crawler_aguardar_resultados_segundos", motor=motor):
+                await adaptador.aguardar_resultados(page)
+            with metricas.cronometrar("crawler_extracao_segundos", motor=motor):
+                links = await adaptador.extrair(page)
+        except Exception as e:
+            log.error("Erro ao acessar motor de busca %s: %s", motor, str(e)[:100])
+            return None
+        estatisticas_serp["navegador"] += 1
+        estatisticas_carga["paginas"] += 1
+        estatisticas_carga["bytes"] += trafego.bytes
+        estatisticas_carga["segundos"] += carga
+        estatisticas_carga["recursos_bloqueados"] += trafego.bloqueados
+        metricas.contar("crawler_bytes_paginas_busca_total", trafego.bytes, motor=motor)
+        log.debug("Página de resultados [%s]: %.0f KB, carregada em %.2fs, %d recursos bloqueados",
+                  motor, trafego.bytes / 1024, carga, trafego.bloqueados)
+    
+    metricas.contar("crawler_links_pdf_total", len(links), motor=motor)
+    indice.guardar_serp(motor, chave, links)
+    return links
+
+
+async def tentar_busca(
+    page, 
+    query_str: str, 
+    download_path: str, 
+    termo_original: str, 
+    nivel: str = "moderado", 
+    motor: str = "bing",
+    downloads_paralelos: int = DOWNLOADS_PARALELOS,
+    diario: Optional[DiarioExecucao] = None,
+) -> Optional[str]:
+    """Executa uma busca e tenta baixar um PDF válido dos resultados.
+    Retorna a URL do PDF aceito, "" se nenhum serviu ou None se nenhum
+    candidato chegou a ser testado (motor com erro ou bloqueado, nenhum
+    link PDF, ou todos já testados antes).
+    
+    Até `downloads_paralelos` candidatos são baixados e validados ao mesmo
+    tempo; o primeiro válido vence e os demais downloads são cancelados.
+    Com `diario`, candidatos testados até o fim são registrados nele e os
+    já registrados para o livro são pulados.
+    """
+    links = []
+    for pagina in range(PAGINAS_BUSCA.get(nivel, 1)):
+        resultados = await obter_resultados(page, motor, query_str, pagina)
+        if resultados is None:
+            if pagina == 0:
+                return None
+            break
+        links += resultados
+        if not resultados:
+            break
+
+    estado = diario.estado(termo_original) if diario else None
+    links_pdf = filtrar_links_pdf(links, nivel, termo_original, estado.candidatos if estado else ())
     if not links_pdf:
-        log.debug("🚫 Nenhum link PDF encontrado com motor %s", motor)
-        return False
+        log.debug("🚫 Nenhum link PDF novo encontrado com motor %s", motor)
+        return None
 
     log.info("✅ Encontrados %d links únicos no %s (testando até %d)", 
              len(links_pdf), motor, NIVEIS_BUSCA.get(nivel, 6))
 
-    for i, url_pdf in enumerate(links_pdf):
+    # Cada candidato grava no seu próprio arquivo temporário
+    vencedor = asyncio.Event()
+    candidatos = iter(enumerate(links_pdf))
+    em_andamento: dict[asyncio.Task, tuple[str, str]] = {}
+    testados = 0
+
+    def iniciar_proximo() -> None:
+        proximo = next(candidatos, None)
+        if proximo is None:
+            return
+        i, url_pdf = proximo
         log.info("🔍 Tentativa %d/%d: %s", i + 1, len(links_pdf), url_pdf[:100])
+        caminho_tmp = f"{download_path}.{next(_sequencia_part)}.part"
+        tarefa = asyncio.create_task(
+            _baixar_e_validar(url_pdf, caminho_tmp, download_path, termo_original, vencedor)
+        )
+        em_andamento[tarefa] = (caminho_tmp, url_pdf)
 
-        if not await baixar_pdf(page, url_pdf, download_path):
-            await asyncio.sleep(random.uniform(0.5, 1))  # Delay menor entre falhas
-            continue
+    for _ in range(max(1, downloads_paralelos)):
+        iniciar_proximo()
 
-        if validar_pdf(download_path, termo_original):
-            return True
+    try:
+        while em_andamento:
+            concluidas, _ = await asyncio.wait(em_andamento, return_when=asyncio.FIRST_COMPLETED)
+            for tarefa in concluidas:
+                caminho_tmp, url_pdf = em_andamento.pop(tarefa)
+                if tarefa.cancelled():
+                    iniciar_proximo()
+                    continue
+                erro = tarefa.exception()
+                if erro is not None:
+                    # Inesperado (_baixar_e_validar já trata as falhas de rede e de PDF)
+                    log.error("Erro ao testar candidato %s: %r", url_pdf[:80], erro, exc_info=erro)
+                    iniciar_proximo()
+                    continue
+                testados += 1
+                if diario:
+                    diario.registrar_candidato(termo_original, normalizar_url(url_pdf))
+                if tarefa.result():
+                    os.replace(caminho_tmp, download_path)
+                    return url_pdf
+                iniciar_proximo()
+        return "" if testados else None
+    finally:
+        # Cancela downloads ainda em andamento (removem seus arquivos parciais)
+        for tarefa in em_andamento:
+            tarefa.cancel()
+        if em_andamento:
+            await asyncio.gather(*em_andamento, return_exceptions=True)
 
-        os.remove(download_path)
-        await asyncio.sleep(random.uniform(0.3, 0.8))  # Delay menor
 
-    return False
+def limpar_linha_livro(linha: str) -> str:
+    """Limpa uma entrada da lista de livros; "" se ela não for um livro.
+    
+    Remove marcadores de lista (-, *, •, >, |), numeração (1., 2), [3]),
+    espaços extras e pontuação nas pontas; descarta linhas com até 10
+    caracteres.
+    """
+    # Remove marcadores de lista
+    linha = re.sub(r'^[-*•>|#]+\s*', '', linha.strip())
+    # Remove numeração (1., 2), [3], etc)
+    linha = re.sub(r'^\[?\d+[\.\)\]]\s*', '', linha)
+    # Remove espaços extras
+    linha = ' '.join(linha.split())
+    # Remove caracteres inválidos
+    linha = linha.strip('.,;:')
+    # Aceita apenas linhas com tamanho razoável
+    return linha if len(linha) > 10 else ""
 
 
-def gerar_queries_inteligentes(termo: str) -> list[tuple[str, str]]:
-    """Gera queries otimizadas com múltiplos motores de busca."""
-    # Tenta separar autor e título se possível
+def ler_livros(linhas: Iterable[str]) -> Iterator[str]:
+    """Livros de um arquivo/stdin, limpos, lidos sob demanda (linha a linha)."""
+    for linha in linhas:
+        livro = limpar_linha_livro(linha)
+        if livro:
+            yield livro
+
+
+def processar_lista_livros(texto: str) -> list[str]:
+    """
+    Processa e limpa a lista de livros de forma inteligente.
+    
+    Remove:
+    - Marcadores de lista (-, *, •, >, |)
+    - Numeração (1., 2), [3], etc)
+    - Espaços extras
+    - Linhas muito curtas (< 10 caracteres)
+    - Caracteres especiais no início
+    
+    Returns:
+        Lista de livros limpos e prontos para busca
+    """
+    return list(ler_livros(texto.split('\n')))
+
+
+def separar_autor_titulo(termo: str) -> tuple[str, str]:
+    """Tenta separar autor e título se possível (autor = duas últimas palavras)."""
     palavras = termo.split()
     autor = " ".join(palavras[-2:]) if len(palavras) > 2 else ""
     titulo = " ".join(palavras[:-2]) if len(palavras) > 2 else termo
+    return autor, titulo
+
+
+def gerar_queries_inteligentes(termo: str) -> list[tuple[str, str]]:
+    """Gera queries otimizadas com múltiplos motores de busca."""
+    # Tenta separar autor e título se possível
+    autor, titulo = separar_autor_titulo(termo)
     
     queries_base = [
         # Queries exatas - distribuídas entre motores
@@ -371,54 +1356,135 @@ def gerar_queries_inteligentes(termo: str) -> list[tuple[str, str]]:
     return queries_base
 
 
+def caminho_download(termo: str) -> str:
+    """Onde o PDF do livro é gravado (o app exporta o ZIP a partir daqui)."""
+    nome_arquivo = f"{termo[:50].replace(' ', '_').replace(':', '')}.pdf"
+    return os.path.join(DOWNLOAD_DIR, nome_arquivo)
+
+
+def _resultado_livro(
+    termo: str,
+    status: str,
+    caminho: str,
+    inicio: float,
+    url: str = "",
+    motor: str = "",
+    query: int = 0,
+) -> dict:
+    """Registro do fim de um livro (saída JSONL do cli.py e diário).
+    Hash e páginas vêm do manifesto, onde o PDF aceito já foi registrado."""
+    hash_pdf, paginas = "", 0
+    if status == "sucesso":
+        linha = obter_indice().arquivo(caminho, termo)
+        if linha is not None:
+            hash_pdf, paginas = linha[2] or "", linha[3] or 0
+    else:
+        caminho = ""
+    return {
+        "termo": termo,
+        "status": status,
+        "caminho": caminho,
+        "hash": hash_pdf,
+        "paginas": paginas,
+        "url": url,
+        "motor": motor,
+        "query": query,
+        "segundos": round(time.monotonic() - inicio, 2),
+    }
+
+
 async def buscar_e_baixar(
     page, 
     termo: str, 
     nivel: str = "moderado",
-    callback_progresso: Optional[Callable[[str, str], None]] = None
+    callback_progresso: Optional[Callable[[str, str], None]] = None,
+    downloads_paralelos: int = DOWNLOADS_PARALELOS,
+    diario: Optional[DiarioExecucao] = None,
+    callback_resultado: Optional[Callable[[dict], None]] = None,
 ) -> bool:
-    """Busca e baixa um PDF válido. Retorna True se conseguiu."""
-    nome_arquivo = f"{termo[:50].replace(' ', '_').replace(':', '')}.pdf"
-    download_path = os.path.join(DOWNLOAD_DIR, nome_arquivo)
+    """Busca e baixa um PDF válido. Retorna True se conseguiu.
+    
+    Com `diario`, o progresso do livro fica registrado e um livro
+    interrompido antes continua na mesma query, na mesma ordem.
+    `callback_resultado` recebe, ao fim, o registro de `_resultado_livro`
+    (caminho, hash, páginas, URL vencedora, motor, nº da query, duração).
+    """
+    inicio_livro = time.monotonic()
+    download_path = caminho_download(termo)
+    nome_arquivo = os.path.basename(download_path)
+
+    def concluir(status: str, url: str = "", motor: str = "", query: int = 0) -> bool:
+        sucesso = status == "sucesso"
+        resultado = _resultado_livro(termo, status, download_path, inicio_livro, url, motor, query)
+        metricas.observar("crawler_livro_segundos", resultado["segundos"], status=status)
+        if motor:
+            metricas.contar("crawler_livros_encontrados_total", motor=motor)
+        # Erros não encerram o livro no diário: a retomada tenta de novo
+        if diario and status != "erro":
+            diario.concluir_livro(termo, sucesso, resultado)
+        if callback_progresso:
+            callback_progresso(termo, status)
+        if callback_resultado:
+            callback_resultado(resultado)
+        return sucesso
 
     if callback_progresso:
         callback_progresso(termo, "verificando")
 
-    if os.path.exists(download_path) and validar_pdf(download_path, termo):
+    if os.path.exists(download_path) and await validar_pdf_async(download_path, termo):
         log.info("Já baixado: %s", nome_arquivo)
-        if callback_progresso:
-            callback_progresso(termo, "sucesso")
-        return True
+        return concluir("sucesso")
 
-    # Gera queries com múltiplos motores de busca
-    queries = gerar_queries_inteligentes(termo)
+    agendador = obter_agendador()
+    autor, titulo = separar_autor_titulo(termo)
+    estado = diario.estado(termo) if diario else None
+    if estado is not None and not estado.concluido:
+        # Execução interrompida: mesma ordem de queries, a partir da que estava rodando
+        queries, inicio = estado.queries, estado.proxima
+        log.info("Retomando '%s' na query %d/%d", termo[:50], inicio + 1, len(queries))
+    else:
+        # Gera queries com múltiplos motores de busca, as de maior rendimento primeiro
+        queries = agendador.ordenar(gerar_queries_inteligentes(termo), termo, autor, titulo)
+        inicio = 0
+        if diario:
+            diario.iniciar_livro(termo, queries)
 
     try:
         # Tenta com motores diferentes para diversificar resultados
-        for query, motor in queries:
+        for n, (query, motor) in enumerate(queries[inicio:], inicio + 1):
             log.info("Buscando [%s]: %s", motor.upper(), query[:60])
+            if diario:
+                diario.iniciar_query(termo, n - 1)
             if callback_progresso:
                 callback_progresso(termo, "buscando")
             
-            if await tentar_busca(page, query, download_path, termo, nivel, motor):
-                log.info("✅ Download concluído: %s", nome_arquivo)
-                if callback_progresso:
-                    callback_progresso(termo, "sucesso")
-                return True
-            
-            # Delay entre queries para evitar bloqueio
-            await asyncio.sleep(random.uniform(2, 4))
+            url_pdf = await tentar_busca(page, query, download_path, termo, nivel, motor,
+                                         downloads_paralelos, diario)
+            # modo_busca depois da busca: um motor HTML bloqueado nela já
+            # foi ao navegador
+            if (url_pdf is None and page is not None and modo_busca(motor) == "navegador"
+                    and not pagina_viva(page)):
+                # As queries seguintes no navegador falhariam todas sem nem
+                # buscar: o livro não é encerrado (nem no diário nem no
+                # agendador) e a retomada continua desta query
+                log.error("Página do navegador caiu durante '%s' (query %d)", termo[:50], n)
+                return concluir("erro")
+            # Só conta para o template se algum candidato foi testado: erro ou
+            # bloqueio do motor e links já testados não dizem nada sobre a query
+            if url_pdf is not None:
+                agendador.registrar(query, motor, termo, bool(url_pdf), autor, titulo)
+            if url_pdf:
+                log.info("✅ Download concluído: %s (query %d)", nome_arquivo, n)
+                agendador.registrar_livro(termo, n, True)
+                return concluir("sucesso", url_pdf, motor, n)
 
+        agendador.registrar_livro(termo, len(queries), False)
         log.warning("❌ Nenhum PDF válido encontrado para: %s", termo)
-        if callback_progresso:
-            callback_progresso(termo, "falhou")
-        return False
+        return concluir("falhou", query=len(queries))
 
     except Exception as e:
         log.error("Erro ao buscar '%s': %s", termo, e)
-        if callback_progresso:
-            callback_progresso(termo, "erro")
-        return False
+        return concluir("erro")
 
 
 async def main():
@@ -427,23 +1493,24 @@ async def main():
     async with async_playwright() as p:
         browser, page = await configurar_navegador(p)
         falhas = []
+        diario = abrir_diario(DOWNLOAD_DIR, LISTA_LIVROS_PADRAO, "moderado")
 
         try:
             for livro in LISTA_LIVROS_PADRAO:
-                sucesso = await buscar_e_baixar(page, livro, nivel="moderado")
+                estado = diario.estado(livro)
+                if estado is not None and estado.concluido:
+                    sucesso = estado.sucesso
+                else:
+                    sucesso = await buscar_e_baixar(page, livro, nivel="moderado", diario=diario)
                 if not sucesso:
                     falhas.append(livro)
-                await asyncio.sleep(random.uniform(5, 10))
-
-            # Segunda rodada para os que falharam
-            if falhas:
-                log.info("=== Retry: %d livros falharam, tentando novamente ===", len(falhas))
-                for livro in falhas:
-                    await buscar_e_baixar(page, livro, nivel="moderado")
-                    await asyncio.sleep(random.uniform(5, 10))
+            diario.concluir()
 
         finally:
+            diario.fechar()
+            await fechar_cliente_http()
             await browser.close()
+            fechar_indice()
 
     # Relatório final
     baixados = [f for f in os.listdir(DOWNLOAD_DIR) if f.endswith(".pdf")]
@@ -457,49 +1524,190 @@ async def main():
 class CrawlerBibliografia:
     """Classe para gerenciar busca e download de bibliografia."""
     
-    def __init__(self, callback_progresso: Optional[Callable[[str, str], None]] = None):
+    def __init__(
+        self,
+        callback_progresso: Optional[Callable[[str, str], None]] = None,
+        concorrencia: int = CONCORRENCIA_PADRAO,
+        downloads_paralelos: int = DOWNLOADS_PARALELOS,
+        navegador: Optional[GerenciadorNavegador] = None,
+        callback_resultado: Optional[Callable[[dict], None]] = None,
+    ):
         self.callback_progresso = callback_progresso
+        # Recebe o registro de cada livro assim que ele termina (ver _resultado_livro)
+        self.callback_resultado = callback_resultado
+        self.concorrencia = concorrencia
+        self.downloads_paralelos = downloads_paralelos
+        # Navegador compartilhado (ex.: o app mantém um aquecido entre execuções);
+        # sem ele, cada execução abre e fecha o seu
+        self.navegador = navegador
         self.sucessos = []
         self.falhas = []
         self.cancelar = False
         
-    async def executar(self, lista_livros: list[str], nivel: str = "moderado"):
-        """Executa o crawler para uma lista de livros."""
+    async def executar(
+        self,
+        lista_livros: Iterable[str],
+        nivel: str = "moderado",
+        concorrencia: Optional[int] = None,
+        execucao: str = "",
+        tempo_maximo: Optional[float] = None,
+    ):
+        """Executa o crawler para uma lista de livros.
+        
+        Até `concorrencia` livros são buscados ao mesmo tempo, cada um usando
+        uma página (com contexto próprio) retirada de um pool limitado.
+        
+        `lista_livros` pode ser um iterador (ex.: linhas de um arquivo
+        grande), consumido só quando uma página fica livre; nesse caso
+        `execucao` (ex.: o caminho do arquivo) identifica a execução no
+        diário, senão o iterador é lido inteiro para isso. Com `tempo_maximo`
+        (segundos), os livros ainda em andamento no fim do prazo são
+        interrompidos e ficam no diário para a próxima execução.
+        """
         os.makedirs(DOWNLOAD_DIR, exist_ok=True)
         self.sucessos = []
         self.falhas = []
+        prazo = time.monotonic() + tempo_maximo if tempo_maximo else None
         
-        async with async_playwright() as p:
-            browser, page = await configurar_navegador(p)
-            
+        if not execucao and not isinstance(lista_livros, Sized):
+            lista_livros = list(lista_livros)
+        tamanho = len(lista_livros) if isinstance(lista_livros, Sized) else None
+        concorrencia = concorrencia or self.concorrencia
+        num_paginas = max(1, min(concorrencia, CONCORRENCIA_MAXIMA,
+                                 tamanho if tamanho is not None else concorrencia))
+        pendentes = iter(lista_livros)
+        
+        navegador = self.navegador or GerenciadorNavegador(criar_pagina)
+        # Progresso em disco: a mesma lista, de novo, retoma de onde parou
+        diario = abrir_diario(DOWNLOAD_DIR, [execucao] if execucao else lista_livros, nivel)
+        
+        # Pool limitado de páginas: cada livro em andamento ocupa uma
+        pool_paginas: asyncio.Queue = asyncio.Queue(maxsize=num_paginas)
+        paginas = []
+        
+        async def trocar_pagina(page, renovar):
             try:
-                for livro in lista_livros:
-                    # Verifica se foi cancelado
-                    if self.cancelar:
-                        log.warning("Busca cancelada pelo usuário")
-                        break
-                    
+                nova = await renovar(page)
+            except Exception as e:
+                log.error("Erro ao renovar página do navegador: %s", str(e)[:100])
+                return page
+            if nova is not page:
+                paginas[paginas.index(page)] = nova
+            return nova
+        
+        async def processar_fila():
+            while True:
+                # Verifica se foi cancelado antes de pegar o próximo livro
+                if self.cancelar:
+                    return
+                livro = next(pendentes, None)
+                if livro is None:
+                    return
+                
+                estado = diario.estado(livro)
+                # Sucesso cujo PDF foi apagado (o app limpa a pasta ao fechar) é buscado de novo
+                if (estado is not None and estado.concluido
+                        and (not estado.sucesso or os.path.exists(caminho_download(livro)))):
+                    # Já decidido antes da interrupção
+                    (self.sucessos if estado.sucesso else self.falhas).append(livro)
+                    status = "sucesso" if estado.sucesso else "falhou"
+                    if self.callback_progresso:
+                        self.callback_progresso(livro, status)
+                    if self.callback_resultado:
+                        self.callback_resultado(estado.resultado or {"termo": livro, "status": status})
+                    continue
+                
+                # Páginas paradas no pool caem junto com o navegador
+                page = await trocar_pagina(await pool_paginas.get(), navegador.conferir_pagina)
+                try:
                     sucesso = await buscar_e_baixar(
                         page, 
                         livro, 
                         nivel=nivel,
-                        callback_progresso=self.callback_progresso
+                        callback_progresso=self.callback_progresso,
+                        downloads_paralelos=self.downloads_paralelos,
+                        diario=diario,
+                        callback_resultado=self.callback_resultado,
                     )
-                    
-                    if sucesso:
-                        self.sucessos.append(livro)
-                    else:
-                        self.falhas.append(livro)
-                    
-                    await asyncio.sleep(random.uniform(3, 6))
+                finally:
+                    # Troca o contexto se já navegou demais ou o navegador caiu
+                    pool_paginas.put_nowait(await trocar_pagina(page, navegador.devolver_pagina))
                 
-            finally:
-                await browser.close()
+                if sucesso:
+                    self.sucessos.append(livro)
+                else:
+                    self.falhas.append(livro)
+        
+        tarefas = []
+        esgotado = False
+        try:
+            inicio = time.monotonic()
+            for _ in range(num_paginas):
+                page = await navegador.nova_pagina()
+                paginas.append(page)
+                pool_paginas.put_nowait(page)
+            log.info("Navegador pronto em %.2fs", time.monotonic() - inicio)
+            
+            if tamanho is None:
+                log.info("Buscando livros (lidos sob demanda) com %d páginas em paralelo", num_paginas)
+            else:
+                log.info("Buscando %d livros com %d páginas em paralelo", tamanho, num_paginas)
+            tarefas = [asyncio.create_task(processar_fila()) for _ in range(num_paginas)]
+            try:
+                restante = max(0.0, prazo - time.monotonic()) if prazo else None
+                await asyncio.wait_for(asyncio.gather(*tarefas), restante)
+            except asyncio.TimeoutError:
+                esgotado = True
+                log.warning("Tempo máximo de %.0fs atingido; livros em andamento ficam para a retomada",
+                            tempo_maximo)
+            
+            if self.cancelar:
+                log.warning("Busca cancelada pelo usuário")
+            elif not esgotado:
+                diario.concluir()
+            
+        finally:
+            indice = obter_indice()
+            indice.gravar()
+            log.info("Pré-validação: %s", resumo_prevalidacao())
+            log.info("Validação: %s", resumo_validacao())
+            log.info("Cache negativo: %.0f%% de acertos (%d/%d)",
+                     indice.taxa_acerto_rejeicoes() * 100,
+                     indice.acertos_rejeicao, indice.consultas_rejeicao)
+            log.info("Cache de buscas: %d acertos, %d faltas",
+                     indice.acertos_serp, indice.faltas_serp)
+            log.info("Manifesto: %d arquivos aceitos sem revalidar, %d validados",
+                     indice.acertos_arquivos, indice.faltas_arquivos)
+            log.info("Buscas: %d sem navegador, %d no navegador, %d bloqueios",
+                     estatisticas_serp["html"], estatisticas_serp["navegador"],
+                     estatisticas_serp["bloqueios"])
+            log.info("Páginas de busca: %s", resumo_carga_paginas())
+            log.info("Limitador: motores %s; downloads %s",
+                     limitador_motores.resumo(), limitador_hosts.resumo())
+            log.info("Queries por livro encontrado: %.1f nesta execução, %.1f no histórico",
+                     obter_agendador().media_queries_por_sucesso(),
+                     indice.media_queries_por_sucesso())
+            log.info("Navegador: %s", navegador.resumo())
+            log.info("Reputação: %s", obter_reputacao().resumo())
+            if metricas.ativa:
+                for linha in metricas.resumo():
+                    log.info("Métricas: %s", linha)
+            for tarefa in tarefas:
+                tarefa.cancel()
+            await asyncio.gather(*tarefas, return_exceptions=True)
+            diario.fechar()
+            await fechar_cliente_http()
+            if self.navegador is None:
+                await navegador.fechar()
+            else:
+                # Navegador compartilhado continua aberto; só os contextos saem
+                for page in paginas:
+                    await navegador.liberar_pagina(page)
         
         return {
             "sucessos": self.sucessos,
             "falhas": self.falhas,
-            "total": len(lista_livros)
+            "total": tamanho if tamanho is not None else len(self.sucessos) + len(self.falhas)
         }
 
 
@@ -0,0 +1,237 @@
+import asyncio
+import bisect
+import http.server
+import json
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+log = logging.getLogger(__name__)
+
+# Desligadas por padrão (cli.py liga com --metricas-porta/--metricas-json)
+METRICAS_ATIVAS = False
+# Limites, em segundos, dos buckets dos histogramas (o último é +Inf)
+BUCKETS_SEGUNDOS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+INTERVALO_JSON = 30.0
+
+
+class _Cronometro:
+    __slots__ = ("metricas", "nome", "rotulos", "inicio")
+
+    def __init__(self, metricas: "Metricas", nome: str, rotulos: dict):
+        self.metricas = metricas
+        self.nome = nome
+        self.rotulos = rotulos
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        self.metricas.observar(self.nome, time.perf_counter() - self.inicio, **self.rotulos)
+        return False
+
+
+class _CronometroNulo:
+    """Usado com as métricas desligadas: não mede nada."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        return False
+
+
+_NULO = _CronometroNulo()
+
+
+def _escapar(valor) -> str:
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _rotulos_texto(rotulos: tuple) -> str:
+    if not rotulos:
+        return ""
+    return "{" + ",".join(f'{chave}="{_escapar(valor)}"' for chave, valor in rotulos) + "}"
+
+
+class Metricas:
+    """Contadores e histogramas em memória, com rótulos (motor, host, etapa...).
+
+    `cronometrar` mede um bloco `with` e guarda a duração no histograma;
+    `observar` e `contar` registram valores já conhecidos. Desligada
+    (`ativa` False), cada chamada só testa a flag e retorna, e
+    `cronometrar` devolve sempre o mesmo objeto que não faz nada.
+
+    Exporta no formato texto do Prometheus (`servir_prometheus` abre um
+    endpoint HTTP numa thread), em JSON (`gravar_json`) e num resumo para
+    o log do fim da execução.
+    """
+
+    def __init__(self, ativa: bool = METRICAS_ATIVAS, buckets: tuple = BUCKETS_SEGUNDOS):
+        self.ativa = ativa
+        self.buckets = tuple(buckets)
+        # (nome, rótulos ordenados) -> valor
+        self._contadores: dict[tuple[str, tuple], float] = {}
+        # (nome, rótulos ordenados) -> [contagem por bucket..., +Inf, soma]
+        self._histogramas: dict[tuple[str, tuple], list] = {}
+        # O endpoint lê de outra thread
+        self._lock = threading.Lock()
+        self._servidor: Optional[http.server.ThreadingHTTPServer] = None
+
+    # --- Registro ---------------------------------------------------------
+
+    def contar(self, nome: str, valor: float = 1, **rotulos) -> None:
+        if not self.ativa:
+            return
+        chave = (nome, tuple(sorted(rotulos.items())))
+        with self._lock:
+            self._contadores[chave] = self._contadores.get(chave, 0) + valor
+
+    def observar(self, nome: str, valor: float, **rotulos) -> None:
+        if not self.ativa:
+            return
+        chave = (nome, tuple(sorted(rotulos.items())))
+        with self._lock:
+            histograma = self._histogramas.get(chave)
+            if histograma is None:
+                histograma = self._histogramas[chave] = [0] * (len(self.buckets) + 1) + [0.0]
+            histograma[bisect.bisect_left(self.buckets, valor)] += 1
+            histograma[-1] += valor
+
+    def cronometrar(self, nome: str, **rotulos):
+        """Context manager que observa a duração do bloco em `nome`."""
+        if not self.ativa:
+            return _NULO
+        return _Cronometro(self, nome, rotulos)
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._contadores.clear()
+            self._histogramas.clear()
+
+    # --- Exportação -------------------------------------------------------
+
+    def _copiar(self) -> tuple[dict, dict]:
+        with self._lock:
+            return dict(self._contadores), {chave: list(h) for chave, h in self._histogramas.items()}
+
+    def exportar_prometheus(self) -> str:
+        """Formato texto de exposição do Prometheus."""
+        contadores, histogramas = self._copiar()
+        linhas = []
+        tipos_vistos = set()
+        for (nome, rotulos), valor in sorted(contadores.items()):
+            if nome not in tipos_vistos:
+                tipos_vistos.add(nome)
+                linhas.append(f"# TYPE {nome} counter")
+            linhas.append(f"{nome}{_rotulos_texto(rotulos)} {valor:.15g}")
+        for (nome, rotulos), histograma in sorted(histogramas.items()):
+            if nome not in tipos_vistos:
+                tipos_vistos.add(nome)
+                linhas.append(f"# TYPE {nome} histogram")
+            acumulado = 0
+            for limite, contagem in zip((*self.buckets, "+Inf"), histograma):
+                acumulado += contagem
+                linhas.append(f"{nome}_bucket{_rotulos_texto((*rotulos, ('le', limite)))} {acumulado}")
+            linhas.append(f"{nome}_sum{_rotulos_texto(rotulos)} {histograma[-1]:.6f}")
+            linhas.append(f"{nome}_count{_rotulos_texto(rotulos)} {acumulado}")
+        return "\n".join(linhas) + "\n"
+
+    def exportar_json(self) -> dict:
+        contadores, histogramas = self._copiar()
+        return {
+            "timestamp": time.time(),
+            "contadores": [
+                {"nome": nome, "rotulos": dict(rotulos), "valor": valor}
+                for (nome, rotulos), valor in sorted(contadores.items())
+            ],
+            "histogramas": [
+                {"nome": nome, "rotulos": dict(rotulos), "contagem": sum(h[:-1]), "soma": h[-1],
+                 "buckets": dict(zip([*map(str, self.buckets), "+Inf"], h[:-1]))}
+                for (nome, rotulos), h in sorted(histogramas.items())
+            ],
+        }
+
+    def gravar_json(self, caminho: str) -> None:
+        """Grava um retrato das métricas (troca atômica do arquivo)."""
+        temporario = f"{caminho}.tmp"
+        try:
+            with open(temporario, "w", encoding="utf-8") as f:
+                json.dump(self.exportar_json(), f, ensure_ascii=False)
+            os.replace(temporario, caminho)
+        except OSError as e:
+            log.error("Erro ao gravar métricas em %s: %s", caminho, e)
+
+    async def gravar_json_periodicamente(self, caminho: str, intervalo: float = INTERVALO_JSON) -> None:
+        """Regrava o retrato a cada `intervalo` segundos (cancelar para parar)."""
+        try:
+            while True:
+                await asyncio.sleep(intervalo)
+                self.gravar_json(caminho)
+        finally:
+            self.gravar_json(caminho)
+
+    def servir_prometheus(self, porta: int, endereco: str = "127.0.0.1") -> None:
+        """Abre GET /metrics (qualquer caminho serve) numa thread daemon."""
+        metricas = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                corpo = metricas.exportar_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def log_message(self, *args):
+                pass
+
+        self._servidor = http.server.ThreadingHTTPServer((endereco, porta), Handler)
+        threading.Thread(target=self._servidor.serve_forever, daemon=True).start()
+        log.info("Métricas Prometheus em http://%s:%d/metrics", endereco, porta)
+
+    def parar_servidor(self) -> None:
+        if self._servidor is not None:
+            self._servidor.shutdown()
+            self._servidor.server_close()
+            self._servidor = None
+
+    def _percentil(self, histograma: list, fracao: float) -> str:
+        """Limite do bucket onde cai o percentil (aproximação por cima)."""
+        alvo = fracao * sum(histograma[:-1])
+        acumulado = 0
+        for limite, contagem in zip((*self.buckets, None), histograma):
+            acumulado += contagem
+            if acumulado >= alvo:
+                return f"≤{limite:g}s" if limite is not None else f">{self.buckets[-1]:g}s"
+        return "-"
+
+    def resumo(self) -> list[str]:
+        """Linhas para o log do fim da execução: cada histograma somado
+        sobre os rótulos (n, total, média, p50/p95) e cada contador."""
+        contadores, histogramas = self._copiar()
+        somados: dict[str, list] = {}
+        for (nome, _), histograma in histogramas.items():
+            total = somados.setdefault(nome, [0] * len(histograma))
+            for i, valor in enumerate(histograma):
+                total[i] += valor
+        linhas = []
+        for nome, h in sorted(somados.items(), key=lambda item: -item[1][-1]):
+            n = sum(h[:-1])
+            linhas.append(f"{nome}: {n}×, {h[-1]:.1f}s no total, média {h[-1] / n:.2f}s, "
+                          f"p50 {self._percentil(h, 0.5)}, p95 {self._percentil(h, 0.95)}")
+        por_nome: dict[str, float] = {}
+        for (nome, _), valor in contadores.items():
+            por_nome[nome] = por_nome.get(nome, 0) + valor
+        linhas += [f"{nome}: {valor:.15g}" for nome, valor in sorted(por_nome.items())]
+        return linhas
+
+
+# Instância do processo; main.py registra nela
+metricas = Metricas()
@@ -0,0 +1,309 @@
+import base64
+import logging
+import re
+from html.parser import HTMLParser
+from typing import Optional
+from urllib.parse import parse_qs, quote_plus, urljoin, urlparse
+
+log = logging.getLogger(__name__)
+
+# Espera máxima pelos resultados renderizarem (segundos)
+TEMPO_MAXIMO_RESULTADOS = 8
+
+_PDF_HREF = re.compile(r"\.pdf(\?|#|$)", re.I)
+_PDF_DADOS = re.compile(r"\.pdf", re.I)
+_PDF_TEXTO = re.compile(r"https?://[^\s]+\.pdf", re.I)
+
+# Extrator genérico: a página inteira (layout desconhecido ou mudou)
+EXTRATOR_PAGINA_JS = """() => {
+    const allLinks = [];
+
+    // Verifica se a página está carregada
+    if (!document.body) {
+        return [];
+    }
+
+    // 1. Links diretos para PDF
+    document.querySelectorAll('a').forEach(a => {
+        if (a.href && a.href.match(/\\.pdf(\\?|#|$)/i)) {
+            allLinks.push(a.href);
+        }
+    });
+
+    // 2. Links em atributos data-* e onclick
+    document.querySelectorAll('[data-url], [data-href], [onclick]').forEach(el => {
+        const dataUrl = el.getAttribute('data-url') || el.getAttribute('data-href');
+        if (dataUrl && dataUrl.match(/\\.pdf/i)) {
+            allLinks.push(dataUrl);
+        }
+    });
+
+    // 3. Procura por URLs em texto (resultados de busca)
+    try {
+        const pageText = document.body ? document.body.innerText : '';
+        const urlPattern = /https?:\\/\\/[^\\s]+\\.pdf/gi;
+        const matches = pageText.matchAll(urlPattern);
+        for (const match of matches) {
+            allLinks.push(match[0]);
+        }
+    } catch (e) {
+        // Ignora erros na extração de texto
+    }
+
+    return allLinks.filter(href => href.startsWith('http'));
+}"""
+
+# Extrator dirigido: só dentro dos blocos de resultado orgânico. Devolve
+# todos os hrefs (o filtro de PDF é feito em Python, depois de desembrulhar
+# os redirecionamentos do motor) e as URLs .pdf do texto de cada bloco
+EXTRATOR_RESULTADOS_JS = """(seletor) => {
+    const blocos = document.querySelectorAll(seletor);
+    const hrefs = [];
+    const dados = [];
+    const textos = [];
+    blocos.forEach(bloco => {
+        bloco.querySelectorAll('a[href]').forEach(a => hrefs.push(a.href));
+        bloco.querySelectorAll('[data-url], [data-href]').forEach(el => {
+            dados.push(el.getAttribute('data-url') || el.getAttribute('data-href'));
+        });
+        const texto = bloco.innerText || '';
+        for (const m of texto.matchAll(/https?:\\/\\/[^\\s]+\\.pdf/gi)) {
+            textos.push(m[0]);
+        }
+    });
+    return {blocos: blocos.length, hrefs: hrefs, dados: dados, textos: textos};
+}"""
+
+
+def desembrulhar_redirecionamento(url: str) -> str:
+    """URL real por trás dos links de rastreamento dos motores."""
+    partes = urlparse(url)
+    host = partes.netloc
+    if not partes.query:
+        return url
+    parametros = parse_qs(partes.query)
+    # DuckDuckGo: /l/?uddg=<url>
+    if partes.path == "/l/" and "duckduckgo" in host and parametros.get("uddg"):
+        return parametros["uddg"][0]
+    # Google: /url?q=<url> (ou url=)
+    if partes.path == "/url" and "google" in host:
+        destino = (parametros.get("q") or parametros.get("url") or [""])[0]
+        if destino.startswith("http"):
+            return destino
+    # Bing: /ck/a?...&u=a1<base64url da URL>
+    if partes.path == "/ck/a" and "bing" in host:
+        codificado = (parametros.get("u") or [""])[0]
+        if codificado.startswith("a1"):
+            try:
+                bruto = codificado[2:]
+                return base64.urlsafe_b64decode(bruto + "=" * (-len(bruto) % 4)).decode()
+            except Exception:
+                pass
+    return url
+
+
+def _links_pdf(hrefs: list[str], dados: list[str], textos: list[str]) -> list[str]:
+    """hrefs (já absolutos) que apontam para PDF, atributos data-* com .pdf
+    e URLs .pdf do texto, como no extrator genérico."""
+    links = [href for href in map(desembrulhar_redirecionamento, hrefs) if _PDF_HREF.search(href)]
+    links += [url for url in dados if url and _PDF_DADOS.search(url)]
+    links += textos
+    return [href for href in links if href.startswith("http")]
+
+
+class _ExtratorHtml(HTMLParser):
+    """Versão em Python dos extratores JS, para páginas buscadas sem navegador.
+
+    Com `bloco` = (tag, classe), só lê o que está dentro desses elementos
+    (resultados orgânicos); sem ele, lê a página toda.
+    """
+
+    IGNORAR_TEXTO = {"script", "style", "noscript", "template"}
+    # Elementos sem tag de fechamento não contam na profundidade
+    VAZIOS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+    def __init__(self, url_base: str, bloco: Optional[tuple[str, str]] = None):
+        super().__init__(convert_charrefs=True)
+        self.url_base = url_base
+        self.bloco = bloco
+        self.hrefs: list[str] = []
+        self.dados: list[str] = []
+        self.textos: list[str] = []
+        self.blocos = 0
+        self._ignorando = 0
+        self._pilha_bloco: list[str] = []  # tags abertas dentro do bloco atual
+
+    @property
+    def _lendo(self) -> bool:
+        return self.bloco is None or bool(self._pilha_bloco)
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if self.bloco and tag not in self.VAZIOS:
+            if self._pilha_bloco:
+                self._pilha_bloco.append(tag)
+            elif tag == self.bloco[0] and self.bloco[1] in (attrs.get("class") or "").split():
+                self.blocos += 1
+                self._pilha_bloco.append(tag)
+        if tag in self.IGNORAR_TEXTO:
+            self._ignorando += 1
+        if not self._lendo:
+            return
+        if tag == "a" and attrs.get("href"):
+            self.hrefs.append(urljoin(self.url_base, attrs["href"]))
+        url_dados = attrs.get("data-url") or attrs.get("data-href")
+        if url_dados:
+            self.dados.append(url_dados)
+
+    def handle_endtag(self, tag):
+        if tag in self.IGNORAR_TEXTO and self._ignorando:
+            self._ignorando -= 1
+        if self._pilha_bloco and tag in self._pilha_bloco:
+            # Fecha também tags que o HTML deixou abertas
+            while self._pilha_bloco and self._pilha_bloco.pop() != tag:
+                pass
+
+    def handle_data(self, data):
+        if self._lendo and not self._ignorando:
+            self.textos.append(data)
+
+
+class MotorBusca:
+    """Adaptador de um motor de busca.
+
+    - `modelo_url`: URL de busca, com {query} e {offset} (paginação);
+      `resultados_por_pagina` converte o nº da página em offset.
+    - `modelo_html`: URL da versão de HTML estático (None = só navegador).
+    - `seletor_pronto`: aparece quando os resultados renderizaram.
+    - `seletor_resultados`: blocos de resultado orgânico (CSS).
+    - `bloco_html`: (tag, classe) dos blocos na versão HTML estática.
+
+    Sem blocos reconhecidos (layout mudou), a extração cai para a página toda.
+    """
+
+    def __init__(
+        self,
+        nome: str,
+        modelo_url: str,
+        seletor_pronto: str,
+        seletor_resultados: str,
+        resultados_por_pagina: int = 10,
+        offset_inicial: int = 0,
+        modelo_html: Optional[str] = None,
+        bloco_html: Optional[tuple[str, str]] = None,
+    ):
+        self.nome = nome
+        self.modelo_url = modelo_url
+        self.seletor_pronto = seletor_pronto
+        self.seletor_resultados = seletor_resultados
+        self.resultados_por_pagina = resultados_por_pagina
+        self.offset_inicial = offset_inicial
+        self.modelo_html = modelo_html
+        self.bloco_html = bloco_html
+        self.extracoes_genericas = 0
+
+    def _formatar(self, modelo: str, query: str, pagina: int) -> str:
+        offset = self.offset_inicial + pagina * self.resultados_por_pagina
+        return modelo.format(query=quote_plus(query), offset=offset, pagina=pagina + 1)
+
+    def url(self, query: str, pagina: int = 0) -> str:
+        return self._formatar(self.modelo_url, query, pagina)
+
+    def url_html(self, query: str, pagina: int = 0) -> str:
+        return self._formatar(self.modelo_html, query, pagina)
+
+    async def aguardar_resultados(self, page) -> bool:
+        """Espera só até os resultados aparecerem. False se não apareceram."""
+        try:
+            await page.wait_for_selector(self.seletor_pronto, timeout=TEMPO_MAXIMO_RESULTADOS * 1000)
+            return True
+        except Exception:
+            log.debug("Resultados de %s não apareceram em %ds", self.nome, TEMPO_MAXIMO_RESULTADOS)
+            return False
+
+    async def extrair(self, page) -> list[str]:
+        """Links PDF (com repetições) dos resultados orgânicos da página aberta."""
+        resultado = await page.evaluate(EXTRATOR_RESULTADOS_JS, self.seletor_resultados)
+        if resultado["blocos"]:
+            return _links_pdf(resultado["hrefs"], resultado["dados"], resultado["textos"])
+        self.extracoes_genericas += 1
+        log.debug("Nenhum bloco de resultado em %s; extraindo da página toda", self.nome)
+        # O extrator genérico já filtra hrefs, data-* e texto (e só devolve http...)
+        return await page.evaluate(EXTRATOR_PAGINA_JS)
+
+    def extrair_html(self, html: str, url_base: str) -> list[str]:
+        """Mesma extração de `extrair`, sobre o HTML baixado sem navegador."""
+        extrator = _ExtratorHtml(url_base, self.bloco_html)
+        extrator.feed(html)
+        extrator.close()
+        if self.bloco_html and not extrator.blocos:
+            self.extracoes_genericas += 1
+            return extrair_links_html(html, url_base)
+        return _links_pdf(extrator.hrefs, extrator.dados, _PDF_TEXTO.findall(" ".join(extrator.textos)))
+
+
+def extrair_links_html(html: str, url_base: str) -> list[str]:
+    """Extração genérica (página toda) de um HTML de resultados."""
+    extrator = _ExtratorHtml(url_base)
+    extrator.feed(html)
+    extrator.close()
+    return _links_pdf(extrator.hrefs, extrator.dados, _PDF_TEXTO.findall(" ".join(extrator.textos)))
+
+
+MOTORES = {
+    "bing": MotorBusca(
+        "bing",
+        "https://www.bing.com/search?q={query}&first={offset}",
+        seletor_pronto="#b_results",
+        seletor_resultados="#b_results > li.b_algo",
+        offset_inicial=1,
+        modelo_html="https://www.bing.com/search?q={query}&first={offset}",
+        bloco_html=("li", "b_algo"),
+    ),
+    "duckduckgo": MotorBusca(
+        "duckduckgo",
+        "https://duckduckgo.com/?q={query}&s={offset}",
+        seletor_pronto="[data-testid='result'], .react-results--main",
+        seletor_resultados="article[data-testid='result']",
+        resultados_por_pagina=30,
+        modelo_html="https://html.duckduckgo.com/html/?q={query}&s={offset}",
+        bloco_html=("div", "result"),
+    ),
+    "google": MotorBusca(
+        "google",
+        "https://www.google.com/search?q={query}&start={offset}",
+        seletor_pronto="#search, #botstuff",
+        seletor_resultados="#search .g, #rso > div",
+    ),
+    "yandex": MotorBusca(
+        "yandex",
+        "https://yandex.com/search/?text={query}&p={offset}",
+        seletor_pronto=".serp-list, #search-result",
+        seletor_resultados="li.serp-item",
+        resultados_por_pagina=1,
+    ),
+    "brave": MotorBusca(
+        "brave",
+        "https://search.brave.com/search?q={query}&offset={offset}",
+        seletor_pronto="#results",
+        seletor_resultados="#results .snippet[data-type='web']",
+        resultados_por_pagina=1,
+    ),
+    "startpage": MotorBusca(
+        "startpage",
+        "https://www.startpage.com/do/search?q={query}&page={pagina}",
+        seletor_pronto=".w-gl, .result",
+        seletor_resultados=".w-gl .result, .w-gl__result",
+    ),
+    "qwant": MotorBusca(
+        "qwant",
+        "https://www.qwant.com/?q={query}&t=web&offset={offset}",
+        seletor_pronto="[data-testid='webResult'], [data-testid='sectionWeb']",
+        seletor_resultados="[data-testid='webResult']",
+    ),
+}
+
+
+def obter_motor(nome: str) -> MotorBusca:
+    """Adaptador do motor (Bing para nomes desconhecidos, como antes)."""
+    return MOTORES.get(nome, MOTORES["bing"])
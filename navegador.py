@@ -0,0 +1,165 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable
+
+from playwright.async_api import async_playwright
+
+log = logging.getLogger(__name__)
+
+# Navegações (páginas de busca abertas) antes de trocar o contexto por um novo
+NAVEGACOES_POR_CONTEXTO = 200
+# Heap JS de um contexto acima disso também força a troca
+MEMORIA_MAXIMA_MB = 512
+
+
+def pagina_viva(page) -> bool:
+    """False se a página foi fechada ou o navegador dela caiu."""
+    try:
+        browser = page.context.browser
+        return not page.is_closed() and (browser is None or browser.is_connected())
+    except Exception:
+        return False
+
+
+class GerenciadorNavegador:
+    """Mantém um Chromium aberto entre execuções e entrega páginas novas.
+
+    Cada página vem num contexto próprio, criado por `preparar_pagina(browser)`
+    (UA, stealth, bloqueio de recursos). Ao ser devolvida, a página é trocada
+    por uma nova se o contexto passou de `max_navegacoes`, se o heap JS passou
+    de `memoria_maxima_mb` ou se a página/navegador caiu. Se o Chromium cair,
+    ele é relançado no próximo pedido de página.
+    """
+
+    def __init__(
+        self,
+        preparar_pagina: Callable[[object], Awaitable[object]],
+        max_navegacoes: int = NAVEGACOES_POR_CONTEXTO,
+        memoria_maxima_mb: float = MEMORIA_MAXIMA_MB,
+        headless: bool = True,
+    ):
+        self.preparar_pagina = preparar_pagina
+        self.max_navegacoes = max_navegacoes
+        self.memoria_maxima_mb = memoria_maxima_mb
+        self.headless = headless
+        self._playwright = None
+        self._browser = None
+        self._lock = asyncio.Lock()
+        self._navegacoes: dict[object, int] = {}
+
+        # Métricas do ciclo de vida
+        self.inicializacoes = 0
+        self.reinicios = 0
+        self.reciclagens = 0
+        self.segundos_inicializacao = 0.0
+
+    @property
+    def ativo(self) -> bool:
+        return self._browser is not None and self._browser.is_connected()
+
+    async def iniciar(self):
+        """Lança o Chromium se ainda não está rodando (ou caiu). Retorna o browser."""
+        async with self._lock:
+            if self.ativo:
+                return self._browser
+            reinicio = self._browser is not None
+            if reinicio:
+                log.warning("Navegador caiu; reiniciando")
+                self.reinicios += 1
+                self._navegacoes.clear()
+                await self._encerrar_browser()
+
+            inicio = time.monotonic()
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+            self._browser = await self._playwright.chromium.launch(headless=self.headless)
+            self.inicializacoes += 1
+            self.segundos_inicializacao += time.monotonic() - inicio
+            log.info("Navegador %s em %.1fs", "reiniciado" if reinicio else "iniciado",
+                     time.monotonic() - inicio)
+            return self._browser
+
+    async def nova_pagina(self):
+        """Página nova, num contexto novo, no navegador já aquecido."""
+        browser = await self.iniciar()
+        page = await self.preparar_pagina(browser)
+        self._navegacoes[page] = 0
+
+        def navegou(frame) -> None:
+            if frame == page.main_frame:
+                self._navegacoes[page] = self._navegacoes.get(page, 0) + 1
+
+        page.on("framenavigated", navegou)
+        return page
+
+    async def _memoria_mb(self, page) -> float:
+        """Heap JS usado pela página, via CDP (0 se não der para medir)."""
+        try:
+            cdp = await page.context.new_cdp_session(page)
+            try:
+                await cdp.send("Performance.enable")
+                metricas = await cdp.send("Performance.getMetrics")
+            finally:
+                await cdp.detach()
+        except Exception:
+            return 0.0
+        usado = next((m["value"] for m in metricas.get("metrics", []) if m["name"] == "JSHeapUsedSize"), 0)
+        return usado / (1024 * 1024)
+
+    async def conferir_pagina(self, page):
+        """Antes de entregar uma página do pool: ela mesma ou, se caiu junto
+        com o navegador enquanto esperava, uma nova."""
+        if self.ativo and pagina_viva(page):
+            return page
+        return await self._reciclar(page, "navegador/página caiu")
+
+    async def devolver_pagina(self, page):
+        """Recebe a página de volta após um livro; retorna ela mesma ou uma nova."""
+        motivo = ""
+        if not self.ativo or not pagina_viva(page):
+            motivo = "navegador/página caiu"
+        elif self._navegacoes.get(page, 0) >= self.max_navegacoes:
+            motivo = f"{self._navegacoes[page]} navegações"
+        elif self.memoria_maxima_mb:
+            memoria = await self._memoria_mb(page)
+            if memoria > self.memoria_maxima_mb:
+                motivo = f"{memoria:.0f} MB de heap"
+        if not motivo:
+            return page
+        return await self._reciclar(page, motivo)
+
+    async def _reciclar(self, page, motivo: str):
+        log.info("Reciclando contexto do navegador (%s)", motivo)
+        self.reciclagens += 1
+        await self.liberar_pagina(page)
+        return await self.nova_pagina()
+
+    async def liberar_pagina(self, page) -> None:
+        """Fecha o contexto da página (fim da execução ou reciclagem)."""
+        self._navegacoes.pop(page, None)
+        try:
+            await page.context.close()
+        except Exception as e:
+            log.debug("Erro ao fechar contexto: %s", str(e)[:100])
+
+    async def _encerrar_browser(self) -> None:
+        browser, self._browser = self._browser, None
+        if browser is not None:
+            try:
+                await browser.close()
+            except Exception as e:
+                log.debug("Erro ao fechar navegador: %s", str(e)[:100])
+
+    async def fechar(self) -> None:
+        """Fecha o navegador e o Playwright (fim do app)."""
+        async with self._lock:
+            self._navegacoes.clear()
+            await self._encerrar_browser()
+            if self._playwright is not None:
+                playwright, self._playwright = self._playwright, None
+                await playwright.stop()
+
+    def resumo(self) -> str:
+        return (f"{self.inicializacoes} inicializações ({self.segundos_inicializacao:.1f}s), "
+                f"{self.reinicios} reinícios, {self.reciclagens} contextos reciclados")
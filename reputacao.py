@@ -0,0 +1,114 @@
+import re
+from typing import Optional
+from urllib.parse import urlparse
+
+from indice import IndiceCrawler
+
+# Prioridade inicial (0 = melhor) de hosts ainda sem histórico, por sufixo de
+# domínio. Casa o domínio e seus subdomínios (ex.: "edu" casa "mit.edu")
+PRIORIDADES_DOMINIO = {
+    "academia.edu": 0,
+    "researchgate.net": 0,
+    "scielo.br": 0,
+    "scielo.org": 0,
+    "scielo.cl": 0,
+    "scielo.pt": 0,
+    "edu": 1,
+    "gov": 1,
+    "edu.br": 1,
+    "gov.br": 1,
+    "edu.pt": 1,
+    "gov.pt": 1,
+    "edu.ar": 1,
+    "edu.mx": 1,
+    "ac.uk": 1,
+    "archive.org": 2,
+}
+# ...e por palavra em qualquer parte da URL
+PRIORIDADES_PALAVRA = {
+    "scielo": 0,
+    "biblioteca": 1,
+    "repositor": 1,   # repository, repositorio
+    "pdftop": 2,
+}
+PRIORIDADE_PADRAO = 3
+
+# Taxa de PDFs válidos assumida para cada prioridade, antes do histórico
+TAXA_INICIAL = (0.5, 0.35, 0.25, 0.15)
+# Peso (em "tentativas virtuais") da estimativa inicial frente ao histórico
+PESO_INICIAL = 3.0
+# Segundos por tentativa assumidos para um host sem histórico
+TEMPO_INICIAL = 15.0
+
+
+def _rotulos_invertidos(dominio: str) -> tuple[str, ...]:
+    return tuple(reversed(dominio.lower().strip(".").split(".")))
+
+
+class ReputacaoHosts:
+    """Ordena candidatos pelo tempo esperado até um PDF válido.
+
+    Para cada host o índice guarda tentativas, downloads, PDFs válidos,
+    segundos gastos e bytes recebidos. A estimativa é
+
+        tempo médio por tentativa / taxa de PDFs válidos
+
+    com as duas médias suavizadas pela prioridade inicial do domínio
+    (PRIORIDADES_DOMINIO/PRIORIDADES_PALAVRA). Assim um host sem histórico
+    fica na posição da prioridade antiga e um que falhou 200 vezes vai para
+    o fim da fila.
+    """
+
+    def __init__(
+        self,
+        indice: IndiceCrawler,
+        prioridades_dominio: Optional[dict[str, int]] = None,
+        prioridades_palavra: Optional[dict[str, int]] = None,
+    ):
+        self.indice = indice
+        # Sufixos como tuplas de rótulos invertidos: "mit.edu" -> ("edu", "mit")
+        self._sufixos = {
+            _rotulos_invertidos(dominio): prioridade
+            for dominio, prioridade in (prioridades_dominio or PRIORIDADES_DOMINIO).items()
+        }
+        self._maior_sufixo = max((len(s) for s in self._sufixos), default=0)
+        palavras = prioridades_palavra or PRIORIDADES_PALAVRA
+        self._prioridade_palavra = {palavra.lower(): p for palavra, p in palavras.items()}
+        self._palavras = re.compile("|".join(map(re.escape, self._prioridade_palavra)), re.I) if palavras else None
+
+    def prioridade_inicial(self, url: str) -> int:
+        """Prioridade pelo sufixo de domínio mais longo e pelas palavras da URL."""
+        host = urlparse(url).hostname or ""
+        rotulos = _rotulos_invertidos(host)
+        prioridade = PRIORIDADE_PADRAO
+        for n in range(min(len(rotulos), self._maior_sufixo), 0, -1):
+            encontrada = self._sufixos.get(rotulos[:n])
+            if encontrada is not None:
+                prioridade = encontrada
+                break
+        if self._palavras:
+            for palavra in self._palavras.findall(url):
+                prioridade = min(prioridade, self._prioridade_palavra[palavra.lower()])
+        return prioridade
+
+    def tempo_esperado(self, url: str) -> float:
+        """Segundos esperados até obter um PDF válido deste host."""
+        host = urlparse(url).hostname or ""
+        tentativas, _, validos, segundos, _ = self.indice.estatisticas_host(host)
+        taxa_inicial = TAXA_INICIAL[min(self.prioridade_inicial(url), len(TAXA_INICIAL) - 1)]
+        taxa = (validos + PESO_INICIAL * taxa_inicial) / (tentativas + PESO_INICIAL)
+        tempo = (segundos + PESO_INICIAL * TEMPO_INICIAL) / (tentativas + PESO_INICIAL)
+        return tempo / taxa
+
+    def ordenar(self, urls: list[str]) -> list[str]:
+        """Do menor para o maior tempo esperado (empates mantêm a ordem)."""
+        return sorted(urls, key=self.tempo_esperado)
+
+    def registrar(self, url: str, baixou: bool, valido: bool, segundos: float, bytes_: int = 0) -> None:
+        """Registra o resultado de uma tentativa de download."""
+        host = urlparse(url).hostname
+        if host:
+            self.indice.registrar_host(host, baixou, valido, segundos, bytes_)
+
+    def resumo(self) -> str:
+        return f"{self.indice.total_hosts()} hosts com histórico"
@@ -0,0 +1,180 @@
+"""Downloads pelo urllib (`main.baixar_pdf`) contra um servidor HTTP local."""
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+import main
+
+MB = 1024 * 1024
+CORPO_PDF = main.ASSINATURA_PDF + b"1.7\n" + b"0" * (3 * main.TAMANHO_BLOCO)
+
+
+class _Servidor(BaseHTTPRequestHandler):
+    liberar = threading.Event()
+
+    def log_message(self, *args):
+        pass
+
+    def _cabecalho(self, tipo: str, tamanho: int = 0) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", tipo)
+        if tamanho:
+            self.send_header("Content-Length", str(tamanho))
+        else:
+            self.send_header("Connection", "close")
+        self.end_headers()
+
+    def do_GET(self):
+        if self.path == "/ok":
+            self._cabecalho("application/pdf", len(CORPO_PDF))
+            self.wfile.write(CORPO_PDF)
+        elif self.path == "/truncado":
+            # Declara o dobro do que envia e fecha a conexão
+            self._cabecalho("application/pdf", 2 * len(CORPO_PDF))
+            self.wfile.write(CORPO_PDF)
+            self.close_connection = True
+        elif self.path == "/html":
+            corpo = b"<html><body>Acesso negado</body></html>"
+            self._cabecalho("text/html", len(corpo))
+            self.wfile.write(corpo)
+        elif self.path == "/grande":
+            self._cabecalho("application/pdf", 2 * MB)
+            self.wfile.write(main.ASSINATURA_PDF + b"0" * (2 * MB - len(main.ASSINATURA_PDF)))
+        elif self.path == "/grande_sem_tamanho":
+            self._cabecalho("application/pdf")
+            self.wfile.write(main.ASSINATURA_PDF)
+            for _ in range(2 * MB // main.TAMANHO_BLOCO + 1):
+                self.wfile.write(b"0" * main.TAMANHO_BLOCO)
+        elif self.path == "/parado":
+            # Primeiros blocos e então para até o teste liberar
+            self._cabecalho("application/pdf")
+            self.wfile.write(CORPO_PDF)
+            self.wfile.flush()
+            self.liberar.wait(10)
+            self.wfile.write(b"0" * main.TAMANHO_BLOCO)
+        else:
+            self.send_error(404)
+
+
+class TesteBaixarPdf(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.servidor = ThreadingHTTPServer(("127.0.0.1", 0), _Servidor)
+        cls.servidor.daemon_threads = True
+        threading.Thread(target=cls.servidor.serve_forever, daemon=True).start()
+        cls.base = f"http://127.0.0.1:{cls.servidor.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        _Servidor.liberar.set()
+        cls.servidor.shutdown()
+        cls.servidor.server_close()
+
+    def setUp(self):
+        self.pasta = tempfile.TemporaryDirectory()
+        self.destino = os.path.join(self.pasta.name, "livro.pdf.part")
+
+    def tearDown(self):
+        self.pasta.cleanup()
+
+    def baixar(self, caminho: str, **kwargs) -> tuple[str, str]:
+        return asyncio.run(main.baixar_pdf(self.base + caminho, self.destino, backend="urllib", **kwargs))
+
+    def test_pdf_completo(self):
+        sha, motivo = self.baixar("/ok")
+        self.assertEqual(motivo, "")
+        self.assertTrue(sha)
+        with open(self.destino, "rb") as f:
+            self.assertEqual(f.read(), CORPO_PDF)
+
+    def test_corpo_truncado(self):
+        self.assertEqual(self.baixar("/truncado"), ("", "erro_rede"))
+        self.assertFalse(os.path.exists(self.destino))
+
+    def test_corpo_nao_pdf(self):
+        self.assertEqual(self.baixar("/html"), ("", "nao_pdf"))
+        self.assertFalse(os.path.exists(self.destino))
+
+    def test_tamanho_maximo_declarado(self):
+        self.assertEqual(self.baixar("/grande", tamanho_maximo_mb=1), ("", "tamanho"))
+        self.assertFalse(os.path.exists(self.destino))
+
+    def test_tamanho_maximo_sem_content_length(self):
+        self.assertEqual(self.baixar("/grande_sem_tamanho", tamanho_maximo_mb=1), ("", "tamanho"))
+        self.assertFalse(os.path.exists(self.destino))
+
+    def test_cancelamento_nao_espera_a_thread(self):
+        _Servidor.liberar.clear()
+
+        async def cancelar() -> float:
+            tarefa = asyncio.ensure_future(main.baixar_pdf(self.base + "/parado", self.destino, backend="urllib"))
+            # Espera a thread começar a gravar
+            for _ in range(100):
+                if os.path.exists(self.destino):
+                    break
+                await asyncio.sleep(0.05)
+            self.assertTrue(os.path.exists(self.destino))
+            inicio = time.monotonic()
+            tarefa.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await tarefa
+            return time.monotonic() - inicio
+
+        self.assertLess(asyncio.run(cancelar()), 1)
+        # A thread segue presa na leitura; ao ser liberada apaga o .part
+        _Servidor.liberar.set()
+        for _ in range(100):
+            if not os.path.exists(self.destino):
+                break
+            time.sleep(0.05)
+        self.assertFalse(os.path.exists(self.destino))
+
+    def test_cancelado_na_validacao_apaga_so_depois_dela(self):
+        liberar = asyncio.Event()
+        viu_o_arquivo = []
+
+        async def analisar_devagar(caminho, termo, hash_pdf):
+            await liberar.wait()
+            viu_o_arquivo.append(os.path.exists(caminho))
+            return False, hash_pdf, 0, ""
+
+        async def cancelar_na_validacao():
+            vencedor = asyncio.Event()
+            tarefa = asyncio.ensure_future(main._baixar_e_validar(
+                self.base + "/ok", self.destino, self.destino + ".final", "Termo de teste", vencedor))
+            for _ in range(100):
+                if os.path.exists(self.destino):
+                    break
+                await asyncio.sleep(0.05)
+            await asyncio.sleep(0.1)
+            tarefa.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await tarefa
+            # A análise ainda roda: o arquivo continua lá para ela
+            self.assertTrue(os.path.exists(self.destino))
+            liberar.set()
+            for _ in range(50):
+                if not os.path.exists(self.destino):
+                    break
+                await asyncio.sleep(0.02)
+
+        diretorio = main.DOWNLOAD_DIR
+        main.DOWNLOAD_DIR = self.pasta.name
+        try:
+            with mock.patch.object(main, "analisar_pdf_async", analisar_devagar), \
+                    mock.patch.object(main, "PREVALIDAR_RANGE", False):
+                asyncio.run(cancelar_na_validacao())
+        finally:
+            main.fechar_indice()
+            main.DOWNLOAD_DIR = diretorio
+        self.assertEqual(viu_o_arquivo, [True])
+        self.assertFalse(os.path.exists(self.destino))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+"""Índice persistente (`indice.IndiceCrawler`)."""
+import os
+import tempfile
+import unittest
+
+from indice import IndiceCrawler
+
+
+class TesteEsquecerPdfsAusentes(unittest.TestCase):
+    def setUp(self):
+        self.pasta = tempfile.TemporaryDirectory()
+        self.indice = IndiceCrawler(os.path.join(self.pasta.name, "indice.sqlite3"))
+
+    def tearDown(self):
+        self.indice.fechar()
+        self.pasta.cleanup()
+
+    def aceitar(self, nome: str, hash_pdf: str, url: str) -> str:
+        caminho = os.path.join(self.pasta.name, nome)
+        with open(caminho, "wb") as f:
+            f.write(b"%PDF-1.7\n")
+        self.indice.registrar_pdf(hash_pdf, caminho, 9, 60, "termo")
+        self.indice.registrar_tentativa(url, "valido", hash_pdf, 9, 60, "termo")
+        self.indice.registrar_arquivo(caminho, "termo", 9, 1, True, hash_pdf, 60)
+        return caminho
+
+    def test_pdf_apagado_volta_a_ser_baixavel(self):
+        apagado = self.aceitar("apagado.pdf", "h1", "http://a.exemplo/livro.pdf")
+        self.aceitar("mantido.pdf", "h2", "http://b.exemplo/livro.pdf")
+        self.indice.registrar_rejeicao("http://c.exemplo/pagina.pdf", "nao_pdf", "termo")
+        os.remove(apagado)
+
+        self.assertEqual(self.indice.esquecer_pdfs_ausentes(), 1)
+        self.assertFalse(self.indice.hash_duplicado("h1", "outro.pdf"))
+        self.assertFalse(self.indice.url_testada("http://a.exemplo/livro.pdf"))
+        self.assertIsNone(self.indice.arquivo(apagado, "termo"))
+        # O que ainda existe e o resto do índice ficam
+        self.assertTrue(self.indice.hash_duplicado("h2", "outro.pdf"))
+        self.assertTrue(self.indice.url_testada("http://b.exemplo/livro.pdf"))
+        self.assertEqual(self.indice.rejeicao_ativa("http://c.exemplo/pagina.pdf", "termo"), "nao_pdf")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+"""Pré-validação por Range (`main._prevalidar_por_range`) sobre trechos do PDF."""
+import unittest
+from unittest import mock
+
+import pymupdf
+
+import main
+
+TERMO = "SZWARCFITER, Jayme L. Estruturas de Dados e seus Algoritmos"
+
+
+def pdf_com_sumario(metadados: dict) -> bytes:
+    """PDF de 80 páginas com marcadores acentuados (gravados com escapes
+    octais) antes do dicionário Info."""
+    doc = pymupdf.open()
+    for _ in range(80):
+        doc.new_page()
+    doc.set_toc([[1, "Prefácio à segunda edição", 1], [1, "Capítulo 1", 3]])
+    doc.set_metadata(metadados)
+    dados = doc.tobytes()
+    doc.close()
+    return dados
+
+
+def prevalidar(dados: bytes, termo: str = TERMO) -> str:
+    """Roda a pré-validação servindo as faixas pedidas a partir de `dados`."""
+    def faixa(url: str, intervalo: str) -> tuple[bytes, int]:
+        inicio, _, fim = intervalo.partition("-")
+        trecho = dados[-int(fim):] if not inicio else dados[int(inicio):int(fim) + 1]
+        return trecho, len(dados)
+
+    with mock.patch.object(main, "_requisitar_faixa", faixa):
+        return main._prevalidar_por_range("http://exemplo.invalid/livro.pdf", termo)
+
+
+class TesteStringsPdf(unittest.TestCase):
+    def test_escapes_octais(self):
+        self.assertEqual(main._decodificar_string_pdf(rb"(Pref\341cio \340 segunda edi\347\343o)"),
+                         "Prefácio à segunda edição")
+
+    def test_escapes_e_parenteses(self):
+        self.assertEqual(main._string_pdf(rb"<</Title (Dados \(2\) e (ed. 3)\n)>>", b"/Title"),
+                         "Dados (2) e (ed. 3)\n")
+
+    def test_utf16_hexadecimal(self):
+        hexa = b"<FEFF" + "Ação".encode("utf-16-be").hex().encode() + b">"
+        self.assertEqual(main._decodificar_string_pdf(hexa), "Ação")
+
+
+class TesteMetadadosParciais(unittest.TestCase):
+    def test_titulo_vem_do_info_e_nao_do_sumario(self):
+        dados = pdf_com_sumario({"title": "Estruturas de Dados e seus Algoritmos", "author": "Jayme Szwarcfiter"})
+        paginas, titulo = main._metadados_parciais(dados)
+        self.assertEqual(paginas, 80)
+        self.assertEqual(titulo, "Estruturas de Dados e seus Algoritmos Jayme Szwarcfiter")
+        self.assertEqual(prevalidar(dados), "")
+
+    def test_sem_info_o_titulo_e_desconhecido(self):
+        # Marcador de outro assunto e nenhum /Info no trailer: não rejeita pelo título
+        dados = (b"%PDF-1.4\n1 0 obj\n<</Title (Introducao a Redes de Computadores Modernas)>>\nendobj\n"
+                 b"trailer\n<</Size 2 /Root 3 0 R>>\n%%EOF\n")
+        self.assertEqual(main._metadados_parciais(dados), (0, ""))
+        self.assertEqual(prevalidar(dados), "")
+
+    def test_info_de_outro_livro_rejeita(self):
+        dados = pdf_com_sumario({"title": "Redes de Computadores Modernas Tanenbaum"})
+        self.assertEqual(prevalidar(dados), "conteudo")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+"""Busca sem navegador (`main.obter_resultados` no modo HTML) contra as
+páginas de fixtures_serp/ servidas por um servidor HTTP local."""
+import asyncio
+import functools
+import os
+import tempfile
+import threading
+import unittest
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+import main
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures_serp")
+
+SZWARCFITER = "https://www.ime.usp.br/~pf/estruturas-de-dados/szwarcfiter-estruturas-de-dados.pdf"
+ARCHIVE = "https://archive.org/download/estruturas-de-dados-algoritmos/Estruturas_de_Dados_e_seus_Algoritmos.pdf"
+UFRJ = "https://www.cos.ufrj.br/~jayme/livros/edsa-cap1.pdf"
+UFSC = "https://repositorio.ufsc.br/bitstream/handle/123456789/1001/edsa-3ed.pdf"
+ORGANICOS = {SZWARCFITER, ARCHIVE, UFRJ + "?download=1", UFSC + "#page=1"}
+
+# Do Bing também saem as URLs citadas na legenda (<cite>), sem query/fragmento
+ESPERADOS = {
+    "bing": ORGANICOS | {UFRJ, UFSC},
+    "duckduckgo": ORGANICOS,
+}
+# PDFs de anúncio e de "pesquisas relacionadas", fora dos blocos orgânicos
+RUIDO = {
+    "https://anuncios.exemplo.com.br/ebooks/kit-100-livros-programacao.pdf",
+    "https://www.exemplo-cursos.com.br/apostila-estruturas-de-dados-gratis.pdf",
+}
+
+
+class _Servidor(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class TesteSerpHtml(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        handler = functools.partial(_Servidor, directory=FIXTURES)
+        cls.servidor = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        cls.servidor.daemon_threads = True
+        threading.Thread(target=cls.servidor.serve_forever, daemon=True).start()
+        cls.base = f"http://127.0.0.1:{cls.servidor.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.servidor.shutdown()
+        cls.servidor.server_close()
+
+    def setUp(self):
+        # Índice (e cache de SERP) numa pasta temporária, vazio a cada teste
+        self.pasta = tempfile.TemporaryDirectory()
+        self.diretorio = main.DOWNLOAD_DIR
+        main.DOWNLOAD_DIR = self.pasta.name
+        main._bloqueios_html.clear()
+        espera = mock.patch.object(main.limitador_motores, "aguardar", mock.AsyncMock(return_value=0.0))
+        espera.start()
+        self.addCleanup(espera.stop)
+
+    def tearDown(self):
+        main.fechar_indice()
+        main.DOWNLOAD_DIR = self.diretorio
+        main._bloqueios_html.clear()
+        self.pasta.cleanup()
+
+    def buscar(self, motor: str) -> list[str]:
+        modelo = self.base + f"/{motor}_html.html?q={{query}}&s={{offset}}"
+        with mock.patch.object(main.obter_motor(motor), "modelo_html", modelo):
+            self.assertEqual(main.modo_busca(motor), "html")
+            return asyncio.run(main.obter_resultados(None, motor, "estruturas de dados szwarcfiter"))
+
+    def test_links_organicos_por_motor(self):
+        for motor, esperados in ESPERADOS.items():
+            with self.subTest(motor=motor):
+                links = self.buscar(motor)
+                self.assertIsNotNone(links)
+                self.assertEqual(set(links), esperados)
+                self.assertFalse(RUIDO & set(links))
+
+    def test_pagina_inexistente_conta_como_bloqueio(self):
+        modelo = self.base + "/sumiu.html?q={query}&s={offset}"
+        with mock.patch.object(main.obter_motor("bing"), "modelo_html", modelo):
+            self.assertIsNone(asyncio.run(main.buscar_serp_html("bing", "estruturas de dados")))
+            self.assertEqual(main.modo_busca("bing"), "navegador")
+
+
+if __name__ == "__main__":
+    unittest.main()
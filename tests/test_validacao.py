@@ -0,0 +1,52 @@
+"""Validação no pool de processos e a volta para thread (`main.analisar_pdf_async`)."""
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import pymupdf
+
+import main
+
+
+class TestePoolValidacao(unittest.TestCase):
+    def setUp(self):
+        self.pasta = tempfile.TemporaryDirectory()
+        self.caminho = os.path.join(self.pasta.name, "livro.pdf")
+        doc = pymupdf.open()
+        for _ in range(main.MIN_PAGINAS):
+            doc.new_page()
+        doc.set_metadata({"title": "Estruturas de Dados e seus Algoritmos"})
+        doc.save(self.caminho)
+        doc.close()
+        main.configurar_pool_validacao(main.WORKERS_VALIDACAO)
+
+    def tearDown(self):
+        main.configurar_pool_validacao(0)
+        main._validar_em_thread = False  # Padrão: pool criado sob demanda
+        self.pasta.cleanup()
+
+    def test_sem_multiprocessing_valida_em_thread(self):
+        # Como no Android: criar o pool falha (sem sem_open)
+        main.configurar_pool_validacao(0)
+        main._validar_em_thread = False
+        with mock.patch.object(main, "ProcessPoolExecutor",
+                               side_effect=NotImplementedError("sem sem_open")) as pool:
+            async def validar_duas_vezes():
+                return [await main.analisar_pdf_async(self.caminho, "Estruturas de Dados Algoritmos")
+                        for _ in range(2)]
+
+            resultados = asyncio.run(validar_duas_vezes())
+        self.assertTrue(all(valido for valido, *_ in resultados))
+        # A segunda validação nem tenta criar o pool de novo
+        self.assertEqual(pool.call_count, 1)
+
+    def test_pool_de_processos(self):
+        valido, _, paginas, motivo = asyncio.run(
+            main.analisar_pdf_async(self.caminho, "Estruturas de Dados Algoritmos"))
+        self.assertEqual((valido, paginas, motivo), (True, main.MIN_PAGINAS, ""))
+
+
+if __name__ == "__main__":
+    unittest.main()
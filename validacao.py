@@ -0,0 +1,171 @@
+import hashlib
+import logging
+import math
+import os
+import re
+import time
+import unicodedata
+
+import pymupdf
+
+# Análise dos PDFs baixados. Roda nos processos do pool de validação (spawn),
+# que importam este módulo do zero: ele não pode ter efeitos colaterais na
+# importação (nada de logging.basicConfig, UserAgent, navegador...)
+log = logging.getLogger(__name__)
+
+MIN_PAGINAS = 50
+TAMANHO_BLOCO_HASH = 256 * 1024    # Bytes lidos por vez ao calcular o hash
+
+# Palavras comuns ignoradas ao comparar o termo com o conteúdo do PDF
+PALAVRAS_IGNORAR = {'com', 'para', 'sobre', 'uma', 'dos', 'das', 'the', 'and', 'livro', 'ebook', 'pdf'}
+# Fração das palavras do termo que precisa aparecer nas primeiras páginas
+LIMIAR_CONTEUDO = 0.7
+PAGINAS_CONTEUDO = 10              # Capa, contracapa, título, índice...
+
+
+def novo_hash_pdf():
+    """Hash incremental usado para detectar PDFs duplicados (BLAKE2b)."""
+    return hashlib.blake2b(digest_size=20)
+
+
+def calcular_hash_pdf(caminho: str) -> str:
+    """Calcula o hash do PDF em blocos (memória constante) para detectar duplicatas."""
+    try:
+        h = novo_hash_pdf()
+        with open(caminho, "rb") as f:
+            for bloco in iter(lambda: f.read(TAMANHO_BLOCO_HASH), b""):
+                h.update(bloco)
+        return h.hexdigest()
+    except OSError:
+        return ""
+
+
+_MARCAS_DIACRITICAS = re.compile("[\u0300-\u036f]")
+
+
+def remover_acentos(texto: str) -> str:
+    """Remove acentos para comparação mais flexível."""
+    if texto.isascii():
+        return texto
+    return _MARCAS_DIACRITICAS.sub("", unicodedata.normalize("NFD", texto))
+
+
+def palavras_do_termo(termo_busca: str) -> list[str]:
+    """Separa palavras significativas (>3 caracteres, sem palavras comuns), sem acentos."""
+    return [
+        remover_acentos(p.lower())
+        for p in termo_busca.split()
+        if len(p) > 3 and p.lower() not in PALAVRAS_IGNORAR
+    ]
+
+
+class BuscaTermo:
+    """Procura as palavras do termo num texto que chega aos pedaços (página a página).
+    
+    Cada pedaço é normalizado uma vez e só as palavras ainda não achadas
+    são procuradas nele. `decidido` fica True assim que o limiar é atingido,
+    e aí as páginas seguintes nem precisam ser extraídas.
+    """
+    
+    def __init__(self, termo_busca: str, limiar: float = LIMIAR_CONTEUDO):
+        self.palavras = list(dict.fromkeys(palavras_do_termo(termo_busca)))
+        self.faltando = list(self.palavras)
+        # Menor nº de palavras com encontradas/total >= limiar
+        self.necessarias = math.ceil(round(limiar * len(self.palavras), 9))
+    
+    @property
+    def encontradas(self) -> int:
+        return len(self.palavras) - len(self.faltando)
+    
+    @property
+    def decidido(self) -> bool:
+        return self.encontradas >= self.necessarias
+    
+    def alimentar(self, texto: str) -> bool:
+        """Procura as palavras que faltam em mais um pedaço. Retorna `decidido`."""
+        if self.faltando and texto:
+            texto = remover_acentos(texto.lower())
+            self.faltando = [p for p in self.faltando if p not in texto]
+        return self.decidido
+
+
+def _textos_validacao(doc):
+    """Gera (etapa, texto) do mais barato ao mais caro de extrair."""
+    metadata = doc.metadata or {}
+    yield "metadados", f"{metadata.get('title', '')} {metadata.get('author', '')}"
+    try:
+        sumario = doc.get_toc(simple=True)
+    except Exception:
+        sumario = []  # Sumário corrompido não invalida o PDF
+    yield "sumario", " ".join(str(titulo) for _, titulo, _ in sumario)
+    yield "primeira_pagina", doc[0].get_text()
+    for i in range(1, min(PAGINAS_CONTEUDO, len(doc))):
+        yield "paginas", doc[i].get_text()
+
+
+def _analisar_pdf(caminho: str, termo_busca: str = "", hash_pdf: str = "") -> tuple[bool, str, int, str, str, float]:
+    """Verifica se o arquivo é um PDF válido com no mínimo MIN_PAGINAS páginas
+    e se o termo de busca aparece nos metadados, no sumário ou nas primeiras
+    páginas (nessa ordem, parando assim que der para decidir).
+    
+    Não usa estado global, para poder rodar no pool de processos.
+    Retorna (válido, hash, nº de páginas, motivo da rejeição, etapa que
+    decidiu, segundos gastos); a checagem de duplicatas e as estatísticas
+    ficam com quem chama, no processo principal. Se `hash_pdf` já veio do
+    download, o arquivo não é relido para calculá-lo.
+    """
+    inicio = time.perf_counter()
+    valido, hash_pdf, num_paginas, motivo, etapa = _analisar_conteudo(caminho, termo_busca, hash_pdf)
+    return valido, hash_pdf, num_paginas, motivo, etapa, time.perf_counter() - inicio
+
+
+def _analisar_conteudo(caminho: str, termo_busca: str, hash_pdf: str) -> tuple[bool, str, int, str, str]:
+    num_paginas = 0
+    try:
+        if not hash_pdf:
+            hash_pdf = calcular_hash_pdf(caminho)
+        
+        doc = pymupdf.open(caminho)
+        num_paginas = len(doc)
+        
+        # Valida número mínimo de páginas
+        if num_paginas < MIN_PAGINAS:
+            doc.close()
+            log.warning("PDF descartado: apenas %d páginas (mínimo %d)", num_paginas, MIN_PAGINAS)
+            return False, hash_pdf, num_paginas, "paginas", "estrutura"
+        
+        busca = BuscaTermo(termo_busca) if termo_busca else None
+        if busca is None or not busca.palavras:
+            # Se não há palavras significativas, aceita
+            doc.close()
+            log.info("PDF válido: %d páginas", num_paginas)
+            return True, hash_pdf, num_paginas, "", "estrutura"
+        
+        # Valida conteúdo por etapas; as seguintes só são extraídas se preciso
+        etapa = "estrutura"
+        for etapa, texto in _textos_validacao(doc):
+            if busca.alimentar(texto):
+                break
+        doc.close()
+        
+        percentual = busca.encontradas / len(busca.palavras)
+        # VALIDAÇÃO RIGOROSA: Pelo menos 70% das palavras devem estar presentes
+        if not busca.decidido:
+            log.warning("PDF descartado: conteúdo não corresponde ao termo '%s'", termo_busca)
+            log.warning("Palavras encontradas: %d/%d (%.0f%%)", 
+                       busca.encontradas, len(busca.palavras), percentual * 100)
+            log.debug("Palavras buscadas: %s", busca.palavras)
+            return False, hash_pdf, num_paginas, "conteudo", etapa
+        
+        log.info("PDF válido: %d páginas, %d/%d palavras encontradas (%.0f%%), decidido em: %s", 
+                num_paginas, busca.encontradas, len(busca.palavras), percentual * 100, etapa)
+        return True, hash_pdf, num_paginas, "", etapa
+        
+    except Exception as e:
+        if not os.path.exists(caminho):
+            # Apagado durante a análise (ex.: candidato cancelado): o PDF não
+            # tem culpa, então não há motivo para o cache negativo
+            log.debug("Arquivo sumiu durante a validação: %s", caminho)
+            return False, hash_pdf, num_paginas, "", "estrutura"
+        log.warning("Arquivo não é um PDF válido: %s", e)
+        return False, hash_pdf, num_paginas, "pdf_invalido", "estrutura"